@@ -1,61 +1,157 @@
-import os
-from dotenv import load_dotenv
-from langgraph.prebuilt import create_react_agent
-from langchain.chat_models import init_chat_model
-from typing_extensions import TypedDict
-from typing import Annotated
-from langgraph.graph.message import add_messages
-from langgraph.prebuilt import ToolNode, tools_condition
-from langgraph.graph import StateGraph, START, END
-from langchain_core.messages import HumanMessage, BaseMessage
-from langchain_mcp_adapters.client import MultiServerMCPClient, Connection
-from langchain_mcp_adapters.sessions import StdioConnection
+import time
+import logging
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Literal, Optional
+from llms.registry import get_model
 import asyncio
 
-load_dotenv()
+# langgraph, langchain and the MCP client are imported on first use, so that
+# importing this module (and starting the client/server) stays cheap
+if TYPE_CHECKING:
+    from langchain_mcp_adapters.sessions import Connection
+    from agent.graph_factory import GraphFactory
+    from agent.mcp_pool import MCPSessionPool
 
-os.environ["OPENAI_API_KEY"] = os.getenv("OPENAI_API_KEY") or ""
-MCP_FILESYSTEM_DIR = os.getenv("MCP_FILESYSTEM_DIR") or ""
+logger = logging.getLogger(__name__)
 
-connection = {
-    "transport": 'stdio',
-    "command": "npx", 
-    "args": ["-y", "@modelcontextprotocol/server-filesystem", MCP_FILESYSTEM_DIR],
-}
+_pool: Optional["MCPSessionPool"] = None
+_pool_lock = asyncio.Lock()
+_graph_factory: Optional["GraphFactory"] = None
 
-async def chat_graph(message):
-    # TODO: fix types issue 
-    mcp_client = MultiServerMCPClient({
-        "filesystem": connection
-    }) # type: ignore
-    tools = await mcp_client.get_tools()
+
+def get_graph_factory() -> "GraphFactory":
+    global _graph_factory
+    if _graph_factory is None:
+        from agent.graph_factory import GraphFactory
+        _graph_factory = GraphFactory()
+    return _graph_factory
+
+
+def get_llm():
+    """Chat model shared by every turn (LLM_MODEL, default gpt-4o-mini)."""
+    return get_model()
+
+
+def get_connections() -> Dict[str, "Connection"]:
+    """MCP server connections from agent/mcp_config/mcp_config.json."""
+    from agent.mcp_config.config import load_mcp_config
+    return load_mcp_config()["mcpServers"]
+
+
+async def get_pool(connections: Optional[Dict[str, "Connection"]] = None) -> "MCPSessionPool":
+    """Return the process-wide MCP session pool, starting it on first use.
+
+    The pool is shared by every turn and every conversation in the process;
+    `connections` only matters for the call that creates it.
+    """
+    global _pool
+    async with _pool_lock:
+        if _pool is None:
+            from agent.mcp_pool import MCPSessionPool
+            pool = MCPSessionPool(connections or get_connections())
+            await pool.start()
+            _pool = pool
+    return _pool
+
+
+async def close_pool() -> None:
+    """Stop the shared MCP servers."""
+    global _pool
+    async with _pool_lock:
+        if _pool is not None:
+            await _pool.close()
+            _pool = None
+
+
+@dataclass
+class ChatEvent:
+    """A progress event emitted while a turn is streaming."""
+    type: Literal["token", "tool_start", "tool_end", "end"]
+    content: Any = None
+    name: Optional[str] = None
+
+
+async def _get_graph(use_pool: bool, connections: Optional[Dict[str, "Connection"]], llm):
+    if use_pool:
+        pool = await get_pool(connections)
+        tools = await pool.get_tools()
+    else:
+        from langchain_mcp_adapters.client import MultiServerMCPClient
+        # TODO: fix types issue
+        mcp_client = MultiServerMCPClient(connections or get_connections()) # type: ignore
+        tools = await mcp_client.get_tools()
 
     # print(tools)
 
-    llm = init_chat_model(
-        model="gpt-4o-mini",
-    )
+    return get_graph_factory().get(llm or get_llm(), tools)
+
+
+def _config(memory) -> dict:
+    return {"configurable": {"memory": memory}} if memory is not None else {}
+
+
+async def run_turn(messages: list, use_pool: bool = True, connections: Optional[Dict[str, "Connection"]] = None, llm=None,
+                   memory=None) -> list:
+    """Run one ReAct turn over `messages` and return the full updated history.
+
+    With a `memory` (graph.memory.ConversationMemory) the model sees a token-budgeted
+    window of the history plus a summary instead of all of it.
+    """
+    start = time.perf_counter()
+    graph = await _get_graph(use_pool, connections, llm)
+    result = await graph.ainvoke({"messages": messages}, _config(memory))
+    logger.info(f"Turn completed in {time.perf_counter() - start:.3f}s (pool={'on' if use_pool else 'off'})")
+    return result["messages"]
+
+
+async def stream_turn(messages: list, use_pool: bool = True, connections: Optional[Dict[str, "Connection"]] = None, llm=None,
+                      memory=None) -> AsyncIterator[ChatEvent]:
+    """Run one ReAct turn, yielding model tokens and tool progress as they happen.
+
+    The last event is always `end`, carrying the full updated history.
+    """
+    start = time.perf_counter()
+    first_token = None
+    graph = await _get_graph(use_pool, connections, llm)
+    final = None
+    async for event in graph.astream_events({"messages": messages}, _config(memory), version="v2"):
+        kind = event["event"]
+        if kind == "on_chat_model_stream":
+            text = event["data"]["chunk"].content
+            if text:
+                if first_token is None:
+                    first_token = time.perf_counter() - start
+                yield ChatEvent(type="token", content=text)
+        elif kind == "on_tool_start":
+            yield ChatEvent(type="tool_start", name=event["name"], content=event["data"].get("input"))
+        elif kind == "on_tool_end":
+            output = event["data"].get("output")
+            yield ChatEvent(type="tool_end", name=event["name"], content=getattr(output, "content", output))
+        elif kind == "on_chain_end" and not event["parent_ids"]:
+            final = event["data"]["output"]
 
-    llm_with_tools = llm.bind_tools(tools=tools)
+    ttft = f"{first_token:.3f}s" if first_token is not None else "n/a"
+    logger.info(f"Streamed turn completed in {time.perf_counter() - start:.3f}s (first token {ttft})")
+    yield ChatEvent(type="end", content=final["messages"] if final else messages)
 
-    class State(TypedDict):
-        messages: Annotated[list[BaseMessage], add_messages]
 
-    def chat(state: State) -> State:
-        return {"messages":[llm_with_tools.invoke(state["messages"])]}
+async def chat_graph(message, use_pool: bool = True, connections: Optional[Dict[str, "Connection"]] = None, llm=None):
+    from langchain_core.messages import HumanMessage
+    messages = await run_turn([HumanMessage(content=message)], use_pool=use_pool, connections=connections, llm=llm)
+    return messages[-1].content
 
-    builder = StateGraph(State)
-    builder.add_node("assistant", chat)
-    builder.add_node("tools", ToolNode(tools=tools))
-    builder.add_edge(START, "assistant")
-    builder.add_conditional_edges("assistant", tools_condition)
-    builder.add_edge("tools", "assistant")
-    builder.add_edge("assistant", END)
 
-    graph = builder.compile()
+async def chat_graph_stream(message, use_pool: bool = True, connections: Optional[Dict[str, "Connection"]] = None, llm=None) -> AsyncIterator[ChatEvent]:
+    """Streaming variant of chat_graph."""
+    from langchain_core.messages import HumanMessage
+    async for event in stream_turn([HumanMessage(content=message)], use_pool=use_pool, connections=connections, llm=llm):
+        yield event
 
-    result = await graph.ainvoke({"messages": [HumanMessage(content=message)]})
-    return result["messages"][-1].content
+async def main():
+    try:
+        print(await chat_graph("show content from 1-localllm.py"))
+    finally:
+        await close_pool()
 
 if __name__=="__main__":
-    asyncio.run(chat_graph("show content from 1-localllm.py"))
\ No newline at end of file
+    asyncio.run(main())
@@ -1,37 +1,63 @@
-import os
 import asyncio
-from chat_graph import chat_graph
+from agent.chat_graph import chat_graph_stream, get_pool, close_pool
+
+def _preview(value, limit: int = 80) -> str:
+    text = str(value).replace("\n", " ")
+    return text if len(text) <= limit else text[:limit] + "..."
+
+async def render_stream(user_input: str) -> None:
+    """Print tokens and tool progress as the agent produces them."""
+    print("\nAI: ", end="", flush=True)
+    at_line_start = False
+    received = False
+    async for event in chat_graph_stream(user_input):
+        if event.type == "token":
+            if at_line_start:
+                print("AI: ", end="")
+                at_line_start = False
+            print(event.content, end="", flush=True)
+            received = True
+        elif event.type == "tool_start":
+            print(f"\n  [tool] {event.name}({_preview(event.content)})", flush=True)
+            at_line_start = True
+        elif event.type == "tool_end":
+            print(f"  [tool] {event.name} -> {_preview(event.content)}", flush=True)
+            at_line_start = True
+    if not received:
+        print("No response received.", end="")
+    print("\n")
 
 async def main():
     """Main application loop."""
     try:
         print("\nWelcome to the LangGraph Agent Client!")
+        print("Starting MCP servers...")
+        # Start the servers up front so the first message doesn't pay for it
+        await get_pool()
         print("Type 'quit' or 'exit' to stop the client.")
         print("You can start typing your messages below:\n")
-        
+
         while True:
             try:
                 user_input = input("You: ").strip()
                 if not user_input:
                     continue
-                    
+
                 if user_input.lower() in ["quit", "exit"]:
                     print("\nGoodbye!")
                     break
 
-                ai_response = await chat_graph(user_input)
-                if not ai_response:
-                    print("AI: No response received.")
-                    continue
-                print(f"\nAI: {ai_response}\n")
-    
+                await render_stream(user_input)
+
             except Exception as e:
                 print(f"\nError processing message: {str(e)}\n")
                 continue
-                
+
     except Exception as e:
         print(f"\nFatal error: {str(e)}")
         return 1
+    finally:
+        await close_pool()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
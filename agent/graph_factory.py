@@ -0,0 +1,112 @@
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Annotated, Any, Dict, List, Sequence, Tuple
+
+from typing_extensions import TypedDict
+from langchain_core.messages import BaseMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import BaseTool
+from langgraph.graph import StateGraph, START, END
+from langgraph.graph.message import add_messages
+from langgraph.prebuilt import ToolNode, tools_condition
+
+logger = logging.getLogger(__name__)
+
+
+class State(TypedDict):
+    messages: Annotated[list[BaseMessage], add_messages]
+
+
+def _tool_schema(tool: BaseTool) -> Dict[str, Any]:
+    schema = tool.args_schema
+    if schema is None:
+        args: Any = {}
+    elif isinstance(schema, dict):
+        args = schema
+    else:
+        args = schema.model_json_schema()
+    return {"name": tool.name, "description": tool.description, "args": args}
+
+
+def tool_schema_hash(tools: Sequence[BaseTool]) -> str:
+    """Stable hash of the names, descriptions and argument schemas of `tools`."""
+    schemas = sorted((_tool_schema(tool) for tool in tools), key=lambda s: s["name"])
+    payload = json.dumps(schemas, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def build_graph(llm, tools: List[BaseTool]):
+    """Bind `tools` to `llm` and compile the assistant/tools ReAct graph."""
+    # Name order keeps the tool schemas, which lead every request, identical between restarts
+    llm_with_tools = llm.bind_tools(tools=sorted(tools, key=lambda t: t.name))
+
+    async def chat(state: State, config: RunnableConfig) -> State:
+        # A per-conversation ConversationMemory (graph/memory.py) bounds the prompt; graphs are shared
+        memory = config.get("configurable", {}).get("memory")
+        messages = memory.window(state["messages"]) if memory else state["messages"]
+        return {"messages": [await llm_with_tools.ainvoke(messages)]}
+
+    builder = StateGraph(State)
+    builder.add_node("assistant", chat)
+    builder.add_node("tools", ToolNode(tools=tools))
+    builder.add_edge(START, "assistant")
+    builder.add_conditional_edges("assistant", tools_condition)
+    builder.add_edge("tools", "assistant")
+    builder.add_edge("assistant", END)
+    return builder.compile()
+
+
+class GraphFactory:
+    """Compile the chat graph once per (model, tool set) and reuse it.
+
+    Graphs are cached under a hash of the tool schemas, so a new graph is only
+    compiled when an MCP server's tool list actually changes. Looking up the hash
+    for a tool list we've already seen is keyed on the tool objects themselves,
+    which the MCP pool keeps stable between restarts.
+    """
+
+    def __init__(self, max_graphs: int = 8):
+        self.max_graphs = max_graphs
+        self.hits = 0
+        self.misses = 0
+        self._graphs: "OrderedDict[Tuple[int, str], Tuple[Any, Any]]" = OrderedDict()
+        self._hashes: Dict[Tuple[int, ...], Tuple[str, List[BaseTool]]] = {}
+        self._lock = threading.Lock()
+
+    def _schema_hash(self, tools: List[BaseTool]) -> str:
+        ids = tuple(id(tool) for tool in tools)
+        cached = self._hashes.get(ids)
+        if cached is not None:
+            return cached[0]
+        digest = tool_schema_hash(tools)
+        # Keep the tools referenced so their ids can't be reused by other objects
+        if len(self._hashes) >= self.max_graphs * 4:
+            self._hashes.clear()
+        self._hashes[ids] = (digest, list(tools))
+        return digest
+
+    def get(self, llm, tools: List[BaseTool]):
+        """Return a compiled graph for `llm` with `tools` bound."""
+        with self._lock:
+            key = (id(llm), self._schema_hash(tools))
+            entry = self._graphs.get(key)
+            if entry is not None and entry[0] is llm:
+                self._graphs.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+            self.misses += 1
+            logger.info(f"Compiling chat graph for tool set {key[1][:12]} ({len(tools)} tools)")
+            graph = build_graph(llm, tools)
+            self._graphs[key] = (llm, graph)
+            while len(self._graphs) > self.max_graphs:
+                self._graphs.popitem(last=False)
+            return graph
+
+    def clear(self) -> None:
+        with self._lock:
+            self._graphs.clear()
+            self._hashes.clear()
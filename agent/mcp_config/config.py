@@ -1,16 +1,18 @@
-from dotenv import load_dotenv
-load_dotenv()
+import json
+import os
+from pathlib import Path
+
 
 def load_mcp_config():
-    import json
-    from pathlib import Path
+    # .env is read here rather than at import, so importing this module does no I/O
+    from dotenv import load_dotenv
+    load_dotenv()
 
     config_path = Path(__file__).parent / "mcp_config.json"
     with open(config_path, "r") as f:
         config = json.load(f)
-    
+
     # Ensure MCP_FILESYSTEM_DIR is set in the environment
-    import os
     mcp_filesystem_dir = os.getenv("MCP_FILESYSTEM_DIR")
     if not mcp_filesystem_dir:
         raise ValueError("MCP_FILESYSTEM_DIR environment variable is not set.")
@@ -34,5 +36,9 @@ def get_mcp_config():
         return config
     except Exception as e:
         raise RuntimeError(f"Failed to load MCP configuration: {str(e)}")
-    
-mcp_config  = get_mcp_config()
\ No newline at end of file
+
+def __getattr__(name):
+    # `mcp_config` used to be loaded (and validated) at import time
+    if name == "mcp_config":
+        return get_mcp_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,300 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import anyio
+from langchain_core.tools import BaseTool, ToolException
+from langchain_mcp_adapters.sessions import Connection, create_session
+from langchain_mcp_adapters.tools import convert_mcp_tool_to_langchain_tool
+from mcp import ClientSession
+
+from agent.tool_cache import CachePolicy, ToolResultCache, cache_key, policy_from_annotations
+
+logger = logging.getLogger(__name__)
+
+# Errors that mean the transport itself is gone rather than the tool failing
+_TRANSPORT_ERRORS = (
+    anyio.ClosedResourceError,
+    anyio.BrokenResourceError,
+    anyio.EndOfStream,
+    ConnectionError,
+)
+
+
+class ServerUnavailableError(RuntimeError):
+    """Raised when an MCP server cannot be reached within the wait timeout."""
+
+
+@dataclass
+class ServerLimits:
+    """Per-server limits for tool calls made through the pool.
+
+    Set from an optional "pool" block on a server in mcp_config.json, e.g.
+    {"max_concurrency": 4, "call_timeout": 20, "tool_timeouts": {"read_file": 5}}.
+    """
+    max_concurrency: int = 8
+    call_timeout: float = 30.0
+    tool_timeouts: Dict[str, float] = field(default_factory=dict)
+    # A server that keeps timing out is probably hung, so it gets restarted
+    max_consecutive_timeouts: int = 2
+
+    def timeout_for(self, tool_name: str) -> float:
+        return self.tool_timeouts.get(tool_name, self.call_timeout)
+
+
+class _PooledSession:
+    """Session proxy handed to langchain tools.
+
+    Tools keep a reference to this object instead of a raw ClientSession, so a
+    restarted server is picked up transparently by tools that were loaded earlier.
+    """
+
+    def __init__(self, server: "_ServerSession"):
+        self._server = server
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any]):
+        return await self._server.call_tool(name, arguments)
+
+
+class _ServerSession:
+    """A single long-lived MCP server connection with health checks and restarts."""
+
+    def __init__(
+        self,
+        name: str,
+        connection: Connection,
+        health_interval: float,
+        ping_timeout: float,
+        max_backoff: float,
+        limits: ServerLimits,
+        cache: Optional[ToolResultCache] = None,
+        cache_policies: Optional[Dict[str, CachePolicy]] = None,
+    ):
+        self.name = name
+        self.connection = connection
+        self.limits = limits
+        self.cache = cache
+        self.cache_policies = cache_policies or {}
+        self._annotated_policies: Dict[str, CachePolicy] = {}
+        self.health_interval = health_interval
+        self.ping_timeout = ping_timeout
+        self.max_backoff = max_backoff
+        self.session: Optional[ClientSession] = None
+        self.mcp_tools: list = []
+        self.restarts = 0
+        self.timeouts = 0
+        self._consecutive_timeouts = 0
+        self._slots = asyncio.Semaphore(limits.max_concurrency)
+        self._ready = asyncio.Event()
+        self._unhealthy = asyncio.Event()
+        self._stopped = False
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=f"mcp-{self.name}")
+
+    async def _run(self) -> None:
+        """Own the session for its whole lifetime.
+
+        The stdio/http transports use anyio cancel scopes, which must be entered and
+        exited from the same task, so the session is opened and closed here only.
+        """
+        backoff = 0.5
+        while not self._stopped:
+            try:
+                async with create_session(self.connection) as session:
+                    await session.initialize()
+                    result = await session.list_tools()
+                    self.mcp_tools = list(result.tools)
+                    self._annotated_policies = {
+                        tool.name: policy
+                        for tool in self.mcp_tools
+                        if (policy := policy_from_annotations(tool)) is not None
+                    }
+                    self.session = session
+                    self._unhealthy.clear()
+                    self._ready.set()
+                    backoff = 0.5
+                    logger.info(f"MCP server '{self.name}' ready with {len(self.mcp_tools)} tools")
+                    await self._watch(session)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"MCP server '{self.name}' failed: {e}")
+            finally:
+                self.session = None
+                self._ready.clear()
+
+            if self._stopped:
+                break
+            self.restarts += 1
+            logger.info(f"Restarting MCP server '{self.name}' in {backoff:.1f}s")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    async def _watch(self, session: ClientSession) -> None:
+        """Ping the server periodically, returning when it stops responding."""
+        while not self._stopped:
+            try:
+                await asyncio.wait_for(self._unhealthy.wait(), timeout=self.health_interval)
+                if self._stopped:
+                    return
+                logger.warning(f"MCP server '{self.name}' marked unhealthy by a failed call")
+                return
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await asyncio.wait_for(session.send_ping(), timeout=self.ping_timeout)
+            except Exception as e:
+                logger.warning(f"Health check failed for MCP server '{self.name}': {e}")
+                return
+
+    async def wait_ready(self, timeout: float) -> ClientSession:
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            raise ServerUnavailableError(f"MCP server '{self.name}' is not available") from None
+        assert self.session is not None
+        return self.session
+
+    def _mark_unhealthy(self, session: ClientSession) -> None:
+        if self.session is session:
+            self._unhealthy.set()
+            self._ready.clear()
+
+    async def _call(self, name: str, arguments: Dict[str, Any], timeout: float):
+        session = await self.wait_ready(timeout)
+        try:
+            return await session.call_tool(name, arguments)
+        except _TRANSPORT_ERRORS:
+            # The transport may be gone (crashed process, closed stream); let the
+            # owner task restart it and retry the call once on the new session.
+            self._mark_unhealthy(session)
+            session = await self.wait_ready(timeout)
+            return await session.call_tool(name, arguments)
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any]):
+        """Call a tool, serving declared-pure tools from the result cache."""
+        policy = self.cache_policies.get(name) or self._annotated_policies.get(name)
+        if self.cache is None or policy is None:
+            return await self._limited_call(name, arguments)
+
+        key = cache_key(self.name, name, arguments)
+        cached = self.cache.get(key, policy, arguments)
+        if cached is not None:
+            return cached
+        fingerprint = self.cache.fingerprint(policy, arguments)
+        result = await self._limited_call(name, arguments)
+        self.cache.put(key, result, fingerprint, policy.ttl)
+        return result
+
+    async def _limited_call(self, name: str, arguments: Dict[str, Any]):
+        """Call a tool, at most `max_concurrency` at a time, within its timeout."""
+        timeout = self.limits.timeout_for(name)
+        async with self._slots:
+            session = self.session
+            try:
+                result = await asyncio.wait_for(self._call(name, arguments, timeout), timeout=timeout)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                self._consecutive_timeouts += 1
+                if self._consecutive_timeouts >= self.limits.max_consecutive_timeouts and session is not None:
+                    logger.warning(f"MCP server '{self.name}' looks hung, restarting it")
+                    self._consecutive_timeouts = 0
+                    self._mark_unhealthy(session)
+                raise ToolException(f"Tool '{name}' on MCP server '{self.name}' timed out after {timeout:g}s") from None
+            self._consecutive_timeouts = 0
+            return result
+
+    async def stop(self) -> None:
+        self._stopped = True
+        self._unhealthy.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+
+class MCPSessionPool:
+    """Keep MCP servers warm and share their sessions across turns and conversations.
+
+    Example:
+        pool = MCPSessionPool(load_mcp_config()["mcpServers"])
+        await pool.start()
+        tools = await pool.get_tools()
+        ...
+        await pool.close()
+    """
+
+    def __init__(
+        self,
+        connections: Dict[str, Connection],
+        health_interval: float = 30.0,
+        ping_timeout: float = 5.0,
+        startup_timeout: float = 60.0,
+        max_backoff: float = 30.0,
+        tool_cache: Optional[ToolResultCache] = None,
+    ):
+        self.startup_timeout = startup_timeout
+        self.tool_cache = tool_cache or ToolResultCache()
+        self.servers = {}
+        for name, connection in connections.items():
+            connection = dict(connection)  # type: ignore[assignment]
+            limits = ServerLimits(**connection.pop("pool", {}))  # type: ignore[misc]
+            policies = {
+                tool: CachePolicy(**policy)
+                for tool, policy in connection.pop("cache", {}).items()  # type: ignore[misc]
+            }
+            self.servers[name] = _ServerSession(
+                name, connection, health_interval, ping_timeout, max_backoff, limits,
+                cache=self.tool_cache, cache_policies=policies,
+            )
+        self._tools: Dict[str, List[BaseTool]] = {}
+        self._tool_source: Dict[str, list] = {}
+
+    async def start(self) -> None:
+        """Start every server and wait until they are all ready."""
+        for server in self.servers.values():
+            server.start()
+        await asyncio.gather(*(s.wait_ready(self.startup_timeout) for s in self.servers.values()))
+
+    async def get_tools(self) -> List[BaseTool]:
+        """Return langchain tools for every server, rebuilt only after a restart."""
+        all_tools: List[BaseTool] = []
+        for name, server in self.servers.items():
+            await server.wait_ready(self.startup_timeout)
+            # mcp_tools is replaced on every (re)start; rebuild the wrappers only then
+            if self._tool_source.get(name) is not server.mcp_tools:
+                proxy = _PooledSession(server)
+                self._tools[name] = [
+                    convert_mcp_tool_to_langchain_tool(proxy, tool)  # type: ignore[arg-type]
+                    for tool in server.mcp_tools
+                ]
+                self._tool_source[name] = server.mcp_tools
+            all_tools.extend(self._tools[name])
+        return all_tools
+
+    async def call_tool(self, server_name: str, name: str, arguments: Dict[str, Any]):
+        """Call a tool on the named server using its pooled session."""
+        return await self.servers[server_name].call_tool(name, arguments)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        stats: Dict[str, Dict[str, Any]] = {"tool_cache": self.tool_cache.stats()}
+        stats.update({
+            name: {
+                "ready": server.session is not None,
+                "restarts": server.restarts,
+                "timeouts": server.timeouts,
+            }
+            for name, server in self.servers.items()
+        })
+        return stats
+
+    async def close(self) -> None:
+        await asyncio.gather(*(s.stop() for s in self.servers.values()))
+        self.tool_cache.close()
@@ -0,0 +1,279 @@
+"""JSON-lines front-end serving many chat sessions from one process.
+
+Each request is one JSON object per line:
+
+    {"id": 1, "session": "alice", "message": "list files in the project"}
+    {"id": 2, "session": "alice", "type": "close"}
+
+and each reply is one line carrying the same `id` and `session`, with either a
+`response` or an `error`. Replies on one connection may arrive out of order.
+
+    python -m agent.server --port 8765           # TCP
+    python -m agent.server --stdio               # stdin/stdout
+"""
+import argparse
+import asyncio
+import json
+import logging
+import signal
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from agent.chat_graph import run_turn, get_llm, get_pool, close_pool
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ServerConfig:
+    """Configuration for the agent server."""
+    host: str = "127.0.0.1"
+    port: int = 8765
+    max_concurrency: int = 32          # turns running at once
+    max_queue: int = 256               # turns waiting for a slot before we reject
+    max_pending_per_connection: int = 8  # unanswered requests before we stop reading
+    session_ttl: float = 30 * 60       # idle seconds before a session is dropped
+    shutdown_grace: float = 30.0
+
+
+@dataclass
+class Session:
+    """Conversation history for one client session."""
+    id: str
+    messages: list = field(default_factory=list)
+    memory: Any = None  # graph.memory.ConversationMemory bounding what the model sees
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    last_seen: float = field(default_factory=time.monotonic)
+
+
+class AgentServer:
+    """Drive chat turns for many sessions with bounded concurrency.
+
+    Turns within a session run one at a time; across sessions at most
+    `max_concurrency` turns run at once and `max_queue` more may wait. Each
+    connection reads at most `max_pending_per_connection` requests ahead, so a fast
+    client is slowed down by TCP backpressure instead of growing our queues.
+    """
+
+    def __init__(self, config: Optional[ServerConfig] = None, llm=None, connections=None):
+        self.config = config or ServerConfig()
+        self.llm = llm
+        self.connections = connections
+        self.sessions: Dict[str, Session] = {}
+        self.completed = 0
+        self.rejected = 0
+        self._slots = asyncio.Semaphore(self.config.max_concurrency)
+        self._waiting = 0
+        self._tasks: set = set()
+        self._closing = asyncio.Event()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._sweeper: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Warm the MCP pool and start the idle-session sweeper."""
+        await get_pool(self.connections)
+        self._sweeper = asyncio.create_task(self._sweep_sessions())
+
+    def _session(self, session_id: str) -> Session:
+        session = self.sessions.get(session_id)
+        if session is None:
+            from graph.memory import ConversationMemory
+            session = self.sessions[session_id] = Session(
+                id=session_id, memory=ConversationMemory(summarizer=self.llm or get_llm()))
+        session.last_seen = time.monotonic()
+        return session
+
+    async def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Handle one decoded request and return the reply object."""
+        reply: Dict[str, Any] = {"id": request.get("id"), "session": request.get("session")}
+        session_id = request.get("session")
+        if not isinstance(session_id, str) or not session_id:
+            reply["error"] = "'session' is required"
+            return reply
+
+        if request.get("type") == "close":
+            self.sessions.pop(session_id, None)
+            reply["response"] = "closed"
+            return reply
+
+        message = request.get("message")
+        if not isinstance(message, str) or not message.strip():
+            reply["error"] = "'message' is required"
+            return reply
+        if self._closing.is_set():
+            reply["error"] = "server is shutting down"
+            return reply
+        if self._waiting >= self.config.max_queue:
+            self.rejected += 1
+            reply["error"] = "server busy, retry later"
+            return reply
+
+        from langchain_core.messages import HumanMessage
+
+        session = self._session(session_id)
+        self._waiting += 1
+        waiting = True
+        try:
+            async with session.lock:
+                async with self._slots:
+                    self._waiting -= 1
+                    waiting = False
+                    messages = await run_turn(
+                        session.messages + [HumanMessage(content=message)],
+                        connections=self.connections,
+                        llm=self.llm,
+                        memory=session.memory,
+                    )
+            session.messages = messages
+            session.last_seen = time.monotonic()
+            self.completed += 1
+            reply["response"] = messages[-1].content
+        except Exception as e:
+            logger.error(f"Error in session {session_id}: {e}")
+            reply["error"] = str(e)
+        finally:
+            if waiting:
+                self._waiting -= 1
+        return reply
+
+    async def _process_line(self, line: bytes, write: Callable[[Dict[str, Any]], Awaitable[None]]) -> None:
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+        except ValueError as e:
+            await write({"id": None, "session": None, "error": f"invalid request: {e}"})
+            return
+        await write(await self.handle_request(request))
+
+    async def _serve_stream(self, reader: asyncio.StreamReader, write: Callable[[Dict[str, Any]], Awaitable[None]]) -> None:
+        pending = asyncio.Semaphore(self.config.max_pending_per_connection)
+        tasks: set = set()
+
+        def done(task: asyncio.Task) -> None:
+            tasks.discard(task)
+            self._tasks.discard(task)
+            pending.release()
+
+        while not self._closing.is_set():
+            await pending.acquire()
+            line = await reader.readline()
+            if not line:
+                pending.release()
+                break
+            if not line.strip():
+                pending.release()
+                continue
+            task = asyncio.create_task(self._process_line(line, write))
+            tasks.add(task)
+            self._tasks.add(task)
+            task.add_done_callback(done)
+
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        write_lock = asyncio.Lock()
+
+        async def write(reply: Dict[str, Any]) -> None:
+            async with write_lock:
+                writer.write((json.dumps(reply, default=str) + "\n").encode("utf-8"))
+                await writer.drain()
+
+        try:
+            await self._serve_stream(reader, write)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def serve_tcp(self) -> int:
+        """Start listening on TCP and return the bound port."""
+        await self.start()
+        self._server = await asyncio.start_server(self._handle_connection, self.config.host, self.config.port)
+        port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Agent server listening on {self.config.host}:{port}")
+        return port
+
+    async def serve_stdio(self) -> None:
+        """Serve a single JSON-lines stream on stdin/stdout until EOF."""
+        await self.start()
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+        write_lock = asyncio.Lock()
+
+        async def write(reply: Dict[str, Any]) -> None:
+            async with write_lock:
+                sys.stdout.write(json.dumps(reply, default=str) + "\n")
+                sys.stdout.flush()
+
+        await self._serve_stream(reader, write)
+
+    async def _sweep_sessions(self) -> None:
+        while not self._closing.is_set():
+            await asyncio.sleep(min(60.0, self.config.session_ttl))
+            cutoff = time.monotonic() - self.config.session_ttl
+            for session_id, session in list(self.sessions.items()):
+                if session.last_seen < cutoff and not session.lock.locked():
+                    del self.sessions[session_id]
+
+    async def shutdown(self) -> None:
+        """Stop accepting work, let in-flight turns finish, then stop MCP servers."""
+        self._closing.set()
+        if self._server is not None:
+            self._server.close()
+        if self._tasks:
+            logger.info(f"Waiting for {len(self._tasks)} in-flight requests")
+            _, still_running = await asyncio.wait(set(self._tasks), timeout=self.config.shutdown_grace)
+            for task in still_running:
+                task.cancel()
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+        if self._server is not None:
+            await self._server.wait_closed()
+        await close_pool()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="LangGraph agent server")
+    parser.add_argument("--stdio", action="store_true", help="Serve JSON lines on stdin/stdout instead of TCP")
+    parser.add_argument("--host", default=ServerConfig.host)
+    parser.add_argument("--port", type=int, default=ServerConfig.port)
+    parser.add_argument("--max-concurrency", type=int, default=ServerConfig.max_concurrency)
+    parser.add_argument("--max-queue", type=int, default=ServerConfig.max_queue)
+    args = parser.parse_args()
+
+    # stdout carries replies in stdio mode, so logs go to stderr
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    server = AgentServer(ServerConfig(
+        host=args.host,
+        port=args.port,
+        max_concurrency=args.max_concurrency,
+        max_queue=args.max_queue,
+    ))
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    try:
+        if args.stdio:
+            serving = asyncio.create_task(server.serve_stdio())
+            await asyncio.wait([serving, asyncio.create_task(stop.wait())], return_when=asyncio.FIRST_COMPLETED)
+        else:
+            await server.serve_tcp()
+            await stop.wait()
+    finally:
+        await server.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,201 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from mcp.types import CallToolResult, Tool as MCPTool
+
+logger = logging.getLogger(__name__)
+
+Fingerprint = Tuple[Tuple[str, int, int], ...]
+
+
+@dataclass
+class CachePolicy:
+    """Opt-in caching for one tool.
+
+    Only declare tools whose result depends on nothing but their arguments (and,
+    for `mtime_args`, the files those arguments name).
+    """
+    ttl: Optional[float] = None  # seconds; None keeps the entry until it is evicted
+    mtime_args: List[str] = field(default_factory=list)  # path arguments that invalidate on change
+
+
+def policy_from_annotations(tool: MCPTool) -> Optional[CachePolicy]:
+    """A server opts a tool in by marking it read-only, idempotent and closed-world."""
+    hints = tool.annotations
+    if hints and hints.readOnlyHint and hints.idempotentHint and hints.openWorldHint is False:
+        return CachePolicy()
+    return None
+
+
+def cache_key(server: str, tool: str, arguments: Dict[str, Any]) -> str:
+    """Content address of a tool call: server, tool and canonical JSON arguments."""
+    canonical = json.dumps(arguments, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(f"{server}\0{tool}\0{canonical}".encode("utf-8")).hexdigest()
+
+
+def _fingerprint(policy: CachePolicy, arguments: Dict[str, Any]) -> Optional[Fingerprint]:
+    """mtime/size of every path named by `mtime_args`, or None if one can't be read."""
+    paths: List[str] = []
+    for arg in policy.mtime_args:
+        value = arguments.get(arg)
+        if isinstance(value, str):
+            paths.append(value)
+        elif isinstance(value, list):
+            paths.extend(str(v) for v in value)
+    result = []
+    for path in sorted(paths):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        result.append((path, st.st_mtime_ns, st.st_size))
+    return tuple(result)
+
+
+class ToolResultCache:
+    """LRU cache of MCP tool results, optionally backed by SQLite on disk.
+
+    Only successful results are stored. Entries expire after the tool's TTL and
+    are dropped when a watched file's mtime or size changes. On disk, expired rows
+    are purged and the oldest rows beyond `max_disk_entries` evicted as results are stored.
+    """
+
+    def __init__(self, max_entries: int = 1024, path: Optional[str] = None, max_disk_entries: int = 10_000):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.invalidated = 0
+        self.evictions = 0
+        self._memory: "OrderedDict[str, Tuple[float, Fingerprint, CallToolResult]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS tool_cache ("
+                "key TEXT PRIMARY KEY, stored_at REAL, fingerprint TEXT, payload TEXT, expires_at REAL)"
+            )
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(tool_cache)")}
+            if "expires_at" not in columns:
+                # Written before TTLs were stored; those rows never expire on disk
+                self._db.execute("ALTER TABLE tool_cache ADD COLUMN expires_at REAL")
+            self._db.execute("CREATE INDEX IF NOT EXISTS tool_cache_stored_at ON tool_cache (stored_at)")
+            self._db.commit()
+
+    def fingerprint(self, policy: CachePolicy, arguments: Dict[str, Any]) -> Optional[Fingerprint]:
+        return _fingerprint(policy, arguments) if policy.mtime_args else ()
+
+    def _load(self, key: str) -> Optional[Tuple[float, Fingerprint, CallToolResult]]:
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+            return entry
+        if self._db is None:
+            return None
+        row = self._db.execute(
+            "SELECT stored_at, fingerprint, payload FROM tool_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        fingerprint = tuple(tuple(item) for item in json.loads(row[1]))
+        entry = (row[0], fingerprint, CallToolResult.model_validate_json(row[2]))
+        self._remember(key, entry)
+        return entry
+
+    def _remember(self, key: str, entry: Tuple[float, Fingerprint, CallToolResult]) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def _drop(self, key: str) -> None:
+        self._memory.pop(key, None)
+        if self._db is not None:
+            self._db.execute("DELETE FROM tool_cache WHERE key = ?", (key,))
+            self._db.commit()
+
+    def get(self, key: str, policy: CachePolicy, arguments: Dict[str, Any]) -> Optional[CallToolResult]:
+        with self._lock:
+            entry = self._load(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, fingerprint, result = entry
+            if policy.ttl is not None and time.time() - stored_at > policy.ttl:
+                self.expired += 1
+                self.misses += 1
+                self._drop(key)
+                return None
+            if fingerprint and fingerprint != self.fingerprint(policy, arguments):
+                self.invalidated += 1
+                self.misses += 1
+                self._drop(key)
+                return None
+            self.hits += 1
+            return result
+
+    def put(self, key: str, result: CallToolResult, fingerprint: Optional[Fingerprint],
+            ttl: Optional[float] = None) -> None:
+        """Store `result`; `fingerprint` must be taken *before* the call was made."""
+        if result.isError or fingerprint is None:
+            return
+        entry = (time.time(), fingerprint, result)
+        with self._lock:
+            self._remember(key, entry)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO tool_cache (key, stored_at, fingerprint, payload, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, entry[0], json.dumps(fingerprint), result.model_dump_json(),
+                     None if ttl is None else entry[0] + ttl),
+                )
+                self._prune_disk(entry[0])
+                self._db.commit()
+
+    def _prune_disk(self, now: float) -> None:
+        self._db.execute("DELETE FROM tool_cache WHERE expires_at < ?", (now,))
+        (count,) = self._db.execute("SELECT COUNT(*) FROM tool_cache").fetchone()
+        if count > self.max_disk_entries:
+            self._db.execute(
+                "DELETE FROM tool_cache WHERE key IN "
+                "(SELECT key FROM tool_cache ORDER BY stored_at LIMIT ?)",
+                (count - self.max_disk_entries,),
+            )
+            self.evictions += count - self.max_disk_entries
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "expired": self.expired,
+            "invalidated": self.invalidated,
+            "evictions": self.evictions,
+            "entries": len(self._memory),
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM tool_cache")
+                self._db.commit()
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
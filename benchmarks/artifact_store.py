@@ -0,0 +1,71 @@
+"""Storing, finding and listing generated images: flat timestamped files vs ArtifactStore.
+
+Writes `--artifacts` small fake images both ways. The flat layout lists the
+most recent `--page` by scanning and stat-ing the directory, as browsing
+generated_images/ did. The store reads them from its index. A repeated prompt
+is a single indexed lookup.
+
+    python -m benchmarks.artifact_store --artifacts 5000 --page 50
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from media.store import ArtifactStore
+
+
+def timed(label: str, fn, repeat: int = 1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"{label:<36} {elapsed * 1000:9.2f}ms")
+    return result
+
+
+def flat_recent(root: Path, page: int):
+    entries = [(e.stat().st_mtime, e.path) for e in os.scandir(root) if e.is_file()]
+    return sorted(entries, reverse=True)[:page]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Artifact store benchmark")
+    parser.add_argument("--artifacts", type=int, default=5000)
+    parser.add_argument("--page", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    params = {"size": "1024x1024", "quality": "standard"}
+    prompts = [f"a {rng.choice(['red', 'blue', 'green'])} fox number {i} in the snow" for i in range(args.artifacts)]
+    images = [rng.randbytes(2048) for _ in prompts]
+    with tempfile.TemporaryDirectory() as tmp:
+        flat, root = Path(tmp) / "flat", Path(tmp) / "store"
+        flat.mkdir()
+
+        def write_flat():
+            for i, image in enumerate(images):
+                # Distinct names here; the real timestamp names collide within a second
+                (flat / f"image_20250101_{i:06d}.png").write_bytes(image)
+
+        def write_store():
+            store = ArtifactStore(root)
+            for prompt, image in zip(prompts, images):
+                store.put_bytes(image, ".png", prompt, "dall-e-3", params)
+            return store
+
+        timed(f"write {args.artifacts} flat files", write_flat)
+        store = timed(f"write {args.artifacts} into store", write_store)
+        timed(f"list latest {args.page}, flat scan", lambda: flat_recent(flat, args.page), repeat=5)
+        timed(f"list latest {args.page}, store index", lambda: store.list(limit=args.page), repeat=5)
+        hit = timed("lookup repeated prompt", lambda: store.lookup(prompts[123], "dall-e-3", params), repeat=100)
+        assert hit is not None and hit.path.read_bytes() == images[123]
+        assert store.lookup(prompts[123], "dall-e-3", {**params, "quality": "hd"}) is None
+        largest = max(len(os.listdir(d)) for d in root.glob("??/??"))
+        print(f"{store.count()} indexed, largest shard holds {largest} files")
+
+
+if __name__ == "__main__":
+    main()
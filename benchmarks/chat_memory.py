@@ -0,0 +1,106 @@
+"""Prompt size and turn latency of a long chat with and without ConversationMemory.
+
+Runs `--turns` turns through the agent ReAct graph (agent/graph_factory.py)
+with a stub model that calls one tool per turn and gives a long answer. Each
+model call costs `--token-latency` seconds per prompt token, like prefill on
+a real provider. The summarizer takes `--summary-latency` seconds. The run
+fails if summarizing ever blocks a turn, or if a window contains a tool
+result without the assistant message that asked for it. "unsummarized" is
+the most messages that ever fell out of the window before the summary
+caught up; it stays 0 unless one summary takes longer than a full budget's
+worth of turns.
+
+    python -m benchmarks.chat_memory --turns 200 --max-tokens 3000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.tools import tool
+
+from agent.graph_factory import build_graph
+from benchmarks.stubs import StubToolCallingModel
+from graph.memory import ConversationMemory, message_tokens
+
+ANSWER = "Based on the lookup, here is a detailed answer with a few numbers: 42, 17 and 3.5. " * 8
+CHECKPOINTS = (10, 50, 100, 200, 500)
+
+
+@tool
+def lookup(query: str) -> str:
+    """Look something up."""
+    return f"Found three records matching {query}: alpha=1, beta=2, gamma=3."
+
+
+class MeteredModel(StubToolCallingModel):
+    """Stub that records prompt sizes and charges latency per prompt token."""
+
+    prompt_tokens: List[int] = []
+    orphans: int = 0
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> ChatResult:
+        tokens = sum(message_tokens(m) for m in messages)
+        self.prompt_tokens.append(tokens)
+        asked = set()
+        for message in messages:
+            if isinstance(message, AIMessage):
+                asked.update(call["id"] for call in message.tool_calls)
+            elif isinstance(message, ToolMessage) and message.tool_call_id not in asked:
+                self.orphans += 1
+        await asyncio.sleep(self.token_latency * tokens)
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+
+async def run(turns: int, token_latency: float, memory: Optional[ConversationMemory]):
+    model = MeteredModel(tool_calls=[{"name": "lookup", "args": {"query": "status"}}],
+                         answer=ANSWER, token_latency=token_latency)
+    graph = build_graph(model, [lookup])
+    config = {"configurable": {"memory": memory}} if memory else {}
+    messages, latencies = [], []
+    for turn in range(turns):
+        start = time.perf_counter()
+        result = await graph.ainvoke({"messages": messages + [HumanMessage(content=f"Question {turn}: what changed?")]},
+                                     config)
+        latencies.append(time.perf_counter() - start)
+        messages = result["messages"]
+    if memory:
+        await memory.wait()
+    # Two model calls per turn; report the one answering the question
+    return model.prompt_tokens[1::2], latencies, model.orphans
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chat history memory benchmark")
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--max-tokens", type=int, default=3000)
+    parser.add_argument("--token-latency", type=float, default=0.00001)
+    parser.add_argument("--summary-latency", type=float, default=0.3)
+    args = parser.parse_args()
+
+    summarizer = StubToolCallingModel(answer="The user asked about status updates; lookups returned "
+                                             "alpha=1, beta=2, gamma=3 each time. " * 4,
+                                      latency=args.summary_latency)
+    memory = ConversationMemory(max_tokens=args.max_tokens, summarizer=summarizer)
+    results = {
+        "full history": asyncio.run(run(args.turns, args.token_latency, None)),
+        "ConversationMemory": asyncio.run(run(args.turns, args.token_latency, memory)),
+    }
+
+    marks = [t for t in CHECKPOINTS if t <= args.turns]
+    print(f"{'prompt tokens at turn':<22} " + " ".join(f"{t:>7}" for t in marks) + "      max  turn p50  turn max")
+    for label, (tokens, latencies, orphans) in results.items():
+        assert orphans == 0, f"{label}: {orphans} tool results sent without their tool call"
+        print(f"{label:<22} " + " ".join(f"{tokens[t - 1]:>7}" for t in marks)
+              + f"  {max(tokens):>7}  {statistics.median(latencies) * 1000:6.1f}ms  {max(latencies) * 1000:6.1f}ms")
+    # A blocking summary would add summary_latency to some turn
+    assert max(results["ConversationMemory"][1]) < args.summary_latency, "a turn waited for the summarizer"
+    print(f"\nfolds {memory.folds}, unsummarized {memory.dropped} messages, "
+          f"summary {message_tokens(HumanMessage(content=memory.summary))} tokens")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Write amplification, disk use and resume latency of the SQLite checkpointer.
+
+Runs a `--turns` turn chat (add_messages history plus two small channels)
+through three savers:
+- InMemorySaver, as the reference.
+- SqliteCheckpointer with delta encoding off, so every changed channel is rewritten whole.
+- The default SqliteCheckpointer.
+
+Write amplification is bytes written per byte of new messages. Each chat
+thread's final state must match the reference. Then a graph is paused at
+`interrupt()` in one process and resumed from the database in a fresh one.
+
+    python -m benchmarks.checkpointer --turns 200
+"""
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Annotated, List, TypedDict
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.message import add_messages
+from langgraph.types import Command, interrupt
+
+from graph.checkpoint import RetentionPolicy, SqliteCheckpointer
+
+ANSWER = "Here is a fairly detailed answer that a chat model might give. " * 6
+
+
+class ChatState(TypedDict):
+    messages: Annotated[List, add_messages]
+    turns: int
+    topic: str
+
+
+def chat(state: ChatState) -> dict:
+    return {"messages": [AIMessage(content=ANSWER)], "turns": state.get("turns", 0) + 1}
+
+
+def chat_graph(checkpointer):
+    builder = StateGraph(ChatState)
+    builder.add_node("chat", chat)
+    builder.add_edge(START, "chat")
+    builder.add_edge("chat", END)
+    return builder.compile(checkpointer=checkpointer)
+
+
+class ApprovalState(TypedDict):
+    request: str
+    approved: bool
+
+
+def approval_graph(checkpointer):
+    builder = StateGraph(ApprovalState)
+    builder.add_node("ask", lambda state: {"approved": interrupt(f"Approve {state['request']}?")})
+    builder.add_edge(START, "ask")
+    builder.add_edge("ask", END)
+    return builder.compile(checkpointer=checkpointer)
+
+
+def run_chat(checkpointer, turns: int):
+    graph = chat_graph(checkpointer)
+    config = {"configurable": {"thread_id": "chat"}}
+    logical = 0
+    start = time.perf_counter()
+    for i in range(turns):
+        message = HumanMessage(content=f"Question number {i}: what about the next step?")
+        graph.invoke({"messages": [message], "topic": "planning"}, config)
+        logical += sum(len(json.dumps(m.model_dump(), default=str)) for m in (message, AIMessage(content=ANSWER)))
+    values = graph.get_state(config).values
+    # Message ids are random per run; compare everything else
+    values["messages"] = [(m.type, m.content) for m in values["messages"]]
+    return values, logical, time.perf_counter() - start
+
+
+def resume_child(db: str, phase: str) -> None:
+    """Runs in a fresh interpreter: start a run that pauses, or resume it."""
+    graph = approval_graph(SqliteCheckpointer(db))
+    config = {"configurable": {"thread_id": "approval"}}
+    if phase == "start":
+        graph.invoke({"request": "deploy"}, config)
+        return
+    start = time.perf_counter()
+    result = graph.invoke(Command(resume=True), config)
+    print(json.dumps({"seconds": time.perf_counter() - start, "approved": result["approved"]}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite checkpointer benchmark")
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--keep-last", type=int, default=20)
+    parser.add_argument("--resume-child", nargs=2, metavar=("DB", "PHASE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.resume_child:
+        return resume_child(*args.resume_child)
+
+    reference, logical, seconds = run_chat(InMemorySaver(), args.turns)
+    print(f"{'InMemorySaver':<26} {seconds:6.2f}s")
+    with tempfile.TemporaryDirectory() as tmp:
+        savers = {
+            "sqlite, no deltas": SqliteCheckpointer(Path(tmp) / "full.sqlite", max_delta_depth=0, compact_every=0),
+            "sqlite": SqliteCheckpointer(Path(tmp) / "delta.sqlite",
+                                         retention=RetentionPolicy(keep_last=args.keep_last)),
+        }
+        for label, saver in savers.items():
+            values, _, seconds = run_chat(saver, args.turns)
+            assert values == reference, f"{label}: state differs from InMemorySaver"
+            saver.vacuum()
+            stats = saver.stats()
+            config = {"configurable": {"thread_id": "chat"}}
+            start = time.perf_counter()
+            for _ in range(20):
+                saver.get_tuple(config)
+            load_ms = (time.perf_counter() - start) / 20 * 1000
+            print(f"{label:<26} {seconds:6.2f}s  written {stats['bytes_written'] / 2**20:7.2f}MB  "
+                  f"amplification {stats['bytes_written'] / logical:6.1f}x  "
+                  f"file {saver.path.stat().st_size / 2**20:6.2f}MB  checkpoints {stats['checkpoints']:4d}  "
+                  f"load latest {load_ms:5.2f}ms")
+            saver.close()
+
+        db = str(Path(tmp) / "approval.sqlite")
+        child = [sys.executable, "-m", "benchmarks.checkpointer", "--resume-child", db]
+        subprocess.run(child + ["start"], check=True)
+        start = time.perf_counter()
+        output = subprocess.run(child + ["resume"], check=True, capture_output=True, text=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        assert result["approved"] is True
+        print(f"resume after restart: {result['seconds'] * 1000:.1f}ms in the new process "
+              f"({time.perf_counter() - start:.2f}s including interpreter start-up)")
+
+
+if __name__ == "__main__":
+    main()
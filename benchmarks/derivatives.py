@@ -0,0 +1,91 @@
+"""Building thumbnails and previews for generated images.
+
+Stores `--images` synthetic 1792x1024 PNGs (roughly DALL-E sized) in a temporary
+ArtifactStore. A naive pass resizes each size from the full image with
+LANCZOS. That is compared with `build_derivatives` (reduce, then cascade)
+sequentially and in a `DerivativePool` of `--workers` processes. A second
+pool run shows that finished artifacts are skipped. Reports the bytes a
+dashboard would ship per image.
+
+    python -m benchmarks.derivatives --images 24 --workers 4
+"""
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from PIL import Image, ImageDraw, ImageFilter
+
+from media.derivatives import DERIVATIVES, DerivativePool, build_derivatives, derivative_path
+from media.store import ArtifactStore
+
+
+def fake_image(rng: random.Random) -> Image.Image:
+    image = Image.effect_noise((1792, 1024), 40).convert("RGB")
+    draw = ImageDraw.Draw(image)
+    for _ in range(60):
+        x, y = rng.randrange(1792), rng.randrange(1024)
+        r = rng.randrange(20, 200)
+        draw.ellipse((x - r, y - r, x + r, y + r), fill=tuple(rng.randrange(256) for _ in range(3)))
+    return image.filter(ImageFilter.GaussianBlur(2))
+
+
+def naive(artifacts, out: Path) -> None:
+    for artifact in artifacts:
+        for spec in DERIVATIVES:
+            with Image.open(artifact.path) as image:
+                image = image.convert("RGB")
+                scale = spec.max_size / max(image.size)
+                image.resize((round(image.width * scale), round(image.height * scale)),
+                             Image.Resampling.LANCZOS).save(out / f"{artifact.hash}.{spec.name}{spec.ext}",
+                                                            format=spec.format, quality=spec.quality)
+
+
+def timed(label: str, fn) -> None:
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {elapsed:6.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Thumbnail/preview pipeline benchmark")
+    parser.add_argument("--images", type=int, default=24)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ArtifactStore(Path(tmp) / "store")
+        artifacts = []
+        for i in range(args.images):
+            staging = store.staging_path(".png")
+            fake_image(rng).save(staging)
+            artifacts.append(store.put_file(staging, f"prompt {i}", "dall-e-3"))
+        (Path(tmp) / "naive").mkdir()
+
+        timed("naive resize from original", lambda: naive(artifacts, Path(tmp) / "naive"))
+
+        sequential_root = Path(tmp) / "sequential"
+        timed("reduce + cascade, in process",
+              lambda: [build_derivatives(str(a.path), a.hash, str(sequential_root)) for a in artifacts])
+
+        def pooled():
+            pool = DerivativePool(store.root, workers=args.workers)
+            for artifact in artifacts:
+                pool.submit(artifact)
+            pool.close()
+
+        timed(f"DerivativePool, workers={args.workers}", pooled)
+        timed("DerivativePool again (all built)", pooled)
+
+        original = sum(a.size for a in artifacts) / len(artifacts)
+        print(f"\nper image: original png {original / 1024:7.0f}KB")
+        for spec in DERIVATIVES:
+            size = sum(derivative_path(store.root, a.hash, spec).stat().st_size for a in artifacts) / len(artifacts)
+            print(f"           {spec.name:<12} {size / 1024:7.0f}KB  ({spec.format} <= {spec.max_size}px)")
+
+
+if __name__ == "__main__":
+    main()
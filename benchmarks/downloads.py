@@ -0,0 +1,138 @@
+"""Image downloads: one-shot `requests.get` vs the pooled streaming downloader.
+
+Serves `--files` random bodies of `--size-mb` MB from a local HTTP server that
+waits `--latency` seconds before each response. The old path (a fresh
+connection, the whole body in memory, one write, one file at a time) is
+compared with `media.download.Downloader`. The downloader is then rerun while
+`--fail-rate` of responses are 503s or cut off halfway through the body, and
+every file is checked against its checksum.
+
+    python -m benchmarks.downloads --files 16 --size-mb 8 --fail-rate 0.2
+"""
+import argparse
+import asyncio
+import hashlib
+import random
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+
+from media.download import DownloadOptions, Downloader
+
+
+class StandIn(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, bodies, latency: float):
+        super().__init__(("127.0.0.1", 0), Handler)
+        self.bodies = bodies
+        self.latency = latency
+        self.fail_rate = 0.0
+        self.rng = random.Random(0)
+        self.lock = threading.Lock()
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server: StandIn = self.server
+        body = server.bodies[int(self.path.rsplit("/", 1)[1])]
+        time.sleep(server.latency)
+        with server.lock:
+            roll = server.rng.random()
+        if roll < server.fail_rate / 2:
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.send_header("Retry-After", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "image/png")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if roll < server.fail_rate:
+            self.wfile.write(body[:len(body) // 2])
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+
+def requests_get(urls, out: Path) -> None:
+    for i, url in enumerate(urls):
+        response = requests.get(url, timeout=10)
+        response.raise_for_status()
+        with open(out / f"image_{i}.png", "wb") as f:
+            f.write(response.content)
+
+
+def downloader_get(urls, out: Path, concurrency: int) -> Downloader:
+    async def run():
+        options = DownloadOptions(max_concurrency=concurrency, backoff=0.05)
+        async with Downloader(options) as downloader:
+            await downloader.download_many((url, out / f"image_{i}.png") for i, url in enumerate(urls))
+            return downloader
+    return asyncio.run(run())
+
+
+def measure(label: str, fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<34} {elapsed:6.2f}s  peak {peak / 2**20:7.1f}MB")
+    return result
+
+
+def verify(out: Path, digests) -> None:
+    for i, digest in enumerate(digests):
+        assert hashlib.sha256((out / f"image_{i}.png").read_bytes()).hexdigest() == digest, f"image_{i}.png differs"
+    assert not list(out.glob(".*.part")), "leftover .part files"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Download path benchmark")
+    parser.add_argument("--files", type=int, default=16)
+    parser.add_argument("--size-mb", type=float, default=8)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds before each response starts")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--fail-rate", type=float, default=0.2)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    bodies = [rng.randbytes(int(args.size_mb * 2**20)) for _ in range(args.files)]
+    digests = [hashlib.sha256(body).hexdigest() for body in bodies]
+    server = StandIn(bodies, args.latency)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    urls = [f"http://127.0.0.1:{server.server_address[1]}/image/{i}" for i in range(args.files)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ("requests", "downloader", "faults"):
+            (Path(tmp) / name).mkdir()
+        measure("requests.get, sequential", lambda: requests_get(urls, Path(tmp) / "requests"))
+        verify(Path(tmp) / "requests", digests)
+
+        measure(f"Downloader, concurrency={args.concurrency}",
+                lambda: downloader_get(urls, Path(tmp) / "downloader", args.concurrency))
+        verify(Path(tmp) / "downloader", digests)
+
+        server.fail_rate = args.fail_rate
+        downloader = measure(f"Downloader, {args.fail_rate:.0%} failed responses",
+                             lambda: downloader_get(urls, Path(tmp) / "faults", args.concurrency))
+        verify(Path(tmp) / "faults", digests)
+        print(f"retries={downloader.retries}, all {args.files} files intact")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
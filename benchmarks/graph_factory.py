@@ -0,0 +1,48 @@
+"""Microbenchmark: bind + compile per request vs the cached GraphFactory.
+
+    python -m benchmarks.graph_factory --iterations 200 --tools 20
+"""
+import argparse
+import time
+
+from langchain_core.tools import StructuredTool
+
+from agent.graph_factory import GraphFactory, build_graph
+from benchmarks.stubs import StubToolCallingModel
+
+
+def make_tools(count: int):
+    def make(i):
+        def fn(path: str, limit: int = 10) -> str:
+            return path
+        return StructuredTool.from_function(fn, name=f"tool_{i}", description=f"Fake tool number {i}.")
+    return [make(i) for i in range(count)]
+
+
+def timed(label: str, iterations: int, fn) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    per_call = (time.perf_counter() - start) / iterations
+    print(f"{label:<10} {per_call * 1e6:10.1f}us/request")
+    return per_call
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Graph factory microbenchmark")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--tools", type=int, default=20)
+    args = parser.parse_args()
+
+    llm = StubToolCallingModel()
+    tools = make_tools(args.tools)
+    factory = GraphFactory()
+
+    factory.get(llm, tools)  # first request compiles
+    uncached = timed("uncached", args.iterations, lambda: build_graph(llm, tools))
+    cached = timed("cached", args.iterations, lambda: factory.get(llm, tools))
+    print(f"speedup    {uncached / cached:10.1f}x  (hits={factory.hits}, misses={factory.misses})")
+
+
+if __name__ == "__main__":
+    main()
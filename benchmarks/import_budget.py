@@ -0,0 +1,65 @@
+"""Fail if an entry point's cumulative import time goes over its budget.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter and
+reads the cumulative time of the top-level module from stderr. Anything that
+pulls langchain/langgraph/openai back in at import time blows these budgets
+by an order of magnitude.
+
+    python -m benchmarks.import_budget            # exit code 1 on regression
+    python -m benchmarks.import_budget --runs 5
+"""
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Cumulative import time budgets in milliseconds (measured at 15-70ms)
+BUDGETS = {
+    "llms.registry": 100,
+    "llms.openai_gpt_4o": 100,
+    "llms.llama_local": 100,
+    "graph.chat": 100,
+    "agent.mcp_config.config": 100,
+    "agent.chat_graph": 250,
+    "agent.client": 250,
+    "agent.server": 250,
+}
+
+_LINE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \|\s*(\S+)")
+
+
+def import_time(module: str) -> float:
+    """Cumulative milliseconds spent importing `module` in a fresh interpreter."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match and match.group(2) == module:
+            return int(match.group(1)) / 1000
+    raise RuntimeError(f"No importtime line for {module}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import time regression check")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    failed = []
+    for module, budget in BUDGETS.items():
+        elapsed = statistics.median(import_time(module) for _ in range(args.runs))
+        status = "ok" if elapsed <= budget else "OVER"
+        print(f"{module:<28} {elapsed:8.1f}ms  budget {budget:4d}ms  {status}")
+        if elapsed > budget:
+            failed.append(module)
+
+    if failed:
+        print(f"Over budget: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Latency of repeated prompts with and without the LLM response cache.
+
+Replays a small prompt mix (the enhancement system prompt with a handful of
+user prompts, some repeated verbatim and some with extra whitespace/casing)
+against a stub model with `--llm-latency` seconds per call.
+
+    python -m benchmarks.llm_cache --requests 200
+"""
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.stubs import BagOfWordsEmbeddings, StubToolCallingModel
+from llms.response_cache import ResponseCache
+
+SYSTEM = ("You are an expert prompt engineer. Your task is to enhance the given prompt to create better image "
+          "generation results. Make it more detailed and specific, but keep the original intent, and return "
+          "updated promp only.")
+PROMPTS = [
+    "a cat sitting on a red sofa",
+    "sunset over the mountains with a lake",
+    "a futuristic city at night in the rain",
+    "portrait of an old fisherman smiling",
+    "a bowl of ramen on a wooden table",
+]
+
+
+def workload(requests: int) -> list:
+    rng = random.Random(0)
+    variants = []
+    for _ in range(requests):
+        prompt = rng.choice(PROMPTS)
+        # Same request phrased slightly differently
+        if rng.random() < 0.3:
+            prompt = prompt.capitalize() + " please"
+        variants.append([
+            {"role": "system", "content": SYSTEM},
+            {"role": "user", "content": f"Enhance this image generation prompt: {prompt}"},
+        ])
+    return variants
+
+
+def run(label: str, llm, requests: list, cache=None) -> None:
+    start = time.perf_counter()
+    for messages in requests:
+        llm.invoke(messages)
+    elapsed = time.perf_counter() - start
+    extra = ""
+    if cache is not None:
+        stats = cache.stats()
+        extra = f"  hits={stats['hits']} (semantic {stats['semantic_hits']}) misses={stats['misses']}"
+        if cache.embeddings is not None:
+            extra += f" embedding calls={cache.embeddings.calls}"
+    print(f"{label:<10} {elapsed:7.2f}s  {elapsed / len(requests) * 1000:7.1f}ms/request{extra}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LLM response cache benchmark")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    requests = workload(args.requests)
+    with tempfile.TemporaryDirectory() as tmp:
+        run("no cache", StubToolCallingModel(latency=args.llm_latency), requests)
+
+        exact = ResponseCache(path=Path(tmp) / "exact.sqlite")
+        run("exact", StubToolCallingModel(latency=args.llm_latency, cache=exact), requests, exact)
+
+        semantic = ResponseCache(path=Path(tmp) / "semantic.sqlite", mode="semantic",
+                                 embeddings=BagOfWordsEmbeddings(), threshold=0.8)
+        run("semantic", StubToolCallingModel(latency=args.llm_latency, cache=semantic), requests, semantic)
+
+
+if __name__ == "__main__":
+    main()
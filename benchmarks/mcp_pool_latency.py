@@ -0,0 +1,48 @@
+"""Per-turn latency of chat_graph with and without the MCP session pool.
+
+Uses the calculator MCP server and a stub LLM so it runs offline:
+
+    python -m benchmarks.mcp_pool_latency --turns 5
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from agent.chat_graph import chat_graph, close_pool
+from benchmarks.stubs import StubToolCallingModel
+
+CALCULATOR = Path(__file__).resolve().parent.parent / "mcp-server" / "calculator.py"
+
+
+async def run(turns: int, use_pool: bool) -> list:
+    connections = {"calculator": {"transport": "stdio", "command": sys.executable, "args": [str(CALCULATOR)]}}
+    llm = StubToolCallingModel(tool_calls=[{"name": "add_numbers", "args": {"a": 2, "b": 3}}])
+    latencies = []
+    for _ in range(turns):
+        start = time.perf_counter()
+        await chat_graph("What is 2 + 3?", use_pool=use_pool, connections=connections, llm=llm)
+        latencies.append(time.perf_counter() - start)
+    await close_pool()
+    return latencies
+
+
+def report(label: str, latencies: list) -> None:
+    print(f"{label:<10} first={latencies[0] * 1000:8.1f}ms  "
+          f"median={statistics.median(latencies) * 1000:8.1f}ms  "
+          f"rest-median={statistics.median(latencies[1:] or latencies) * 1000:8.1f}ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="MCP pool per-turn latency")
+    parser.add_argument("--turns", type=int, default=5)
+    args = parser.parse_args()
+
+    report("no pool", await run(args.turns, use_pool=False))
+    report("pool", await run(args.turns, use_pool=True))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
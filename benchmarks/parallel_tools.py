@@ -0,0 +1,59 @@
+"""Wall-clock of turns where the model asks for several tool calls at once.
+
+The stub model emits `--calls` slow_echo calls per turn against
+benchmarks/slow_server.py. Runs with a per-server cap of 1 (serial) and of
+`--calls` (parallel), then a turn where one call hangs and is cut off by its
+timeout while the others complete.
+
+    python -m benchmarks.parallel_tools --calls 8 --delay 0.2
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+from langchain_core.messages import HumanMessage, ToolMessage
+
+from agent.chat_graph import run_turn, close_pool
+from benchmarks.stubs import StubToolCallingModel
+
+SLOW_SERVER = Path(__file__).resolve().parent / "slow_server.py"
+
+
+async def turn(calls: list, limits: dict, turns: int) -> tuple:
+    connections = {"slow": {"transport": "stdio", "command": sys.executable, "args": [str(SLOW_SERVER)], "pool": limits}}
+    llm = StubToolCallingModel(tool_calls=calls)
+    # The first turn also starts the server; time the rest
+    await run_turn([HumanMessage(content="warm up")], connections=connections, llm=llm)
+    start = time.perf_counter()
+    for _ in range(turns):
+        messages = await run_turn([HumanMessage(content="go")], connections=connections, llm=llm)
+    elapsed = (time.perf_counter() - start) / turns
+    await close_pool()
+    errors = sum(1 for m in messages if isinstance(m, ToolMessage) and m.status == "error")
+    return elapsed, errors
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Parallel tool execution benchmark")
+    parser.add_argument("--calls", type=int, default=8)
+    parser.add_argument("--delay", type=float, default=0.2)
+    parser.add_argument("--turns", type=int, default=3)
+    args = parser.parse_args()
+
+    calls = [{"name": "slow_echo", "args": {"text": f"call {i}", "delay": args.delay}} for i in range(args.calls)]
+
+    serial, _ = await turn(calls, {"max_concurrency": 1}, args.turns)
+    parallel, _ = await turn(calls, {"max_concurrency": args.calls}, args.turns)
+    print(f"serial     {serial * 1000:8.1f}ms/turn")
+    print(f"parallel   {parallel * 1000:8.1f}ms/turn  ({serial / parallel:.1f}x)")
+
+    hung_calls = calls[:-1] + [{"name": "hang", "args": {"text": "stuck"}}]
+    limits = {"max_concurrency": args.calls, "tool_timeouts": {"hang": args.delay * 3}, "max_consecutive_timeouts": 1000}
+    hung, errors = await turn(hung_calls, limits, 1)
+    print(f"one hung   {hung * 1000:8.1f}ms/turn  ({errors} call timed out, the rest completed)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,129 @@
+"""Provider prompt-cache hits for three ways of laying out the PRD prompt.
+
+Stub providers cache prompts in two ways:
+- "openai": by token prefix, at least 1024 tokens, in 128-token steps.
+- "ollama": the longest token prefix shared with the previous request (the KV cache of a loaded model).
+
+They report `cache_read` in their usage and charge `--token-latency` seconds
+per uncached input token. `--topics` PRD requests go through each with each
+layout. They use the real instruction/create-prd.mdc and generate-tasks.mdc
+templates, which together are over OpenAI's 1024-token caching minimum:
+- "topic first": the topic, then the template, in one user message.
+- "template in user message": createPRD's old layout, with a short system prompt and then template + topic.
+- "PromptLayout": system prompt and template in a static system message, then the topic.
+
+PrefixMetrics records the same calls. Its "repeated prefix" share counts
+whole repeated messages and the common token prefix with the previous
+request, so it tracks what the ollama stub reuses.
+
+    python -m benchmarks.prompt_cache --topics 50
+"""
+import argparse
+import asyncio
+import hashlib
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from llms.prompt_cache import PrefixMetrics, PromptLayout
+from llms.tokens import get_encoding
+
+INSTRUCTIONS = Path(__file__).resolve().parent.parent / "instruction"
+# The PRD template alone is just under 1024 tokens, too short for OpenAI to cache at all
+TEMPLATE = "\n\n".join((INSTRUCTIONS / name).read_text(encoding="utf-8") for name in ("create-prd.mdc", "generate-tasks.mdc"))
+SYSTEM = "You are a professional project manager creating a PRD. Follow the template exactly and be thorough."
+
+
+class PrefixCachingModel(BaseChatModel):
+    """Stub provider with a prompt prefix cache."""
+
+    token_latency: float = 0.0
+    kv_cache: bool = False      # ollama-style: reuse only the previous request's prefix
+    min_prefix: int = 1024
+    step: int = 128
+    prefixes: set = set()      # not `cache`: BaseChatModel uses that field
+    last: list = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub-prefix-cache"
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {"model": "stub-prefix-cache"}
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> ChatResult:
+        tokens = []
+        for message in messages:
+            tokens += [f"<{message.type}>"] + get_encoding().encode(str(message.content), disallowed_special=())
+        cached = 0
+        if self.kv_cache:
+            while cached < min(len(tokens), len(self.last)) and tokens[cached] == self.last[cached]:
+                cached += 1
+            self.last = tokens
+        for end in range(self.min_prefix, len(tokens) + 1, self.step) if not self.kv_cache else ():
+            digest = hashlib.sha256("\0".join(map(str, tokens[:end])).encode("utf-8")).hexdigest()
+            if digest in self.prefixes:
+                cached = end
+            else:
+                self.prefixes.add(digest)
+        await asyncio.sleep(self.token_latency * (len(tokens) - cached))
+        message = AIMessage(content="# PRD\n...", usage_metadata={
+            "input_tokens": len(tokens), "output_tokens": 3, "total_tokens": len(tokens) + 3,
+            "input_token_details": {"cache_read": cached},
+        })
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> ChatResult:
+        return asyncio.run(self._agenerate(messages, stop, **kwargs))
+
+
+def topic_first(topic: str) -> list:
+    return [HumanMessage(content=f"Create a detailed PRD document for: {topic}\n\nUse this template:\n\n{TEMPLATE}")]
+
+
+def template_in_user_message(topic: str) -> list:
+    return [SystemMessage(content=SYSTEM),
+            HumanMessage(content=f"Using this template:\n\n{TEMPLATE}\n\nCreate a detailed PRD document for: {topic}")]
+
+
+LAYOUT = PromptLayout(system=SYSTEM, templates=(f"Use this template:\n\n{TEMPLATE}",))
+
+
+def prompt_layout(topic: str) -> list:
+    return LAYOUT.messages(f"Create a detailed PRD document for: {topic}")
+
+
+async def run(build, topics: List[str], token_latency: float, kv_cache: bool):
+    model = PrefixCachingModel(token_latency=token_latency, kv_cache=kv_cache, prefixes=set(), last=[])
+    metrics = PrefixMetrics()
+    start = time.perf_counter()
+    for topic in topics:
+        await model.ainvoke(build(topic), config={"callbacks": [metrics]})
+    return metrics.totals(), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prompt prefix caching benchmark")
+    parser.add_argument("--topics", type=int, default=50)
+    parser.add_argument("--token-latency", type=float, default=0.00005)
+    args = parser.parse_args()
+
+    topics = [f"topic {i}: an app for tracking habit number {i}" for i in range(args.topics)]
+    print(f"template {LAYOUT.prefix_tokens} tokens, {args.topics} topics\n")
+    print(f"{'provider':<8} {'layout':<26} {'input':>8} {'cached':>8} {'uncached':>9} {'repeated prefix':>16} {'time':>7}")
+    for provider in ("openai", "ollama"):
+        for label, build in [("topic first", topic_first), ("template in user message", template_in_user_message),
+                             ("PromptLayout", prompt_layout)]:
+            totals, seconds = asyncio.run(run(build, topics, args.token_latency, provider == "ollama"))
+            share = totals["prefix_tokens"] / totals["input_tokens"]
+            print(f"{provider:<8} {label:<26} {totals['input_tokens']:>8} {totals['cached_tokens']:>8} "
+                  f"{totals['uncached_tokens']:>9} {share:>16.0%} {seconds:>6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Retrieval latency for a skewed query mix with and without the RAG caches.
+
+Hot support queries are asked far more often than the rest (Zipf). Each
+embedding call costs `--embed-latency` seconds. After the cached run, one
+file is edited and re-ingested; the run fails unless the retrieval cache is
+invalidated and the new chunk comes back.
+
+    python -m benchmarks.rag_cache --queries 500
+"""
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.rag_ingest import WORDS, write_corpus
+from benchmarks.stubs import BagOfWordsEmbeddings
+from rag.cache import CachedEmbeddings, CachedRetriever
+from rag.ingest import collection_version, ingest_directory
+from rag.pipeline import chroma_retriever
+
+HOT = ["how to reset password", "How to reset password?", "vpn access request", "expense report deadline"]
+
+
+def workload(n: int, rng: random.Random) -> list:
+    tail = [" ".join(rng.choices(WORDS, k=5)) for _ in range(200)]
+    queries = HOT + tail
+    weights = [1 / (rank + 1) for rank in range(len(queries))]
+    return rng.choices(queries, weights=weights, k=n)
+
+
+def run(label: str, retriever, queries: list, embeddings) -> None:
+    calls = embeddings.calls
+    start = time.perf_counter()
+    for query in queries:
+        retriever.invoke(query)
+    elapsed = time.perf_counter() - start
+    extra = f"  {retriever.stats()}" if hasattr(retriever, "stats") else ""
+    print(f"{label:<22} {elapsed:7.2f}s  {elapsed / len(queries) * 1000:7.2f}ms/query  "
+          f"embed_calls={embeddings.calls - calls}{extra}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RAG embedding/retrieval cache benchmark")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--embed-latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    queries = workload(args.queries, rng)
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus, store = Path(tmp) / "corpus", Path(tmp) / "chroma"
+        corpus.mkdir()
+        write_corpus(corpus, 50, rng)
+        raw = BagOfWordsEmbeddings(dim=128, latency=args.embed_latency)
+        embeddings = CachedEmbeddings(raw, path=Path(tmp) / "embeddings.sqlite")
+        ingest_directory(corpus, store, embeddings)
+
+        run("no cache", chroma_retriever(str(store), raw), queries, raw)
+        run("embedding cache", chroma_retriever(str(store), embeddings), queries, raw)
+        cached = CachedRetriever(retriever=chroma_retriever(str(store), embeddings),
+                                 version=lambda: collection_version(store))
+        run("embedding + retrieval", cached, queries, raw)
+
+        # Words no other chunk has, so the stub embedding ranks the new chunk first
+        query = "quarterly offsite agenda"
+        before = cached.invoke(query)
+        assert not any("offsite agenda" in d.page_content for d in before)
+        path = sorted(corpus.iterdir())[0]
+        path.write_text(path.read_text() + "\nQ: Where is the quarterly offsite agenda?\n"
+                                           "A: The quarterly offsite agenda is on the intranet.\n")
+        ingest_directory(corpus, store, embeddings)
+        docs = cached.invoke(query)
+        assert "offsite agenda" in docs[0].page_content, "the retrieval cache served results from before the re-ingest"
+        print(f"after re-ingest: invalidations={cached.stats()['invalidations']}, new chunk ranked first")
+
+if __name__ == "__main__":
+    main()
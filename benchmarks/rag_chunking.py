@@ -0,0 +1,78 @@
+"""Peak memory and throughput of streaming vs whole-file chunking.
+
+Writes `--files` synthetic Q&A files of `--file-mb` MB each. It first compares
+the peak Python memory (tracemalloc) of reading and splitting one file whole,
+as embed_text() used to, against `iter_chunks` and against a full Ingestor
+run on that file (cheap stub embeddings; Chroma's own native memory is not
+traced). It then times chunking the
+whole corpus in this process and across `--workers` processes. Worker start-up
+(~1s per process with spawn) is included.
+
+    python -m benchmarks.rag_chunking --files 16 --file-mb 8 --workers 4
+"""
+import argparse
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.rag_ingest import TOPICS, WORDS
+from benchmarks.stubs import BagOfWordsEmbeddings
+from rag.chunking import iter_chunks, stream_chunks
+from rag.ingest import IngestOptions, Ingestor
+
+
+def write_file(path: Path, size: int, rng: random.Random) -> None:
+    with open(path, "w") as f:
+        written = 0
+        while written < size:
+            block = f"[{rng.choice(TOPICS)}]\n" + "".join(
+                f"Q: {' '.join(rng.choices(WORDS, k=8))}?\nA: {' '.join(rng.choices(WORDS, k=25))}.\n\n" for _ in range(50)
+            )
+            f.write(block)
+            written += len(block)
+
+
+def peak(label: str, fn) -> None:
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = fn()
+    elapsed = time.perf_counter() - start
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<24} {count:8d} chunks  {elapsed:6.2f}s  peak {peak_bytes / 2**20:7.1f}MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming chunker benchmark")
+    parser.add_argument("--files", type=int, default=16)
+    parser.add_argument("--file-mb", type=float, default=8)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [Path(tmp) / f"kb_{i:03d}.txt" for i in range(args.files)]
+        for path in paths:
+            write_file(path, int(args.file_mb * 2**20), rng)
+
+        splitter = RecursiveCharacterTextSplitter(chunk_size=300, chunk_overlap=20)
+        peak("whole file (1 file)", lambda: len(splitter.split_text(paths[0].read_text())))
+        peak("iter_chunks (1 file)", lambda: sum(1 for _ in iter_chunks(str(paths[0]))))
+        ingestor = Ingestor(Path(tmp) / "db", BagOfWordsEmbeddings(dim=64),
+                            IngestOptions(patterns=(paths[0].name,)))
+        peak("Ingestor (1 file)", lambda: ingestor.ingest(tmp).chunks_added)
+
+        for workers in (1, args.workers):
+            start = time.perf_counter()
+            count = sum(len(batch) for _, batch, _ in stream_chunks([str(p) for p in paths], workers=workers))
+            elapsed = time.perf_counter() - start
+            total_mb = args.files * args.file_mb
+            print(f"stream_chunks workers={workers:<3} {count:8d} chunks  {elapsed:6.2f}s  {total_mb / elapsed:6.1f}MB/s")
+
+
+if __name__ == "__main__":
+    main()
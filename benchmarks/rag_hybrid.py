@@ -0,0 +1,102 @@
+"""Recall@k and per-stage latency of vector, BM25 and hybrid retrieval.
+
+Builds a synthetic support corpus over a made-up vocabulary in a temporary
+Chroma store. Some chunks mention a unique error code and the rest are plain
+Q&A. Two query sets are run:
+"code" (what does ERR-1234 mean) and "paraphrase" (a few words of the target
+answer plus noise). The vector side uses the local hashed n-gram embeddings
+(llms/embeddings.py), in which a rare token like a code is easily drowned out.
+
+    python -m benchmarks.rag_hybrid --chunks 2000 --queries 200 --k 3
+"""
+import argparse
+import random
+import statistics
+import tempfile
+import time
+
+from llms.embeddings import HashingEmbeddings
+from rag.hybrid import BM25Index, HybridRetriever, overlap_rerank
+
+
+def vocabulary(size: int, rng: random.Random) -> tuple:
+    """Made-up words with Zipf-like frequencies (a few very common, a long tail)."""
+    syllables = ["ka", "lo", "mi", "ne", "ru", "sa", "te", "vo", "zi", "pa", "do", "fe", "gu", "ho", "ji"]
+    words = sorted({"".join(rng.choices(syllables, k=rng.randint(2, 4))) for _ in range(size * 2)})[:size]
+    rng.shuffle(words)
+    return words, [1 / (rank + 1) for rank in range(len(words))]
+
+
+def build_corpus(n: int, rng: random.Random) -> tuple:
+    words, weights = vocabulary(3000, rng)
+    ids, texts, codes = [], [], {}
+    for i in range(n):
+        question = " ".join(rng.choices(words, weights, k=8))
+        answer = " ".join(rng.choices(words, weights, k=30))
+        text = f"Q: {question}?\nA: {answer}."
+        if i % 5 == 0:
+            code = f"ERR-{1000 + i}"
+            text += f" If you see error {code}, contact the service desk."
+            codes[code] = f"chunk-{i}"
+        ids.append(f"chunk-{i}")
+        texts.append(text)
+    return ids, texts, codes, words
+
+
+def queries(ids: list, texts: list, codes: dict, words: list, n: int, rng: random.Random) -> dict:
+    code_queries = [(f"what does error {code} mean", target) for code, target in rng.sample(sorted(codes.items()), n)]
+    paraphrase = []
+    for i in rng.sample(range(len(ids)), n):
+        answer = texts[i].split("A: ", 1)[1].split()
+        paraphrase.append((" ".join(rng.sample(answer, 6) + rng.choices(words, k=2)), ids[i]))
+    return {"code": code_queries, "paraphrase": paraphrase}
+
+
+def evaluate(label: str, search, cases: list, k: int) -> None:
+    hits, latencies = 0, []
+    for query, target in cases:
+        start = time.perf_counter()
+        found = search(query)
+        latencies.append(time.perf_counter() - start)
+        hits += target in [doc.id for doc in found[:k]]
+    print(f"  {label:<18} recall@{k}={hits / len(cases):.2f}  p50={statistics.median(latencies) * 1000:6.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hybrid retrieval benchmark")
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=3)
+    args = parser.parse_args()
+
+    from langchain_chroma import Chroma
+
+    rng = random.Random(0)
+    ids, texts, codes, words = build_corpus(args.chunks, rng)
+    cases = queries(ids, texts, codes, words, min(args.queries, len(codes)), rng)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = Chroma(persist_directory=tmp, embedding_function=HashingEmbeddings())
+        for i in range(0, len(ids), 1000):
+            store.add_texts(texts[i:i + 1000], ids=ids[i:i + 1000])
+
+        start = time.perf_counter()
+        bm25 = BM25Index()
+        added, _ = bm25.sync(store)
+        print(f"BM25 index: {added} chunks in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+        hybrid = HybridRetriever(vectorstore=store, bm25=bm25, k=args.k)
+        reranked = HybridRetriever(vectorstore=store, bm25=bm25, k=args.k, fetch_k=args.k * 3, rerank=overlap_rerank)
+        for name, cases_ in cases.items():
+            print(f"{name} queries:")
+            evaluate("vector", lambda q: store.similarity_search(q, k=args.k), cases_, args.k)
+            evaluate("bm25", lambda q: [bm25.document(i) for i, _ in bm25.search(q, args.k)], cases_, args.k)
+            evaluate("hybrid", hybrid.invoke, cases_, args.k)
+            evaluate("hybrid + rerank", reranked.invoke, cases_, args.k)
+
+        for label, retriever in (("hybrid", hybrid), ("hybrid + rerank", reranked)):
+            stages = "  ".join(f"{stage}={ms:.2f}ms" for stage, ms in retriever.stats().items() if stage != "queries")
+            print(f"{label} stages per query: {stages}")
+
+
+if __name__ == "__main__":
+    main()
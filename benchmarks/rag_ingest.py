@@ -0,0 +1,83 @@
+"""Full vs incremental re-indexing of a synthetic knowledge base.
+
+Builds `--files` Q&A files, ingests them, then re-ingests after touching
+nothing, after editing `--changed` percent of the files and deleting one,
+and after prepending a paragraph to one file. With `--embeddings stub` each
+embedding call costs `--embed-latency` seconds; `--embeddings local` computes
+real hashed n-gram vectors in-process.
+
+    python -m benchmarks.rag_ingest --files 200 --changed 2
+"""
+import argparse
+import random
+import tempfile
+from pathlib import Path
+
+from benchmarks.stubs import BagOfWordsEmbeddings
+from llms.embeddings import HashingEmbeddings
+from rag.ingest import IngestOptions, IngestStats, ingest_directory
+
+TOPICS = ["Onboarding", "Company Policies", "IT Support", "Payroll", "Security", "Travel", "Benefits"]
+WORDS = ("account password reset laptop leave policy manager approval expense report badge access vpn "
+         "email benefits payroll holiday training portal ticket request form deadline").split()
+
+
+def write_corpus(root: Path, files: int, rng: random.Random) -> None:
+    for i in range(files):
+        lines = [f"[{rng.choice(TOPICS)}]"]
+        for q in range(20):
+            question = " ".join(rng.choices(WORDS, k=8))
+            answer = " ".join(rng.choices(WORDS, k=25))
+            lines.append(f"Q: {question}?\nA: {answer}.\n")
+        (root / f"kb_{i:05d}.txt").write_text("\n".join(lines))
+
+
+def report(label: str, stats: IngestStats) -> None:
+    print(f"{label:<22} {stats.seconds:7.2f}s  files={stats.files} unchanged={stats.files_unchanged} "
+          f"removed={stats.files_removed} added={stats.chunks_added} existing={stats.chunks_existing} "
+          f"deleted={stats.chunks_deleted} embed_calls={stats.embedding_calls}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental RAG ingestion benchmark")
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--changed", type=float, default=2.0, help="Percent of files edited between runs")
+    parser.add_argument("--embeddings", choices=["stub", "local"], default="stub")
+    parser.add_argument("--embed-latency", type=float, default=0.05)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    options = IngestOptions(batch_size=args.batch_size, concurrency=args.concurrency)
+    if args.embeddings == "local":
+        embeddings = HashingEmbeddings()
+    else:
+        embeddings = BagOfWordsEmbeddings(dim=128, latency=args.embed_latency)
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus, store = Path(tmp) / "corpus", Path(tmp) / "chroma"
+        corpus.mkdir()
+        write_corpus(corpus, args.files, rng)
+
+        report("full ingest", ingest_directory(corpus, store, embeddings, options))
+        report("unchanged", ingest_directory(corpus, store, embeddings, options))
+
+        files = sorted(corpus.iterdir())
+        for path in rng.sample(files, max(1, int(len(files) * args.changed / 100))):
+            with open(path, "a") as f:
+                f.write(f"\nQ: {' '.join(rng.choices(WORDS, k=8))}?\nA: updated answer.\n")
+        files[0].unlink()
+        report(f"{args.changed:g}% edited, 1 deleted", ingest_directory(corpus, store, embeddings, options))
+
+        # Chunk ids don't depend on position: only the new chunk at the top is embedded
+        files[1].write_text(f"[{rng.choice(TOPICS)}] New introduction.\n\n" + files[1].read_text())
+        stats = ingest_directory(corpus, store, embeddings, options)
+        report("1 file prepended", stats)
+        assert stats.chunks_added <= 2, "prepending re-embedded chunks that did not change"
+
+        sequential = IngestOptions(batch_size=args.batch_size, concurrency=1)
+        report("full, concurrency=1", ingest_directory(corpus, Path(tmp) / "chroma-seq", embeddings, sequential))
+
+
+if __name__ == "__main__":
+    main()
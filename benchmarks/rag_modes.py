@@ -0,0 +1,86 @@
+"""Two-call (summarize, then answer) vs one-call (fused) RAG on a fixed query set.
+
+Ingests scratch/langgraph/data into a temporary Chroma store and answers the
+same queries in both modes with an extractive stub model, whose cost grows
+with prompt size (`--llm-latency` per call plus `--prompt-token-latency` per
+input token). Reports latency, tokens and how much the answers overlap.
+
+    python -m benchmarks.rag_modes --k 3 --max-context-tokens 1500
+"""
+import argparse
+import asyncio
+import re
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.stubs import BagOfWordsEmbeddings, ExtractiveStubModel
+from rag.ingest import ingest_directory
+from rag.pipeline import RAGPipeline, chroma_retriever
+
+DATA = Path(__file__).resolve().parent.parent / "scratch" / "langgraph" / "data"
+
+QUERIES = [
+    "how to reset password",
+    "what is the leave policy",
+    "can I work remotely",
+    "my laptop is not working",
+    "what documents do I need for onboarding",
+    "how do we name git branches",
+    "how do I deploy to staging",
+    "what is the rollback procedure for production",
+    "how should sensitive data be handled",
+    "how often should passwords be changed",
+]
+
+
+def overlap(a: str, b: str) -> float:
+    """Jaccard similarity of the two answers' word sets."""
+    wa, wb = set(re.findall(r"\w+", a.lower())), set(re.findall(r"\w+", b.lower()))
+    return len(wa & wb) / len(wa | wb) if wa | wb else 1.0
+
+
+async def evaluate(pipeline: RAGPipeline) -> tuple:
+    latencies, answers = [], []
+    for query in QUERIES:
+        start = time.perf_counter()
+        result = await pipeline.answer(query)
+        latencies.append(time.perf_counter() - start)
+        answers.append(result["response"])
+    return latencies, answers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize+answer vs fused RAG evaluation")
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--max-context-tokens", type=int, default=1500)
+    parser.add_argument("--llm-latency", type=float, default=0.3)
+    parser.add_argument("--prompt-token-latency", type=float, default=0.0002)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ingest_directory(DATA, tmp, BagOfWordsEmbeddings(dim=256))
+        retriever = chroma_retriever(tmp, BagOfWordsEmbeddings(dim=256), k=args.k)
+        llm = ExtractiveStubModel(latency=args.llm_latency, prompt_token_latency=args.prompt_token_latency)
+
+        results = {}
+        for mode in ("summarize", "fused"):
+            pipeline = RAGPipeline(retriever, llm, mode=mode, max_context_tokens=args.max_context_tokens)
+            latencies, answers = asyncio.run(evaluate(pipeline))
+            results[mode] = answers
+            n = len(QUERIES)
+            print(f"{mode:<10} p50={statistics.median(latencies) * 1000:7.1f}ms  "
+                  f"calls/query={pipeline.usage['calls'] / n:.1f}  "
+                  f"input_tokens/query={pipeline.usage['input_tokens'] / n:7.1f}  "
+                  f"output_tokens/query={pipeline.usage['output_tokens'] / n:6.1f}")
+
+    scores = [overlap(a, b) for a, b in zip(results["summarize"], results["fused"])]
+    print(f"answer overlap (Jaccard) mean={statistics.mean(scores):.2f} min={min(scores):.2f}")
+    for query, score, a, b in zip(QUERIES, scores, results["summarize"], results["fused"]):
+        if score < 0.5:
+            print(f"  {query!r}: {score:.2f}\n    summarize: {a[:100]!r}\n    fused:     {b[:100]!r}")
+
+
+if __name__ == "__main__":
+    main()
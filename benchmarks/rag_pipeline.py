@@ -0,0 +1,62 @@
+"""Throughput of the async RAG pipeline at different concurrency levels.
+
+Ingests a synthetic corpus into a temporary Chroma store, then answers
+`--queries` queries with a stub chat model (`--llm-latency` seconds per call,
+two calls per query). Queries are embedded by a stub costing `--embed-latency`
+per call, or with `--embeddings local` by the in-process hashed n-gram model.
+
+    python -m benchmarks.rag_pipeline --queries 64 --concurrency 1,4,16,64
+"""
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.rag_ingest import WORDS, write_corpus
+from benchmarks.stubs import BagOfWordsEmbeddings, StubToolCallingModel
+from llms.embeddings import HashingEmbeddings
+from rag.ingest import ingest_directory
+from rag.pipeline import RAGPipeline, chroma_retriever
+
+
+async def run(pipeline: RAGPipeline, queries: list, concurrency: int) -> None:
+    start = time.perf_counter()
+    results = await pipeline.answer_many(queries, max_concurrency=concurrency)
+    elapsed = time.perf_counter() - start
+    assert all(r["response"] for r in results)
+    print(f"concurrency={concurrency:<4} {elapsed:7.2f}s  {len(queries) / elapsed:7.1f} queries/s  "
+          f"{elapsed / len(queries) * 1000:7.1f}ms/query")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Async RAG pipeline throughput")
+    parser.add_argument("--queries", type=int, default=64)
+    parser.add_argument("--concurrency", default="1,4,16,64")
+    parser.add_argument("--llm-latency", type=float, default=0.1)
+    parser.add_argument("--embeddings", choices=["stub", "local"], default="stub")
+    parser.add_argument("--embed-latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    queries = [" ".join(rng.choices(WORDS, k=6)) for _ in range(args.queries)]
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = Path(tmp) / "corpus"
+        corpus.mkdir()
+        write_corpus(corpus, 50, rng)
+        if args.embeddings == "local":
+            ingest_embeddings = query_embeddings = HashingEmbeddings()
+        else:
+            ingest_embeddings = BagOfWordsEmbeddings(dim=128)
+            query_embeddings = BagOfWordsEmbeddings(dim=128, latency=args.embed_latency)
+        ingest_directory(corpus, Path(tmp) / "chroma", ingest_embeddings)
+
+        retriever = chroma_retriever(str(Path(tmp) / "chroma"), query_embeddings)
+        pipeline = RAGPipeline(retriever, StubToolCallingModel(latency=args.llm_latency))
+        for concurrency in (int(c) for c in args.concurrency.split(",")):
+            asyncio.run(run(pipeline, queries, concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Load test for agent.server with simulated clients and a stub LLM.
+
+Each client opens its own TCP connection and session and sends a few turns.
+The stub model takes `--llm-latency` seconds per call and asks for one calculator
+tool call per turn, so every turn does two model calls and one MCP round-trip.
+
+    python -m benchmarks.server_load --clients 200 --turns 3 --concurrency 1,8,32,128
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from agent.server import AgentServer, ServerConfig
+from benchmarks.stubs import StubToolCallingModel
+
+CALCULATOR = Path(__file__).resolve().parent.parent / "mcp-server" / "calculator.py"
+
+
+async def client(port: int, client_id: int, turns: int, latencies: list, errors: list) -> None:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        for turn in range(turns):
+            start = time.perf_counter()
+            request = {"id": turn, "session": f"client-{client_id}", "message": f"What is {client_id} + {turn}?"}
+            writer.write((json.dumps(request) + "\n").encode("utf-8"))
+            await writer.drain()
+            reply = json.loads(await reader.readline())
+            if "error" in reply:
+                errors.append(reply["error"])
+            else:
+                latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def run(clients: int, turns: int, concurrency: int, llm_latency: float) -> None:
+    connections = {"calculator": {"transport": "stdio", "command": sys.executable, "args": [str(CALCULATOR)]}}
+    llm = StubToolCallingModel(tool_calls=[{"name": "add_numbers", "args": {"a": 2, "b": 3}}], latency=llm_latency)
+    config = ServerConfig(port=0, max_concurrency=concurrency, max_queue=clients * turns)
+    server = AgentServer(config, llm=llm, connections=connections)
+    port = await server.serve_tcp()
+
+    latencies: list = []
+    errors: list = []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(port, i, turns, latencies, errors) for i in range(clients)))
+    elapsed = time.perf_counter() - start
+    await server.shutdown()
+
+    p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else 0.0
+    print(f"concurrency={concurrency:<4} turns={len(latencies):<5} errors={len(errors):<3} "
+          f"throughput={len(latencies) / elapsed:8.1f} turns/s  "
+          f"p50={statistics.median(latencies) * 1000:7.1f}ms  p95={p95 * 1000:7.1f}ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Agent server load test")
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--concurrency", default="1,8,32,128", help="Comma separated max_concurrency values")
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    for concurrency in [int(c) for c in args.concurrency.split(",")]:
+        await run(args.clients, args.turns, concurrency, args.llm_latency)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,32 @@
+"""MCP server with deliberately slow tools, used by the benchmarks."""
+import asyncio
+
+from mcp.server.fastmcp import FastMCP
+
+mcp = FastMCP()
+
+
+@mcp.tool()
+async def slow_echo(text: str, delay: float = 0.2) -> str:
+    """Echo `text` back after `delay` seconds."""
+    await asyncio.sleep(delay)
+    return text
+
+
+@mcp.tool()
+async def read_text(path: str, delay: float = 0.05) -> str:
+    """Read a text file, slowly, like a remote filesystem."""
+    await asyncio.sleep(delay)
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+@mcp.tool()
+async def hang(text: str) -> str:
+    """Never return, like a stuck filesystem or HTTP call."""
+    await asyncio.Event().wait()
+    return text
+
+
+if __name__ == "__main__":
+    mcp.run(transport="stdio")
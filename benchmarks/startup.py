@@ -0,0 +1,58 @@
+"""Cold-start import time of each entry point, each in a fresh interpreter.
+
+    python -m benchmarks.startup --runs 5
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+MODULES = [
+    "llms.registry",
+    "llms.openai_gpt_4o",
+    "llms.llama_local",
+    "graph.chat",
+    "agent.chat_graph",
+    "agent.client",
+    "agent.server",
+]
+
+# Scripts guarded by `if __name__ == "__main__"`, loaded without running main()
+SCRIPTS = [
+    "scratch/langgraph/6-prompt-enhancement.py",
+    "scratch/langgraph/8-search-agent.py",
+]
+
+
+def cold_import(statement: str) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", statement], cwd=ROOT, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Entry point cold-start benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    baseline = statistics.median(cold_import("pass") for _ in range(args.runs))
+    print(f"{'interpreter':<45} {baseline * 1000:8.1f}ms")
+
+    targets = [(m, f"import {m}") for m in MODULES]
+    targets += [(s, f"import runpy; runpy.run_path({s!r}, run_name='startup')") for s in SCRIPTS]
+    for label, statement in targets:
+        try:
+            elapsed = statistics.median(cold_import(statement) for _ in range(args.runs))
+        except subprocess.CalledProcessError:
+            print(f"{label:<45}   failed")
+            continue
+        print(f"{label:<45} {elapsed * 1000:8.1f}ms  (+{(elapsed - baseline) * 1000:.1f}ms over bare interpreter)")
+
+
+if __name__ == "__main__":
+    main()
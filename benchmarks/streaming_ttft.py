@@ -0,0 +1,57 @@
+"""Time-to-first-token: chat_graph (blocking) vs chat_graph_stream.
+
+The stub model calls the calculator once and then streams a longer answer with
+`--token-latency` seconds between tokens.
+
+    python -m benchmarks.streaming_ttft --turns 3
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from agent.chat_graph import chat_graph, chat_graph_stream, close_pool
+from benchmarks.stubs import StubToolCallingModel
+
+CALCULATOR = Path(__file__).resolve().parent.parent / "mcp-server" / "calculator.py"
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Streaming time-to-first-token")
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--token-latency", type=float, default=0.01)
+    args = parser.parse_args()
+
+    connections = {"calculator": {"transport": "stdio", "command": sys.executable, "args": [str(CALCULATOR)]}}
+    llm = StubToolCallingModel(
+        tool_calls=[{"name": "add_numbers", "args": {"a": 2, "b": 3}}],
+        answer=" ".join(["token"] * 100),
+        latency=args.llm_latency,
+        token_latency=args.token_latency,
+    )
+
+    blocking, first_tokens, totals = [], [], []
+    for _ in range(args.turns):
+        start = time.perf_counter()
+        await chat_graph("What is 2 + 3?", connections=connections, llm=llm)
+        blocking.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        first = None
+        async for event in chat_graph_stream("What is 2 + 3?", connections=connections, llm=llm):
+            if event.type == "token" and first is None:
+                first = time.perf_counter() - start
+        first_tokens.append(first or 0.0)
+        totals.append(time.perf_counter() - start)
+    await close_pool()
+
+    print(f"blocking   first output={statistics.median(blocking) * 1000:8.1f}ms")
+    print(f"streaming  first token ={statistics.median(first_tokens) * 1000:8.1f}ms  "
+          f"total={statistics.median(totals) * 1000:8.1f}ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,162 @@
+import asyncio
+import json
+import re
+import time
+import uuid
+import zlib
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+class StubToolCallingModel(BaseChatModel):
+    """Offline chat model for benchmarks.
+
+    On a fresh user turn it emits `tool_calls` (if any); once tool results are in
+    the history it answers with a short text. It is stateless, so a single instance
+    can serve many concurrent conversations.
+    """
+
+    tool_calls: List[Dict[str, Any]] = []
+    answer: str = "Here is the answer based on the tool results."
+    latency: float = 0.0
+    token_latency: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub-tool-calling"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _reply(self, messages: List[BaseMessage]) -> AIMessage:
+        if self.tool_calls and not isinstance(messages[-1], ToolMessage):
+            return AIMessage(
+                content="",
+                tool_calls=[
+                    {"name": call["name"], "args": call["args"], "id": f"call_{uuid.uuid4().hex[:8]}"}
+                    for call in self.tool_calls
+                ],
+            )
+        return AIMessage(content=self.answer)
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        reply = self._reply(messages)
+        if self.token_latency and not reply.tool_calls:
+            # Generating the whole answer costs the same as streaming it
+            await asyncio.sleep(self.token_latency * len(re.split(r"(\s)", str(reply.content))))
+        return ChatResult(generations=[ChatGeneration(message=reply)])
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        reply = self._reply(messages)
+        if reply.tool_calls:
+            chunk = AIMessageChunk(
+                content="",
+                tool_call_chunks=[
+                    {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": i}
+                    for i, call in enumerate(reply.tool_calls)
+                ],
+            )
+            yield ChatGenerationChunk(message=chunk)
+            return
+        for token in re.split(r"(\s)", str(reply.content)):
+            if self.token_latency:
+                await asyncio.sleep(self.token_latency)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+
+class BagOfWordsEmbeddings(Embeddings):
+    """Tiny hashed bag-of-words embedding, good enough to match near-duplicates.
+
+    `latency` seconds are spent per call, like a round-trip to an embeddings API.
+    """
+
+    def __init__(self, dim: int = 256, latency: float = 0.0):
+        self.dim = dim
+        self.latency = latency
+        self.calls = 0
+
+    def _vector(self, text: str) -> list:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for word in text.lower().split():
+            vector[zlib.crc32(word.encode("utf-8")) % self.dim] += 1.0
+        return vector.tolist()
+
+    def embed_query(self, text: str) -> list:
+        return self.embed_documents([text])[0]
+
+    def embed_documents(self, texts: list) -> list:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return [self._vector(t) for t in texts]
+
+
+class ExtractiveStubModel(BaseChatModel):
+    """Offline chat model whose answer depends on its prompt.
+
+    If the prompt names a query ("query: ..."), it answers with the lines after
+    it that share the most words with it; otherwise (a summary request) it
+    returns the leading content lines. Each call costs `latency` plus
+    `prompt_token_latency` per input token, and reports token usage like a real
+    provider.
+    """
+
+    latency: float = 0.0
+    prompt_token_latency: float = 0.0
+    max_lines: int = 3
+    summary_lines: int = 8
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub-extractive"
+
+    @staticmethod
+    def _words(text: str) -> set:
+        return set(re.findall(r"[a-z0-9]+", text.lower())) - {
+            "the", "a", "an", "to", "is", "be", "what", "how", "do", "i", "my", "of", "should", "can", "we", "q"}
+
+    def _reply(self, prompt: str) -> str:
+        match = re.search(r"query:\s*(.+)", prompt, re.IGNORECASE)
+        if not match:
+            content = prompt.split(":", 1)[-1]
+            lines = [line.strip() for line in content.splitlines() if line.strip()]
+            return "\n".join(lines[:self.summary_lines])
+        query = self._words(match.group(1))
+        after = prompt[match.end():]
+        candidates = [line.strip() for line in after.splitlines() if line.strip()]
+        scored = sorted(((len(query & self._words(line)), i) for i, line in enumerate(candidates)), reverse=True)
+        best = sorted(i for score, i in scored[:self.max_lines] if score > 0)
+        return "\n".join(candidates[i] for i in best) or "I don't know."
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> ChatResult:
+        from llms.tokens import count_tokens
+
+        prompt = "\n".join(str(m.content) for m in messages)
+        input_tokens = count_tokens(prompt)
+        await asyncio.sleep(self.latency + self.prompt_token_latency * input_tokens)
+        answer = self._reply(str(messages[-1].content))
+        output_tokens = count_tokens(answer)
+        message = AIMessage(content=answer, usage_metadata={
+            "input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens,
+        })
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> ChatResult:
+        return asyncio.run(self._agenerate(messages, stop, **kwargs))
@@ -0,0 +1,73 @@
+"""Per-call setup cost of the project manager's PRD task.
+
+Before, each createPRD call re-read instruction/create-prd.mdc and built a
+new chat model with init_chat_model. Now it takes the template from
+TemplateRegistry (tokenized once, stat'ed at most once a second) and the
+memoized model from llms.registry. Both are timed over `--calls` calls. Then
+a copy of the template is edited on disk to check that the registry picks up
+the change.
+
+    python -m benchmarks.templates --calls 200
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from llms.templates import DEFAULT_ROOT, TemplateRegistry
+
+PRD_SYSTEM = "You are a professional project manager creating a PRD."
+
+
+def before() -> int:
+    from langchain.chat_models import init_chat_model
+
+    init_chat_model(model="gpt-4o-mini")
+    with open(DEFAULT_ROOT / "create-prd.mdc", "r", encoding="utf-8") as file:
+        instruction = file.read().strip()
+    return len(instruction)
+
+
+def after(templates: TemplateRegistry) -> int:
+    from llms.registry import get_model
+
+    get_model("gpt-4o-mini")
+    return templates.layout("create-prd", system=PRD_SYSTEM).prefix_tokens
+
+
+def timed(label: str, fn, calls: int) -> None:
+    fn()  # imports and first load
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed / calls * 1e6:9.1f}us/call")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Template registry benchmark")
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+    templates = TemplateRegistry()
+    timed("read + init_chat_model per call", before, args.calls)
+    timed("TemplateRegistry + shared model", lambda: after(templates), args.calls)
+    print(f"registry: {templates.loads} load(s), {templates.hits} hits")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        shutil.copy(DEFAULT_ROOT / "create-prd.mdc", tmp)
+        registry = TemplateRegistry(tmp, check_interval=0)
+        first = registry.get("create-prd")
+        path = Path(tmp) / "create-prd.mdc"
+        path.write_text(path.read_text(encoding="utf-8") + "\n## Extra section\nAlways add a risks table.\n",
+                        encoding="utf-8")
+        second = registry.get("create-prd")
+        assert second.text.endswith("Always add a risks table.") and registry.loads == 2
+        print(f"hot reload: {first.tokens} -> {second.tokens} tokens after editing the file")
+
+
+if __name__ == "__main__":
+    main()
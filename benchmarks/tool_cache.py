@@ -0,0 +1,74 @@
+"""Round-trips saved by the MCP tool result cache.
+
+Calls the (annotated, pure) calculator tools and a slow file-reading tool
+repeatedly with a small set of arguments, then edits the file to show mtime
+invalidation.
+
+    python -m benchmarks.tool_cache --calls 200
+    python -m benchmarks.tool_cache --calls 200 --disk /tmp/tool_cache.sqlite
+"""
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from agent.mcp_pool import MCPSessionPool
+from agent.tool_cache import ToolResultCache
+
+ROOT = Path(__file__).resolve().parent.parent
+CALCULATOR = ROOT / "mcp-server" / "calculator.py"
+SLOW_SERVER = ROOT / "benchmarks" / "slow_server.py"
+
+
+async def run(calls: int, cache: ToolResultCache, workdir: Path) -> None:
+    doc = workdir / "doc.txt"
+    doc.write_text("version 1")
+    pool = MCPSessionPool(
+        {
+            "calculator": {"transport": "stdio", "command": sys.executable, "args": [str(CALCULATOR)]},
+            "slow": {
+                "transport": "stdio",
+                "command": sys.executable,
+                "args": [str(SLOW_SERVER)],
+                "cache": {"read_text": {"ttl": 300, "mtime_args": ["path"]}},
+            },
+        },
+        tool_cache=cache,
+    )
+    await pool.start()
+    rng = random.Random(0)
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        a, b = rng.randint(0, 9), rng.randint(0, 9)
+        await pool.call_tool("calculator", "add_numbers", {"a": a, "b": b})
+        await pool.call_tool("slow", "read_text", {"path": str(doc)})
+    elapsed = time.perf_counter() - start
+
+    stats = cache.stats()
+    lookups = stats["hits"] + stats["misses"]
+    print(f"{calls * 2} calls in {elapsed:.2f}s, {stats['hits']} of {lookups} served from cache "
+          f"({stats['hit_rate']:.0%}), round-trips saved: {stats['hits']}")
+
+    time.sleep(0.01)
+    doc.write_text("version 2, a bit longer")
+    result = await pool.call_tool("slow", "read_text", {"path": str(doc)})
+    print(f"after edit: read {result.content[0].text!r}, invalidated={cache.stats()['invalidated']}")
+    await pool.close()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Tool result cache benchmark")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--disk", help="SQLite file for the on-disk backend")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        await run(args.calls, ToolResultCache(path=args.disk), Path(tmp))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,22 +1,22 @@
-from pydantic import BaseModel
-from langgraph.graph.message import add_messages
 from typing import List, Annotated, TypedDict, Literal
-from langgraph.graph import START, END, StateGraph
-
-useLocalLLM = False
-if useLocalLLM:
-    from llms.llama_local import local_llama
-    llm = local_llama
-else:
-    from llms.openai_gpt_4o import gpt4o_mini
-    llm = gpt4o_mini
-
-class AgentState(TypedDict):
-    messages: Annotated[List, add_messages]
-    next_state: Literal["chat", "END"]
-    
-def chat_node(state: AgentState) -> AgentState:
-    response = llm.invoke(state["messages"])
+
+from llms.registry import get_model
+
+_chat_graph = None
+
+
+def new_memory():
+    """History window for one chat (CHAT_HISTORY_TOKENS tokens); pass it as config["configurable"]["memory"]."""
+    from graph.memory import ConversationMemory
+    return ConversationMemory(summarizer=get_model())
+
+
+def chat_node(state, config) -> dict:
+    # Each conversation brings its own memory; without one the model sees the full history
+    memory = config.get("configurable", {}).get("memory")
+    messages = memory.window(state["messages"]) if memory else state["messages"]
+    # LLM_MODEL picks the model, e.g. LLM_MODEL=local
+    response = get_model().invoke(messages)
     print(f"Assistant: {response.content}")
 
     user_input = input("You: ")
@@ -32,14 +32,32 @@ def chat_node(state: AgentState) -> AgentState:
     }
 
 
-graph = StateGraph(AgentState)
+def build_chat_graph():
+    """Compile the interactive chat graph. langgraph is only imported here."""
+    from langgraph.graph.message import add_messages
+    from langgraph.graph import START, END, StateGraph
+
+    class AgentState(TypedDict):
+        messages: Annotated[List, add_messages]
+        next_state: Literal["chat", "END"]
+
+    graph = StateGraph(AgentState)
+
+    graph.add_node("chat", chat_node)
+    graph.add_edge(START, "chat")
+    graph.add_conditional_edges("chat", lambda state: state["next_state"], {
+        "chat": "chat",
+        "END": END
+    })
 
-graph.add_node("chat", chat_node)
-graph.add_edge(START, "chat")
-graph.add_conditional_edges("chat", lambda state: state["next_state"], {
-    "chat": "chat",
-    "END": END
-})
+    return graph.compile()
 
-chat_graph = graph.compile()
 
+def __getattr__(name):
+    # `from graph.chat import chat_graph` compiles the graph on first access
+    global _chat_graph
+    if name == "chat_graph":
+        if _chat_graph is None:
+            _chat_graph = build_chat_graph()
+        return _chat_graph
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
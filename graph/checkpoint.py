@@ -0,0 +1,422 @@
+"""Durable SQLite checkpointer for LangGraph graphs.
+
+    from graph.checkpoint import SqliteCheckpointer, RetentionPolicy
+    checkpointer = SqliteCheckpointer()                        # .cache/checkpoints.sqlite
+    checkpointer.set_retention("support-42", RetentionPolicy(keep_last=100))
+    graph = builder.compile(checkpointer=checkpointer)
+
+A drop-in for InMemorySaver whose threads, including ones paused at
+`interrupt()`, survive a restart. Only the channels that changed in a step are
+written. A list channel that only grew since its last write (`add_messages`
+history) is stored as the appended items plus a pointer to the previous
+version, so a long chat doesn't rewrite its whole history on every step.
+Every `compact_every` checkpoints of a thread, checkpoints beyond the thread's
+retention policy are dropped along with the writes and channel values only
+they used.
+"""
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.serde.types import TASKS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT_PATH = Path(__file__).resolve().parent.parent / ".cache" / "checkpoints.sqlite"
+
+# A delta chain is cut with a full copy after this many links, bounding read cost
+MAX_DELTA_DEPTH = 1024
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    keep_last: int = 20                # newest checkpoints kept per thread and namespace
+    max_age: Optional[float] = None    # seconds; older checkpoints go, but the newest always stays
+
+
+class SqliteCheckpointer(BaseCheckpointSaver[str]):
+    """Checkpoints in a WAL-mode SQLite file, with delta-encoded history and compaction."""
+
+    def __init__(self, path: str | Path | None = None, retention: RetentionPolicy = RetentionPolicy(),
+                 compact_every: int = 50, max_delta_depth: int = MAX_DELTA_DEPTH, serde=None):
+        super().__init__(serde=serde)
+        path = Path(path or os.getenv("CHECKPOINT_DB") or DEFAULT_CHECKPOINT_PATH)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.retention = retention
+        self.compact_every = compact_every
+        self.max_delta_depth = max_delta_depth
+        self.bytes_written = 0
+        self._lock = threading.RLock()
+        self._puts: Dict[str, int] = {}
+        # Last value written per (thread, ns, channel), to spot append-only updates
+        self._last: "OrderedDict[Tuple[str, str, str], Tuple[str, list, int]]" = OrderedDict()
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                thread_id TEXT, checkpoint_ns TEXT, checkpoint_id TEXT, parent_id TEXT, created REAL,
+                type TEXT, checkpoint BLOB, metadata_type TEXT, metadata BLOB,
+                PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+            );
+            CREATE TABLE IF NOT EXISTS blobs (
+                thread_id TEXT, checkpoint_ns TEXT, channel TEXT, version TEXT,
+                type TEXT, blob BLOB, base_version TEXT, depth INTEGER,
+                PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+            );
+            CREATE TABLE IF NOT EXISTS writes (
+                thread_id TEXT, checkpoint_ns TEXT, checkpoint_id TEXT, task_id TEXT, idx INTEGER,
+                channel TEXT, type TEXT, blob BLOB, task_path TEXT,
+                PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+            );
+            CREATE TABLE IF NOT EXISTS retention (
+                thread_id TEXT PRIMARY KEY, keep_last INTEGER, max_age REAL
+            );
+            """
+        )
+        self._db.commit()
+
+    def __enter__(self) -> "SqliteCheckpointer":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    # -- retention ---------------------------------------------------------
+
+    def set_retention(self, thread_id: str, policy: RetentionPolicy) -> None:
+        """Override the default retention for one thread (stored in the database)."""
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO retention VALUES (?, ?, ?)",
+                             (thread_id, policy.keep_last, policy.max_age))
+            self._db.commit()
+
+    def _policy(self, thread_id: str) -> RetentionPolicy:
+        row = self._db.execute("SELECT keep_last, max_age FROM retention WHERE thread_id = ?", (thread_id,)).fetchone()
+        return RetentionPolicy(*row) if row else self.retention
+
+    # -- channel values ----------------------------------------------------
+
+    def _load_value(self, thread_id: str, ns: str, channel: str, version: str) -> Tuple[bool, Any]:
+        """(found, value) of a channel version, following delta links back to a full copy."""
+        rows = self._db.execute(
+            """
+            WITH RECURSIVE chain(type, blob, base_version, depth) AS (
+                SELECT type, blob, base_version, 0 FROM blobs
+                WHERE thread_id = :thread AND checkpoint_ns = :ns AND channel = :channel AND version = :version
+                UNION ALL
+                SELECT b.type, b.blob, b.base_version, chain.depth + 1 FROM blobs b JOIN chain
+                ON b.thread_id = :thread AND b.checkpoint_ns = :ns AND b.channel = :channel
+                AND b.version = chain.base_version
+            )
+            SELECT type, blob, base_version FROM chain ORDER BY depth DESC
+            """,
+            {"thread": thread_id, "ns": ns, "channel": channel, "version": version},
+        ).fetchall()
+        if not rows or rows[0][0] == "empty" or rows[0][2] is not None:
+            # Missing, explicitly empty, or a delta whose base is gone
+            return False, None
+        value = self.serde.loads_typed(rows[0][:2])
+        for type_, blob, _ in rows[1:]:
+            value.extend(self.serde.loads_typed((type_, blob)))
+        return True, value
+
+    def _load_blobs(self, thread_id: str, ns: str, versions: ChannelVersions) -> Dict[str, Any]:
+        values = {}
+        for channel, version in versions.items():
+            found, value = self._load_value(thread_id, ns, channel, str(version))
+            if found:
+                values[channel] = value
+        return values
+
+    def _write_blob(self, thread_id: str, ns: str, channel: str, version: str, values: Dict[str, Any]) -> None:
+        key = (thread_id, ns, channel)
+        if channel not in values:
+            row = (thread_id, ns, channel, version, "empty", b"", None, 0)
+            self._last.pop(key, None)
+        else:
+            value = values[channel]
+            last = self._last.get(key)
+            if (isinstance(value, list) and last is not None and last[2] < self.max_delta_depth
+                    and len(value) >= len(last[1])
+                    and all(a is b or a == b for a, b in zip(value, last[1]))):
+                type_, blob = self.serde.dumps_typed(value[len(last[1]):])
+                row = (thread_id, ns, channel, version, type_, blob, last[0], last[2] + 1)
+            else:
+                type_, blob = self.serde.dumps_typed(value)
+                row = (thread_id, ns, channel, version, type_, blob, None, 0)
+            if isinstance(value, list):
+                self._last[key] = (version, list(value), row[7])
+                self._last.move_to_end(key)
+                while len(self._last) > 256:
+                    self._last.popitem(last=False)
+        self._db.execute("INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?, ?, ?, ?)", row)
+        self.bytes_written += len(row[5])
+
+    # -- reading -----------------------------------------------------------
+
+    def _tuple(self, thread_id: str, ns: str, row) -> CheckpointTuple:
+        checkpoint_id, parent_id, type_, blob, metadata_type, metadata = row
+        checkpoint = self.serde.loads_typed((type_, blob))
+        writes = self._db.execute(
+            "SELECT task_id, channel, type, blob FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx",
+            (thread_id, ns, checkpoint_id),
+        ).fetchall()
+        sends = []
+        if parent_id:
+            sends = self._db.execute(
+                "SELECT type, blob FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? "
+                "AND channel = ? ORDER BY task_path, task_id, idx",
+                (thread_id, ns, parent_id, TASKS),
+            ).fetchall()
+        return CheckpointTuple(
+            config={"configurable": {"thread_id": thread_id, "checkpoint_ns": ns, "checkpoint_id": checkpoint_id}},
+            checkpoint={
+                **checkpoint,
+                "channel_values": self._load_blobs(thread_id, ns, checkpoint["channel_versions"]),
+                "pending_sends": [self.serde.loads_typed(s) for s in sends],
+            },
+            metadata=self.serde.loads_typed((metadata_type, metadata)),
+            parent_config=(
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": ns, "checkpoint_id": parent_id}}
+                if parent_id else None
+            ),
+            pending_writes=[(task_id, channel, self.serde.loads_typed((t, b))) for task_id, channel, t, b in writes],
+        )
+
+    _COLUMNS = "checkpoint_id, parent_id, type, checkpoint, metadata_type, metadata"
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        ns = config["configurable"].get("checkpoint_ns", "")
+        with self._lock:
+            if checkpoint_id := get_checkpoint_id(config):
+                row = self._db.execute(
+                    f"SELECT {self._COLUMNS} FROM checkpoints "
+                    "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, ns, checkpoint_id),
+                ).fetchone()
+            else:
+                row = self._db.execute(
+                    f"SELECT {self._COLUMNS} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                    "ORDER BY checkpoint_id DESC LIMIT 1",
+                    (thread_id, ns),
+                ).fetchone()
+            return self._tuple(thread_id, ns, row) if row else None
+
+    def list(self, config: Optional[RunnableConfig], *, filter: Optional[Dict[str, Any]] = None,
+             before: Optional[RunnableConfig] = None, limit: Optional[int] = None) -> Iterator[CheckpointTuple]:
+        where, args = [], []
+        if config:
+            where.append("thread_id = ?")
+            args.append(config["configurable"]["thread_id"])
+            if (ns := config["configurable"].get("checkpoint_ns")) is not None:
+                where.append("checkpoint_ns = ?")
+                args.append(ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                where.append("checkpoint_id = ?")
+                args.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            where.append("checkpoint_id < ?")
+            args.append(before_id)
+        query = (f"SELECT thread_id, checkpoint_ns, {self._COLUMNS} FROM checkpoints "
+                 f"{'WHERE ' + ' AND '.join(where) if where else ''} ORDER BY checkpoint_id DESC")
+        with self._lock:
+            rows = self._db.execute(query, args).fetchall()
+        for thread_id, ns, *row in rows:
+            if limit is not None and limit <= 0:
+                break
+            with self._lock:
+                item = self._tuple(thread_id, ns, row)
+            if filter and not all(item.metadata.get(k) == v for k, v in filter.items()):
+                continue
+            if limit is not None:
+                limit -= 1
+            yield item
+
+    # -- writing -----------------------------------------------------------
+
+    def put(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+            new_versions: ChannelVersions) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        ns = config["configurable"]["checkpoint_ns"]
+        c = checkpoint.copy()
+        c.pop("pending_sends", None)
+        values: Dict[str, Any] = c.pop("channel_values")
+        type_, blob = self.serde.dumps_typed(c)
+        metadata_type, metadata_blob = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+        with self._lock:
+            for channel, version in new_versions.items():
+                self._write_blob(thread_id, ns, channel, str(version), values)
+            self._db.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (thread_id, ns, checkpoint["id"], config["configurable"].get("checkpoint_id"), time.time(),
+                 type_, blob, metadata_type, metadata_blob),
+            )
+            self._db.commit()
+            self.bytes_written += len(blob) + len(metadata_blob)
+            self._puts[thread_id] = self._puts.get(thread_id, 0) + 1
+            if self.compact_every and self._puts[thread_id] % self.compact_every == 0:
+                self.compact(thread_id)
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": ns, "checkpoint_id": checkpoint["id"]}}
+
+    def put_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str,
+                   task_path: str = "") -> None:
+        thread_id = config["configurable"]["thread_id"]
+        ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        with self._lock:
+            for idx, (channel, value) in enumerate(writes):
+                idx = WRITES_IDX_MAP.get(channel, idx)
+                type_, blob = self.serde.dumps_typed(value)
+                # Regular writes are kept as first written; special ones (errors, interrupts, resumes) replace
+                verb = "INSERT OR REPLACE" if idx < 0 else "INSERT OR IGNORE"
+                self._db.execute(f"{verb} INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                 (thread_id, ns, checkpoint_id, task_id, idx, channel, type_, blob, task_path))
+                self.bytes_written += len(blob)
+            self._db.commit()
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            for table in ("checkpoints", "blobs", "writes", "retention"):
+                self._db.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+            self._db.commit()
+            for key in [k for k in self._last if k[0] == thread_id]:
+                del self._last[key]
+
+    # -- compaction --------------------------------------------------------
+
+    def compact(self, thread_id: Optional[str] = None) -> int:
+        """Apply retention to one thread (or all) and drop what no kept checkpoint needs.
+
+        Returns the number of checkpoints removed.
+        """
+        removed = 0
+        with self._lock:
+            if thread_id is None:
+                threads = [t for (t,) in self._db.execute("SELECT DISTINCT thread_id FROM checkpoints")]
+            else:
+                threads = [thread_id]
+            for thread in threads:
+                policy = self._policy(thread)
+                namespaces = [ns for (ns,) in self._db.execute(
+                    "SELECT DISTINCT checkpoint_ns FROM checkpoints WHERE thread_id = ?", (thread,))]
+                for ns in namespaces:
+                    removed += self._compact_namespace(thread, ns, policy)
+            self._db.commit()
+        if removed:
+            logger.info(f"Compacted {removed} checkpoints")
+        return removed
+
+    def _compact_namespace(self, thread_id: str, ns: str, policy: RetentionPolicy) -> int:
+        rows = self._db.execute(
+            "SELECT checkpoint_id, parent_id, created, type, checkpoint FROM checkpoints "
+            "WHERE thread_id = ? AND checkpoint_ns = ? ORDER BY checkpoint_id DESC",
+            (thread_id, ns),
+        ).fetchall()
+        cutoff = time.time() - policy.max_age if policy.max_age else None
+        kept = [r for i, r in enumerate(rows)
+                if i == 0 or (i < policy.keep_last and (cutoff is None or r[2] >= cutoff))]
+        if len(kept) == len(rows):
+            return 0
+        kept_ids = {r[0] for r in kept}
+        # Pending sends of a kept checkpoint live in its parent's TASKS writes
+        parents = {r[1] for r in kept if r[1] and r[1] not in kept_ids}
+        dropped = [(thread_id, ns, r[0]) for r in rows if r[0] not in kept_ids]
+        self._db.executemany("DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                             dropped)
+        self._db.executemany("DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                             [d for d in dropped if d[2] not in parents])
+        self._db.executemany("DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? "
+                             "AND channel != ?", [(thread_id, ns, p, TASKS) for p in parents])
+
+        # Channel versions still referenced, plus the delta bases they are built on
+        needed = set()
+        for r in kept:
+            needed.update((ch, str(v)) for ch, v in self.serde.loads_typed((r[3], r[4]))["channel_versions"].items())
+        bases = {(ch, v): b for ch, v, b in self._db.execute(
+            "SELECT channel, version, base_version FROM blobs WHERE thread_id = ? AND checkpoint_ns = ?",
+            (thread_id, ns))}
+        for channel, version in list(needed):
+            while (base := bases.get((channel, version))) is not None and (channel, base) not in needed:
+                needed.add((channel, base))
+                version = base
+        garbage = [(ch, v) for ch, v in bases if (ch, v) not in needed]
+        self._db.executemany(
+            "DELETE FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+            [(thread_id, ns, ch, v) for ch, v in garbage],
+        )
+        # Deltas must not be based on a version that is gone
+        for channel, version in garbage:
+            last = self._last.get((thread_id, ns, channel))
+            if last and last[0] == version:
+                del self._last[(thread_id, ns, channel)]
+        return len(dropped)
+
+    def vacuum(self) -> None:
+        """Give the space freed by compaction back to the filesystem."""
+        with self._lock:
+            self._db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._db.execute("VACUUM")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = {table: self._db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                      for table in ("checkpoints", "blobs", "writes")}
+        return {**counts, "bytes_written": self.bytes_written}
+
+    # -- async (SQLite calls are short; run them inline like InMemorySaver) --
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return self.get_tuple(config)
+
+    async def alist(self, config: Optional[RunnableConfig], *, filter: Optional[Dict[str, Any]] = None,
+                    before: Optional[RunnableConfig] = None, limit: Optional[int] = None) -> AsyncIterator[CheckpointTuple]:
+        for item in self.list(config, filter=filter, before=before, limit=limit):
+            yield item
+
+    async def aput(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+                   new_versions: ChannelVersions) -> RunnableConfig:
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str,
+                          task_path: str = "") -> None:
+        self.put_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        self.delete_thread(thread_id)
+
+    def get_next_version(self, current: Optional[str], channel) -> str:
+        # Same scheme as InMemorySaver: zero-padded counter, random suffix
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
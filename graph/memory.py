@@ -0,0 +1,209 @@
+"""Token-budgeted chat history with a rolling summary of older turns.
+
+    memory = ConversationMemory(max_tokens=3000, summarizer=get_model())
+    response = llm.invoke(memory.window(state["messages"]))
+
+`window` returns leading system messages, a summary of what no longer fits
+and the most recent messages that fit in `max_tokens` (counted with tiktoken,
+see llms/tokens.py). An assistant message with tool calls is never separated
+from its tool results. The full history stays in the graph state; only the
+prompt is bounded.
+
+Once the unsummarized history grows past `fold_at` of the budget, the
+oldest part is folded into the summary in the background (an asyncio task
+when called from a running loop, otherwise a thread). The turn being answered
+never waits for it: until the fold lands, the window may grow to twice
+`max_tokens` so that nothing leaves it unsummarized.
+"""
+import asyncio
+import logging
+import os
+import threading
+from typing import Any, List, Optional, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage, SystemMessage, ToolMessage, convert_to_messages
+
+from llms.tokens import count_tokens, truncate_tokens
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HISTORY_TOKENS = int(os.getenv("CHAT_HISTORY_TOKENS", "3000"))
+
+SUMMARY_PROMPT = """You maintain a running summary of a conversation between a user and an assistant.
+Update the summary with the new messages below. Keep names, numbers, decisions, open questions and
+tool results the assistant may need later. Reply with the updated summary only, in at most {words} words.
+
+Current summary:
+{summary}
+
+New messages:
+{messages}"""
+
+# Tokens of per-message framing (role, separators) in chat formats
+MESSAGE_OVERHEAD = 4
+
+
+def message_tokens(message: BaseMessage, model: Optional[str] = None) -> int:
+    tokens = MESSAGE_OVERHEAD + count_tokens(str(message.content), model)
+    for call in getattr(message, "tool_calls", None) or []:
+        tokens += count_tokens(f"{call['name']} {call['args']}", model)
+    return tokens
+
+
+def group_units(messages: List[BaseMessage]) -> List[Tuple[int, int]]:
+    """[start, end) ranges that must stay together: a tool-calling AI message and its tool results."""
+    units = []
+    i = 0
+    while i < len(messages):
+        end = i + 1
+        if isinstance(messages[i], AIMessage) and messages[i].tool_calls:
+            while end < len(messages) and isinstance(messages[end], ToolMessage):
+                end += 1
+        units.append((i, end))
+        i = end
+    return units
+
+
+def _render(message: BaseMessage, model: Optional[str]) -> str:
+    if isinstance(message, ToolMessage):
+        return f"tool {message.name or ''}: {truncate_tokens(str(message.content), 200, model)}"
+    text = str(message.content)
+    for call in getattr(message, "tool_calls", None) or []:
+        text += f" [calls {call['name']}({call['args']})]"
+    return f"{message.type}: {text}"
+
+
+class ConversationMemory:
+    """Bounded prompt view of one conversation's history."""
+
+    def __init__(self, max_tokens: int = DEFAULT_HISTORY_TOKENS, summarizer: Any = None,
+                 model: Optional[str] = None, summary_tokens: int = 300, fold_at: float = 0.75,
+                 keep_after_fold: float = 0.5):
+        self.max_tokens = max_tokens
+        self.summarizer = summarizer
+        self.model = model
+        self.summary_tokens = summary_tokens
+        self.fold_at = fold_at
+        self.keep_after_fold = keep_after_fold
+        self.summary = ""
+        self.covered = 0          # leading non-system messages folded into the summary
+        self.folds = 0
+        self.dropped = 0          # most messages ever out of the window but not yet summarized
+        self._tokens: dict = {}
+        self._lock = threading.Lock()
+        self._running: Optional[Any] = None
+
+    def _count(self, message: BaseMessage) -> int:
+        key = (message.id or id(message), len(str(message.content)))
+        tokens = self._tokens.get(key)
+        if tokens is None:
+            if len(self._tokens) > 10_000:
+                self._tokens.clear()
+            tokens = self._tokens[key] = message_tokens(message, self.model)
+        return tokens
+
+    def window(self, messages: List[Any]) -> List[BaseMessage]:
+        """The messages to send to the model for this turn."""
+        messages = convert_to_messages(messages)
+        system = []
+        while len(system) < len(messages) and isinstance(messages[len(system)], SystemMessage):
+            system.append(messages[len(system)])
+        history = messages[len(system):]
+
+        with self._lock:
+            if self.covered > len(history):
+                # A different (or reset) conversation: start over
+                self.summary, self.covered = "", 0
+            summary, covered = self.summary, self.covered
+
+        prefix = list(system)
+        if summary:
+            prefix.append(SystemMessage(content=f"Summary of the earlier conversation:\n{summary}"))
+        budget = self.max_tokens - sum(self._count(m) for m in prefix)
+
+        units = group_units(history)
+        self._maybe_fold(history, units, covered)
+        if self._running is not None:
+            # Messages the running fold has not summarized yet stay in the window, up to another budget
+            budget += self.max_tokens
+        start = len(history)
+        used = 0
+        for unit_start, unit_end in reversed(units):
+            tokens = sum(self._count(m) for m in history[unit_start:unit_end])
+            # The newest unit is always sent, even if it alone is over budget
+            if start < len(history) and (used + tokens > budget or unit_start < covered):
+                break
+            used += tokens
+            start = unit_start
+        if start > covered:
+            self.dropped = max(self.dropped, start - covered)
+            logger.debug(f"{start - covered} messages left the window before being summarized")
+        return prefix + history[start:]
+
+    def _maybe_fold(self, history: List[BaseMessage], units: List[Tuple[int, int]], covered: int) -> None:
+        if self.summarizer is None or self._running is not None:
+            return
+        tail = [(s, e, sum(self._count(m) for m in history[s:e])) for s, e in units if s >= covered]
+        if sum(t for _, _, t in tail) <= self.max_tokens * self.fold_at:
+            return
+        # Fold the oldest units until what is left fits in keep_after_fold of the budget
+        keep, target = 0, len(history)
+        for s, _, tokens in reversed(tail):
+            if keep + tokens > self.max_tokens * self.keep_after_fold:
+                break
+            keep += tokens
+            target = s
+        target = min(target, tail[-1][0])
+        if target <= covered:
+            return
+        chunk = history[covered:target]
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is not None:
+            self._running = loop.create_task(self._afold(chunk, target))
+            # Runs even if the task is cancelled before it starts
+            self._running.add_done_callback(lambda _: self._done())
+        else:
+            self._running = threading.Thread(target=self._fold, args=(chunk, target), daemon=True)
+            self._running.start()
+
+    def _prompt(self, chunk: List[BaseMessage]) -> str:
+        return SUMMARY_PROMPT.format(
+            words=int(self.summary_tokens * 0.75), summary=self.summary or "(none yet)",
+            messages="\n".join(_render(m, self.model) for m in chunk),
+        )
+
+    def _apply(self, text: str, target: int) -> None:
+        with self._lock:
+            self.summary = truncate_tokens(text.strip(), self.summary_tokens, self.model)
+            self.covered = target
+            self.folds += 1
+
+    def _done(self) -> None:
+        # Also after errors and cancellation, or no fold would ever start again
+        with self._lock:
+            self._running = None
+
+    def _fold(self, chunk: List[BaseMessage], target: int) -> None:
+        try:
+            self._apply(str(self.summarizer.invoke(self._prompt(chunk)).content), target)
+        except Exception as e:
+            logger.error(f"Summarizing history failed: {e}")
+        finally:
+            self._done()
+
+    async def _afold(self, chunk: List[BaseMessage], target: int) -> None:
+        try:
+            self._apply(str((await self.summarizer.ainvoke(self._prompt(chunk))).content), target)
+        except Exception as e:
+            logger.error(f"Summarizing history failed: {e}")
+
+    async def wait(self) -> None:
+        """Wait for a background summary in progress (for tests and shutdown)."""
+        running = self._running
+        if isinstance(running, asyncio.Task):
+            await running
+        elif isinstance(running, threading.Thread):
+            await asyncio.to_thread(running.join)
@@ -0,0 +1,117 @@
+"""Named embedding models, built on first use.
+
+    from llms.embeddings import get_embeddings
+    embeddings = get_embeddings()           # EMBEDDINGS_MODEL env var, else openai
+    embeddings = get_embeddings("local")    # offline hashed n-grams, no network
+    embeddings = get_embeddings("ollama")   # nomic-embed-text on the local Ollama
+
+Like llms/registry.py, nothing provider-specific is imported until a model is
+requested and each name is constructed once per process.
+"""
+import os
+import re
+import threading
+import zlib
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+DEFAULT_EMBEDDINGS = "openai"
+
+
+class HashingEmbeddings(Embeddings):
+    """Deterministic local embeddings from hashed character and word n-grams.
+
+    Each text is the L2-normalized sum of signed hash buckets for the character
+    n-grams of its words plus its word unigrams and bigrams. Vectors are equal
+    across processes and machines. They capture lexical overlap, not meaning,
+    which is enough to exercise ingestion and retrieval at scale offline.
+    """
+
+    def __init__(self, dim: int = 384, ngram_range: Tuple[int, int] = (3, 5), seed: int = 0):
+        self.dim = dim
+        self.ngram_range = ngram_range
+        self.seed = seed
+        self.model = f"hashing-{dim}-{ngram_range[0]}-{ngram_range[1]}-{seed}"
+        self._word_buckets = lru_cache(maxsize=200_000)(self._compute_word_buckets)
+
+    def _bucket(self, feature: str) -> Tuple[int, float]:
+        h = zlib.crc32(f"{self.seed}\0{feature}".encode("utf-8"))
+        return h % self.dim, 1.0 if (h // self.dim) & 1 else -1.0
+
+    def _compute_word_buckets(self, word: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Buckets and signs for a word (or a "first second" bigram, which gets no char n-grams)."""
+        if " " in word:
+            features = [f"b:{word}"]
+        else:
+            padded = f"<{word}>"
+            features = [f"w:{word}"]
+            low, high = self.ngram_range
+            for n in range(low, high + 1):
+                features.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+        buckets = [self._bucket(f) for f in features]
+        return (np.fromiter((b[0] for b in buckets), dtype=np.int64, count=len(buckets)),
+                np.fromiter((b[1] for b in buckets), dtype=np.float32, count=len(buckets)))
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = re.findall(r"\w+", text.lower())
+            if not words:
+                continue
+            parts = [self._word_buckets(w) for w in words]
+            parts.extend(self._word_buckets(f"{a} {c}") for a, c in zip(words, words[1:]))
+            matrix[row] = np.bincount(np.concatenate([p[0] for p in parts]),
+                                      weights=np.concatenate([p[1] for p in parts]), minlength=self.dim)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix.tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+def _openai() -> Embeddings:
+    from dotenv import load_dotenv
+    from langchain_openai import OpenAIEmbeddings
+    load_dotenv()
+    return OpenAIEmbeddings()
+
+
+def _ollama() -> Embeddings:
+    from langchain_ollama import OllamaEmbeddings
+    # Same local Ollama server as llms/llama_local.py
+    return OllamaEmbeddings(model=os.getenv("OLLAMA_EMBEDDINGS_MODEL", "nomic-embed-text"),
+                            base_url="http://localhost:11434/")
+
+
+EMBEDDINGS: Dict[str, Callable[[], Embeddings]] = {
+    "openai": _openai,
+    "ollama": _ollama,
+    "local": HashingEmbeddings,
+}
+
+_instances: Dict[str, Any] = {}
+_lock = threading.Lock()
+
+
+def register_embeddings(name: str, factory: Callable[[], Embeddings]) -> None:
+    """Add or replace a named embeddings factory."""
+    EMBEDDINGS[name] = factory
+    _instances.pop(name, None)
+
+
+def get_embeddings(name: Optional[str] = None) -> Embeddings:
+    """Return the embeddings model for `name` (or EMBEDDINGS_MODEL), building it on first use."""
+    name = name or os.getenv("EMBEDDINGS_MODEL") or DEFAULT_EMBEDDINGS
+    if name not in EMBEDDINGS:
+        raise ValueError(f"Unknown embeddings '{name}', expected one of {sorted(EMBEDDINGS)}")
+    instance = _instances.get(name)
+    if instance is None:
+        with _lock:
+            instance = _instances.get(name)
+            if instance is None:
+                instance = _instances[name] = EMBEDDINGS[name]()
+    return instance
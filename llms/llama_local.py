@@ -1,9 +1,8 @@
-from langchain.chat_models import init_chat_model
+from llms.registry import get_model
 
-local_llama = init_chat_model(
-    model="llama3.2",
-    base_url="http://localhost:11434/",
-    api_key="docker",
-    model_provider="ollama",
-    temperature=1,
-)
\ No newline at end of file
+
+def __getattr__(name):
+    # Built on first access rather than at import time
+    if name == "local_llama":
+        return get_model("llama3.2")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
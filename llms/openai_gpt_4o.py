@@ -1,9 +1,8 @@
-import os
-from dotenv import load_dotenv
-from langchain.chat_models import init_chat_model
-load_dotenv()
-os.environ["OPENAI_API_KEY"] = os.getenv("OPENAI_API_KEY") or ""
+from llms.registry import get_model
 
-gpt4o_mini = init_chat_model(
-    model="gpt-4o-mini",
-)
\ No newline at end of file
+
+def __getattr__(name):
+    # Built on first access rather than at import time
+    if name == "gpt4o_mini":
+        return get_model("gpt-4o-mini")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,201 @@
+"""Stable prompt prefixes and prompt-cache metrics.
+
+    layout = PromptLayout(system="You are a project manager.", templates=(prd_template,))
+    messages = layout.messages(f"Create a PRD for: {topic}")
+    response = llm.invoke(messages)            # models from llms.registry report to prefix_metrics()
+    print(prefix_metrics().summary())
+
+OpenAI caches prompts of 1024+ tokens by their prefix, and Ollama reuses the
+KV cache for the part of a prompt that matches the previous request. Both only
+help when requests start with the same tokens. `PromptLayout` puts the static
+parts first, in a fixed order: the system prompt, then the templates. The
+per-call content always goes last. Tool schemas, which providers put ahead of
+the messages, are bound sorted by name in agent/graph_factory.py.
+
+`PrefixMetrics` is a callback that records, for each call:
+- the input tokens;
+- the cached tokens the provider reports (OpenAI's `cache_read`);
+- how many leading tokens repeat a prefix this process already sent to the same model.
+
+A repeated prefix is either whole leading messages seen in any earlier prompt,
+or the longest common token prefix with the previous prompt to that model
+(which is what Ollama's KV cache reuses, e.g. a template at the start of a
+user message that ends with the topic). The larger of the two is an upper
+bound on what a cache could reuse. It is the only number available for
+providers that report nothing.
+"""
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+
+from llms.tokens import count_tokens, get_encoding
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PromptLayout:
+    """Static prompt content, kept in front of everything that varies per call."""
+    system: str
+    templates: Tuple[str, ...] = ()
+
+    @cached_property
+    def prefix(self) -> str:
+        return "\n\n".join([self.system.strip(), *(t.strip() for t in self.templates)])
+
+    @cached_property
+    def prefix_tokens(self) -> int:
+        return count_tokens(self.prefix)
+
+    def messages(self, *content: str, history: Sequence[Any] = ()) -> List[Any]:
+        """System prefix, then `history`, then `content` as the new user message."""
+        return [SystemMessage(content=self.prefix), *history, HumanMessage(content="\n\n".join(content))]
+
+
+@dataclass
+class CallMetrics:
+    model: str
+    input_tokens: int
+    cached_tokens: Optional[int]    # reported by the provider, None if it reports nothing
+    prefix_tokens: int              # leading tokens already sent to this model from this process
+
+    @property
+    def uncached_tokens(self) -> int:
+        cached = self.cached_tokens if self.cached_tokens is not None else 0
+        return max(self.input_tokens - cached, 0)
+
+
+def _message_key(message: BaseMessage) -> str:
+    calls = getattr(message, "tool_calls", None) or ""
+    return f"{message.type}\0{message.content}\0{calls}"
+
+
+class PrefixMetrics(BaseCallbackHandler):
+    """Callback recording cached vs uncached input tokens per chat model call."""
+
+    # Cheap and order-sensitive: run in the caller's thread, not an executor
+    run_inline = True
+
+    def __init__(self, max_prefixes: int = 4096, max_calls: int = 1000):
+        self.max_prefixes = max_prefixes
+        self.max_calls = max_calls
+        self.calls: List[CallMetrics] = []
+        # (model, hash of messages[:i+1]) -> tokens in messages[:i+1]
+        self._seen: "OrderedDict[Tuple[str, str], int]" = OrderedDict()
+        self._pending: Dict[UUID, Tuple[str, int, int]] = {}
+        # model -> (message key, message) of the last prompt it was sent
+        self._last: Dict[str, List[Tuple[str, BaseMessage]]] = {}
+        self._lock = threading.Lock()
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[List[BaseMessage]], *,
+                            run_id: UUID, **kwargs: Any) -> None:
+        params = kwargs.get("invocation_params") or {}
+        model = str(params.get("model") or params.get("model_name") or (serialized.get("id") or ["?"])[-1])
+        prompt = messages[0]
+        digest = hashlib.sha256()
+        total = reused = 0
+        keys = [_message_key(message) for message in prompt]
+        cumulative = []
+        with self._lock:
+            for message, message_key in zip(prompt, keys):
+                digest.update(message_key.encode("utf-8"))
+                key = (model, digest.hexdigest())
+                tokens = self._seen.get(key)
+                if tokens is not None:
+                    self._seen.move_to_end(key)
+                    total = reused = tokens
+                else:
+                    total += count_tokens(str(message.content), model)
+                    self._seen[key] = total
+                cumulative.append(total)
+            while len(self._seen) > self.max_prefixes:
+                self._seen.popitem(last=False)
+            last = self._last.get(model, [])
+            self._last[model] = list(zip(keys, prompt))
+            reused = max(reused, self._common_tokens(prompt, keys, cumulative, last, model))
+            self._pending[run_id] = (model, total, reused)
+
+    @staticmethod
+    def _common_tokens(prompt: List[BaseMessage], keys: List[str], cumulative: List[int],
+                       last: List[Tuple[str, BaseMessage]], model: str) -> int:
+        """Leading tokens `prompt` shares with the previous prompt `last`."""
+        same = 0
+        while same < min(len(keys), len(last)) and keys[same] == last[same][0]:
+            same += 1
+        common = cumulative[same - 1] if same else 0
+        if same < min(len(keys), len(last)) and prompt[same].type == last[same][1].type:
+            # Only the first differing message needs tokenizing
+            encoding = get_encoding(model)
+            new = encoding.encode(str(prompt[same].content), disallowed_special=())
+            old = encoding.encode(str(last[same][1].content), disallowed_special=())
+            shared = 0
+            while shared < min(len(new), len(old)) and new[shared] == old[shared]:
+                shared += 1
+            common += shared
+        return common
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            pending = self._pending.pop(run_id, None)
+        if pending is None:
+            return
+        model, total, reused = pending
+        usage = None
+        try:
+            usage = response.generations[0][0].message.usage_metadata
+        except (AttributeError, IndexError):
+            pass
+        input_tokens = (usage or {}).get("input_tokens") or total
+        cached = ((usage or {}).get("input_token_details") or {}).get("cache_read")
+        metrics = CallMetrics(model=model, input_tokens=input_tokens, cached_tokens=cached, prefix_tokens=reused)
+        logger.info(f"{model}: {input_tokens} input tokens, "
+                    f"{'?' if cached is None else cached} cached, {reused} in a repeated prefix")
+        with self._lock:
+            self.calls.append(metrics)
+            del self.calls[:-self.max_calls]
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            self._pending.pop(run_id, None)
+
+    def totals(self) -> Dict[str, int]:
+        with self._lock:
+            calls = list(self.calls)
+        return {
+            "calls": len(calls),
+            "input_tokens": sum(c.input_tokens for c in calls),
+            "cached_tokens": sum(c.cached_tokens or 0 for c in calls),
+            "uncached_tokens": sum(c.uncached_tokens for c in calls),
+            "prefix_tokens": sum(c.prefix_tokens for c in calls),
+        }
+
+    def summary(self) -> str:
+        t = self.totals()
+        share = t["prefix_tokens"] / t["input_tokens"] if t["input_tokens"] else 0.0
+        return (f"{t['calls']} calls, {t['input_tokens']} input tokens: {t['cached_tokens']} cached by the provider, "
+                f"{t['uncached_tokens']} uncached; {share:.0%} in a repeated prefix")
+
+    def reset(self) -> None:
+        with self._lock:
+            self.calls.clear()
+            self._seen.clear()
+            self._last.clear()
+
+
+_metrics: Optional[PrefixMetrics] = None
+
+
+def prefix_metrics() -> PrefixMetrics:
+    """Process-wide metrics; llms.registry attaches it to every model it builds."""
+    global _metrics
+    if _metrics is None:
+        _metrics = PrefixMetrics()
+    return _metrics
@@ -0,0 +1,100 @@
+"""Named chat models, built on first use.
+
+    from llms.registry import get_model
+    llm = get_model()                  # LLM_MODEL env var, else gpt-4o-mini
+    llm = get_model("local")           # by name or alias
+    llm = get_model(default="local")   # LLM_MODEL still wins if it is set
+
+Nothing provider-specific is imported until a model is actually requested, and
+each distinct configuration is constructed once per process.
+"""
+import os
+import threading
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Optional
+
+DEFAULT_MODEL = "gpt-4o-mini"
+
+
+@dataclass(frozen=True)
+class ModelConfig:
+    """Arguments for init_chat_model."""
+    model: str
+    model_provider: Optional[str] = None
+    base_url: Optional[str] = None
+    api_key: Optional[str] = None
+    temperature: Optional[float] = None
+    keep_alive: Optional[str] = None  # Ollama: how long the model (and its KV cache) stays loaded
+
+
+MODELS: Dict[str, ModelConfig] = {
+    "gpt-4o-mini": ModelConfig(model="gpt-4o-mini", model_provider="openai"),
+    "gpt-3.5-turbo": ModelConfig(model="gpt-3.5-turbo", model_provider="openai"),
+    "llama3.2": ModelConfig(
+        model="llama3.2",
+        base_url="http://localhost:11434/",
+        api_key="docker",
+        model_provider="ollama",
+        temperature=1,
+        keep_alive="30m",
+    ),
+    "smollm2": ModelConfig(
+        model="ai/smollm2",
+        base_url="http://localhost:12434/engines/v1",
+        api_key="docker",
+        model_provider="openai",
+    ),
+}
+
+ALIASES: Dict[str, str] = {
+    "openai": "gpt-4o-mini",
+    "local": "llama3.2",
+}
+
+_models: Dict[ModelConfig, Any] = {}
+_lock = threading.Lock()
+
+
+def register_model(name: str, config: ModelConfig) -> None:
+    """Add or replace a named model configuration."""
+    MODELS[name] = config
+
+
+def resolve(name: Optional[str] = None, default: Optional[str] = None) -> ModelConfig:
+    """Look up a model config by name or alias, falling back to LLM_MODEL and `default`."""
+    name = name or os.getenv("LLM_MODEL") or default or DEFAULT_MODEL
+    name = ALIASES.get(name, name)
+    if name not in MODELS:
+        raise ValueError(f"Unknown model '{name}', expected one of {sorted(MODELS) + sorted(ALIASES)}")
+    return MODELS[name]
+
+
+def _build(config: ModelConfig):
+    from langchain.chat_models import init_chat_model
+    from llms.prompt_cache import prefix_metrics
+    from llms.response_cache import get_response_cache
+
+    if config.model_provider == "openai" and config.base_url is None:
+        from dotenv import load_dotenv
+        load_dotenv()
+        os.environ["OPENAI_API_KEY"] = os.getenv("OPENAI_API_KEY") or ""
+
+    kwargs = {k: v for k, v in vars(config).items() if v is not None}
+    return init_chat_model(cache=get_response_cache(), callbacks=[prefix_metrics()], **kwargs)
+
+
+def get_model(name: Optional[str] = None, default: Optional[str] = None, **overrides):
+    """Return the chat model for `name`, building it on first use.
+
+    Keyword overrides (e.g. temperature=0) produce a separate memoized instance.
+    """
+    config = resolve(name, default)
+    if overrides:
+        config = replace(config, **overrides)
+    model = _models.get(config)
+    if model is None:
+        with _lock:
+            model = _models.get(config)
+            if model is None:
+                model = _models[config] = _build(config)
+    return model
@@ -0,0 +1,276 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Literal, Optional, Tuple
+
+import numpy as np
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, Generation
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parent.parent / ".cache" / "llm_responses.sqlite"
+
+
+def _strip_ids(value: Any) -> Any:
+    """Drop ids and surrounding whitespace so equal prompts hash equally.
+
+    The message type is still kept in kwargs["type"].
+    """
+    if isinstance(value, dict):
+        return {k: _strip_ids(v) for k, v in value.items() if k != "id"}
+    if isinstance(value, list):
+        return [_strip_ids(v) for v in value]
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def normalize_prompt(prompt: str) -> Tuple[str, str, str]:
+    """Split a serialized chat prompt into (canonical JSON, canonical context, last message text).
+
+    The context is everything before the last message; semantic matches are only
+    made between prompts that share it exactly.
+    """
+    try:
+        messages = json.loads(prompt)
+    except ValueError:
+        return prompt.strip(), "", prompt.strip()
+    messages = _strip_ids(messages)
+    if not isinstance(messages, list) or not messages:
+        canonical = json.dumps(messages, sort_keys=True, separators=(",", ":"))
+        return canonical, "", canonical
+    last = messages[-1]
+    kwargs = last.get("kwargs", {}) if isinstance(last, dict) else {}
+    return (
+        json.dumps(messages, sort_keys=True, separators=(",", ":")),
+        json.dumps(messages[:-1], sort_keys=True, separators=(",", ":")),
+        str(kwargs.get("content", "")),
+    )
+
+
+def _dump_generations(generations: RETURN_VAL_TYPE) -> str:
+    items = []
+    for g in generations:
+        if isinstance(g, ChatGeneration):
+            items.append({"message": message_to_dict(g.message), "info": g.generation_info})
+        else:
+            items.append({"text": g.text, "info": g.generation_info})
+    return json.dumps(items)
+
+
+def _load_generations(payload: str) -> RETURN_VAL_TYPE:
+    generations: List[Generation] = []
+    for item in json.loads(payload):
+        if "message" in item:
+            message = messages_from_dict([item["message"]])[0]
+            generations.append(ChatGeneration(message=message, generation_info=item["info"]))
+        else:
+            generations.append(Generation(text=item["text"], generation_info=item["info"]))
+    return generations
+
+
+class ResponseCache(BaseCache):
+    """SQLite-backed LLM response cache with an optional similarity mode.
+
+    In "exact" mode a hit needs the same model, parameters and messages (ignoring
+    message ids and surrounding whitespace). In "semantic" mode a prompt is also a
+    hit when everything but its last message matches a cached prompt exactly and
+    the last message's embedding is within `threshold` cosine similarity. Entries older than `ttl` seconds are
+    dropped on lookup and the least recently used ones beyond `max_entries` are
+    evicted on insert.
+
+    Pass it as `cache=` to `init_chat_model` or any LangChain chat model.
+    """
+
+    def __init__(
+        self,
+        path: str | Path = DEFAULT_CACHE_PATH,
+        mode: Literal["exact", "semantic"] = "exact",
+        embeddings: Optional[Embeddings] = None,
+        threshold: float = 0.95,
+        max_entries: int = 10_000,
+        ttl: Optional[float] = None,
+    ):
+        if mode == "semantic" and embeddings is None:
+            raise ValueError("Semantic mode needs an embeddings model")
+        self.mode = mode
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # scope -> (keys, normalized embedding matrix), rebuilt after writes
+        self._vectors: Dict[str, Tuple[List[str], np.ndarray]] = {}
+        # (scope, text) -> embedding from a lookup, so the update after a miss doesn't embed again
+        self._recent: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA mmap_size=268435456")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, scope TEXT, created_at REAL, last_access REAL, "
+            "embedding BLOB, generations TEXT)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_scope ON responses (scope)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_access ON responses (last_access)")
+        self._db.commit()
+
+    @staticmethod
+    def _keys(prompt: str, llm_string: str) -> Tuple[str, str, str]:
+        """(entry key, semantic scope, text to embed) for a prompt/model pair."""
+        canonical, context, text = normalize_prompt(prompt)
+        key = hashlib.sha256(f"{llm_string}\0{canonical}".encode("utf-8")).hexdigest()
+        scope = hashlib.sha256(f"{llm_string}\0{context}".encode("utf-8")).hexdigest()
+        return key, scope, text
+
+    def _embed(self, scope: str, text: str) -> np.ndarray:
+        assert self.embeddings is not None
+        with self._lock:
+            vector = self._recent.pop((scope, text), None)
+        if vector is None:
+            vector = np.asarray(self.embeddings.embed_query(text), dtype=np.float32)
+            norm = np.linalg.norm(vector)
+            vector = vector / norm if norm else vector
+        with self._lock:
+            self._recent[(scope, text)] = vector
+            while len(self._recent) > 256:
+                self._recent.popitem(last=False)
+        return vector
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl is not None and time.time() - created_at > self.ttl
+
+    def _load(self, key: str) -> Optional[RETURN_VAL_TYPE]:
+        row = self._db.execute("SELECT created_at, generations FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        if self._expired(row[0]):
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._db.commit()
+            self._vectors.clear()
+            return None
+        self._db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+        self._db.commit()
+        return _load_generations(row[1])
+
+    def _nearest(self, scope: str, vector: np.ndarray) -> Optional[str]:
+        if scope not in self._vectors:
+            rows = self._db.execute(
+                "SELECT key, embedding FROM responses WHERE scope = ? AND embedding IS NOT NULL", (scope,)
+            ).fetchall()
+            keys = [row[0] for row in rows]
+            matrix = np.stack([np.frombuffer(row[1], dtype=np.float32) for row in rows]) if rows else np.zeros((0, 0), np.float32)
+            self._vectors[scope] = (keys, matrix)
+        keys, matrix = self._vectors[scope]
+        if not keys or matrix.shape[1] != vector.shape[0]:
+            return None
+        scores = matrix @ vector
+        best = int(np.argmax(scores))
+        return keys[best] if scores[best] >= self.threshold else None
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key, scope, text = self._keys(prompt, llm_string)
+        with self._lock:
+            result = self._load(key)
+            if result is not None:
+                self.hits += 1
+                return result
+        if self.mode == "semantic":
+            vector = self._embed(scope, text)
+            with self._lock:
+                nearest = self._nearest(scope, vector)
+                result = self._load(nearest) if nearest else None
+                if result is not None:
+                    self.hits += 1
+                    self.semantic_hits += 1
+                    return result
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        key, scope, text = self._keys(prompt, llm_string)
+        embedding = self._embed(scope, text).tobytes() if self.mode == "semantic" else None
+        now = time.time()
+        generations = _dump_generations(return_val)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, scope, created_at, last_access, embedding, generations) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, scope, now, now, embedding, generations),
+            )
+            (count,) = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()
+            if count > self.max_entries:
+                self._db.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY last_access ASC LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+            self._db.commit()
+            self._vectors.pop(scope, None)
+            if count > self.max_entries:
+                self._vectors.clear()
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+            self._vectors.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits, semantic_hits, misses = self.hits, self.semantic_hits, self.misses
+            (entries,) = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "semantic_hits": semantic_hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "entries": entries,
+        }
+
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Process-wide response cache configured from the environment, or None.
+
+    LLM_CACHE=exact|semantic enables it (default off); LLM_CACHE_PATH,
+    LLM_CACHE_TTL, LLM_CACHE_MAX_ENTRIES and LLM_CACHE_THRESHOLD tune it.
+    """
+    global _response_cache
+    mode = os.getenv("LLM_CACHE", "off").lower()
+    if mode not in ("exact", "semantic"):
+        return None
+    if _response_cache is None:
+        embeddings = None
+        if mode == "semantic":
+            from langchain_openai import OpenAIEmbeddings
+            embeddings = OpenAIEmbeddings()
+        ttl = os.getenv("LLM_CACHE_TTL")
+        _response_cache = ResponseCache(
+            path=os.getenv("LLM_CACHE_PATH") or DEFAULT_CACHE_PATH,
+            mode=mode,  # type: ignore[arg-type]
+            embeddings=embeddings,
+            threshold=float(os.getenv("LLM_CACHE_THRESHOLD", "0.95")),
+            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000")),
+            ttl=float(ttl) if ttl else None,
+        )
+    return _response_cache
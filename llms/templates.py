@@ -0,0 +1,131 @@
+"""Instruction templates, loaded once and reloaded when the file changes.
+
+    from llms.templates import get_templates
+    templates = get_templates()                      # instruction/ at the project root
+    templates.get("create-prd").tokens               # counted once per version
+    layout = templates.layout("create-prd", system="You are a project manager.")
+
+Templates are looked up by file name, with or without the extension
+(.mdc, then .md). The file's mtime and size are checked at most every
+`check_interval` seconds, and a changed file is re-read and re-counted on its
+next use. Cursor-style front matter (a leading `---` block) is stripped, since
+it is editor metadata, not prompt.
+"""
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from llms.prompt_cache import PromptLayout
+from llms.tokens import count_tokens
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROOT = Path(__file__).resolve().parent.parent / "instruction"
+EXTENSIONS = (".mdc", ".md")
+
+
+@dataclass(frozen=True)
+class Template:
+    name: str
+    path: Path
+    text: str
+    tokens: int
+    version: Tuple[int, int]    # (mtime_ns, size) it was read at
+
+
+def _strip_front_matter(text: str) -> str:
+    if text.startswith("---"):
+        end = text.find("\n---", 3)
+        if end != -1:
+            return text[end + 4:]
+    return text
+
+
+class TemplateRegistry:
+    """Named instruction templates with mtime-based hot reload."""
+
+    def __init__(self, root: str | Path = DEFAULT_ROOT, model: Optional[str] = None, check_interval: float = 1.0):
+        self.root = Path(root)
+        self.model = model
+        self.check_interval = check_interval
+        self.loads = 0
+        self.hits = 0
+        self._templates: Dict[str, Template] = {}
+        self._checked: Dict[str, float] = {}
+        self._layouts: Dict[Tuple[str, Tuple[int, int], str, str], PromptLayout] = {}
+        self._lock = threading.Lock()
+
+    def _resolve(self, name: str) -> Path:
+        path = Path(name) if os.path.isabs(name) else self.root / name
+        if path.suffix:
+            candidates = [path]
+        else:
+            candidates = [path.with_name(path.name + ext) for ext in EXTENSIONS]
+        for candidate in candidates:
+            if candidate.is_file():
+                return candidate
+        raise FileNotFoundError(f"Template not found: {name} (looked in {self.root})")
+
+    def _load(self, name: str, path: Path, version: Tuple[int, int]) -> Template:
+        text = _strip_front_matter(path.read_text(encoding="utf-8")).strip()
+        if not text:
+            raise ValueError(f"Template is empty: {path}")
+        template = Template(name=name, path=path, text=text, tokens=count_tokens(text, self.model), version=version)
+        self.loads += 1
+        logger.info(f"Loaded template {name} ({template.tokens} tokens) from {path}")
+        return template
+
+    def get(self, name: str) -> Template:
+        """The current version of template `name`."""
+        with self._lock:
+            template = self._templates.get(name)
+            now = time.monotonic()
+            if template is not None and now - self._checked.get(name, 0.0) < self.check_interval:
+                self.hits += 1
+                return template
+            path = template.path if template is not None else self._resolve(name)
+            stat = path.stat()
+            version = (stat.st_mtime_ns, stat.st_size)
+            if template is None or template.version != version:
+                if template is not None:
+                    logger.info(f"Template {name} changed on disk, reloading")
+                template = self._templates[name] = self._load(name, path, version)
+            else:
+                self.hits += 1
+            self._checked[name] = now
+            return template
+
+    def text(self, name: str) -> str:
+        return self.get(name).text
+
+    def layout(self, name: str, system: str, intro: str = "Use this template:") -> PromptLayout:
+        """A PromptLayout of `system` followed by the template; the same object until the file changes."""
+        template = self.get(name)
+        key = (name, template.version, system, intro)
+        with self._lock:
+            layout = self._layouts.get(key)
+            if layout is None:
+                # Old versions of this template's layouts are no longer reachable
+                self._layouts = {k: v for k, v in self._layouts.items() if k[0] != name or k[1] == template.version}
+                layout = self._layouts[key] = PromptLayout(system=system, templates=(f"{intro}\n\n{template.text}",))
+            return layout
+
+    def preload(self) -> Dict[str, Template]:
+        """Load every template under the root, e.g. at startup."""
+        names = sorted({p.stem for p in self.root.iterdir() if p.suffix in EXTENSIONS})
+        return {name: self.get(name) for name in names}
+
+
+_templates: Optional[TemplateRegistry] = None
+
+
+def get_templates() -> TemplateRegistry:
+    """Process-wide registry over the project's instruction/ directory."""
+    global _templates
+    if _templates is None:
+        _templates = TemplateRegistry()
+    return _templates
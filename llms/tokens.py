@@ -0,0 +1,63 @@
+"""Token counting with tiktoken.
+
+    from llms.tokens import count_tokens, truncate_tokens
+    count_tokens("hello world", model="gpt-4o-mini")
+
+Encodings are loaded once per model. tiktoken downloads its BPE files on first
+use; when that isn't possible (offline, local models) counts fall back to a
+word/punctuation approximation, which is close enough for budgeting.
+"""
+import logging
+import re
+from functools import lru_cache
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENCODING = "cl100k_base"
+
+
+class _ApproxEncoding:
+    """Stand-in for a tiktoken Encoding: one token per word or punctuation mark."""
+
+    name = "approx"
+    _pieces = re.compile(r"\s*\w+|\s*[^\w\s]|\s+")
+
+    def encode(self, text: str, **kwargs) -> list:
+        return self._pieces.findall(text)
+
+    def decode(self, tokens: list) -> str:
+        return "".join(tokens)
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model: Optional[str] = None) -> Any:
+    import tiktoken
+    try:
+        if model:
+            try:
+                return tiktoken.encoding_for_model(model)
+            except KeyError:
+                pass
+        return tiktoken.get_encoding(DEFAULT_ENCODING)
+    except Exception as e:
+        logger.warning(f"tiktoken encoding unavailable ({type(e).__name__}); approximating token counts")
+        return _ApproxEncoding()
+
+
+def model_name(llm: Any) -> Optional[str]:
+    """Best-effort model name of a LangChain chat model, for picking an encoding."""
+    return getattr(llm, "model_name", None) or getattr(llm, "model", None)
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    return len(get_encoding(model).encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int, model: Optional[str] = None) -> str:
+    """The longest prefix of `text` that is at most `max_tokens` tokens."""
+    encoding = get_encoding(model)
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max(max_tokens, 0)])
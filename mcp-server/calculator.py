@@ -1,20 +1,24 @@
 from mcp.server.fastmcp import FastMCP
+from mcp.types import ToolAnnotations
 
 mcp = FastMCP()
 
-@mcp.tool()
+# Pure functions: clients may cache results by arguments
+pure = ToolAnnotations(readOnlyHint=True, idempotentHint=True, openWorldHint=False)
+
+@mcp.tool(annotations=pure)
 def add_numbers(a: int, b: int) -> int:
     """Add two numbers."""
     return a + b
-@mcp.tool()
+@mcp.tool(annotations=pure)
 def subtract_numbers(a: int, b: int) -> int:
     """Subtract two numbers."""
     return a - b
-@mcp.tool()
+@mcp.tool(annotations=pure)
 def multiply_numbers(a: int, b: int) -> int:
     """Multiply two numbers."""
     return a * b
-@mcp.tool()
+@mcp.tool(annotations=pure)
 def divide_numbers(a: int, b: int) -> float:
     """Divide two numbers."""
     if b == 0:
@@ -1,8 +1,10 @@
 from mcp.server.fastmcp import FastMCP
+from mcp.types import ToolAnnotations
 
 mcp = FastMCP()
 
-@mcp.tool()
+# Read-only, but it reports the outside world (openWorldHint), so agent/tool_cache.py won't cache it by default
+@mcp.tool(annotations=ToolAnnotations(readOnlyHint=True, idempotentHint=True, openWorldHint=True))
 def get_weather(city: str) -> str:
     """Get the current weather for a given city."""
     return f"The current weather in {city} is sunny with a temperature of 25°C."
@@ -0,0 +1,191 @@
+"""Thumbnails and WebP/JPEG previews for stored images, built in worker processes.
+
+    pool = DerivativePool("generated_images")
+    pool.submit(artifact)            # returns at once; work happens in another process
+    pool.paths(artifact.hash)        # {"thumb": .../<hash>.thumb.webp, ...} once built
+
+    python -m media.derivatives generated_images --workers 4   # backfill everything stored
+
+Derivatives live under `<store>/derived/` next to the sharded originals, named
+after the original's content hash, so building them twice is a no-op. Large
+sources are shrunk by an integer factor with `Image.reduce` (or decoded at
+reduced size with `Image.draft` for JPEGs) before the final Lanczos resize,
+and each smaller size is made from the previous one rather than the original.
+"""
+import argparse
+import atexit
+import logging
+import multiprocessing
+import os
+import threading
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp"}
+
+
+@dataclass(frozen=True)
+class DerivativeSpec:
+    name: str
+    max_size: int      # longest side in pixels
+    format: str        # Pillow format name
+    quality: int
+
+    @property
+    def ext(self) -> str:
+        return ".jpg" if self.format == "JPEG" else f".{self.format.lower()}"
+
+
+DERIVATIVES: List[DerivativeSpec] = [
+    DerivativeSpec("preview", 1024, "WEBP", 82),
+    DerivativeSpec("preview_jpeg", 1024, "JPEG", 85),
+    DerivativeSpec("thumb", 256, "WEBP", 80),
+]
+
+
+def derivative_path(root: Path, digest: str, spec: DerivativeSpec) -> Path:
+    return Path(root) / "derived" / digest[:2] / digest[2:4] / f"{digest}.{spec.name}{spec.ext}"
+
+
+def _shrink(image, max_size: int):
+    """Scale `image` so its longest side is at most `max_size`."""
+    from PIL import Image
+
+    longest = max(image.size)
+    if longest <= max_size:
+        return image
+    # Cheap box reduction to within 2x of the target, then a quality resize for the rest
+    factor = longest // (max_size * 2)
+    if factor > 1:
+        image = image.reduce(factor)
+    scale = max_size / max(image.size)
+    return image.resize((max(1, round(image.width * scale)), max(1, round(image.height * scale))),
+                        Image.Resampling.LANCZOS)
+
+
+def _save(image, path: Path, spec: DerivativeSpec) -> None:
+    from PIL import Image
+
+    if spec.format == "JPEG" and image.mode != "RGB":
+        # JPEG has no alpha: flatten onto white
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A") if "A" in image.getbands() else None)
+        image = background
+    path.parent.mkdir(parents=True, exist_ok=True)
+    part = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.part")
+    image.save(part, format=spec.format, quality=spec.quality)
+    os.replace(part, path)
+
+
+def build_derivatives(source: str, digest: str, root: str, specs: List[DerivativeSpec] = DERIVATIVES) -> Dict[str, str]:
+    """Build the missing derivatives of one image; runs in a worker process."""
+    from PIL import Image
+
+    missing = [s for s in specs if not derivative_path(Path(root), digest, s).exists()]
+    if missing:
+        with Image.open(source) as image:
+            largest = max(s.max_size for s in missing)
+            if image.format == "JPEG":
+                # Decode at a reduced scale straight from the DCT coefficients
+                image.draft("RGB", (largest, largest))
+            image = image.convert("RGBA" if "A" in image.getbands() or image.mode == "P" else "RGB")
+            for spec in sorted(missing, key=lambda s: s.max_size, reverse=True):
+                image = _shrink(image, spec.max_size)
+                _save(image, derivative_path(Path(root), digest, spec), spec)
+    return {s.name: str(derivative_path(Path(root), digest, s)) for s in specs}
+
+
+class DerivativePool:
+    """Builds derivatives of stored artifacts off the calling thread, in a process pool."""
+
+    def __init__(self, root: str | Path = "generated_images", workers: Optional[int] = None,
+                 specs: Optional[List[DerivativeSpec]] = None):
+        self.root = Path(root)
+        self.specs = specs or DERIVATIVES
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: callers hold threads (download loop, render pool) that fork would copy mid-lock
+            self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def paths(self, digest: str) -> Dict[str, Path]:
+        """Derivatives of `digest` that exist on disk, by name."""
+        found = {s.name: derivative_path(self.root, digest, s) for s in self.specs}
+        return {name: path for name, path in found.items() if path.exists()}
+
+    def submit(self, artifact) -> Optional[Future]:
+        """Queue derivatives for an artifact (anything with `.hash` and `.path`); None if nothing to do."""
+        if Path(artifact.path).suffix.lower() not in IMAGE_EXTENSIONS:
+            return None
+        if len(self.paths(artifact.hash)) == len(self.specs):
+            return None
+        with self._lock:
+            future = self._pending.get(artifact.hash)
+            if future is None:
+                future = self._pool().submit(build_derivatives, str(artifact.path), artifact.hash,
+                                             str(self.root), self.specs)
+                self._pending[artifact.hash] = future
+                future.add_done_callback(lambda f, digest=artifact.hash: self._done(digest, f))
+        return future
+
+    def _done(self, digest: str, future: Future) -> None:
+        with self._lock:
+            self._pending.pop(digest, None)
+        if not future.cancelled() and future.exception():
+            logger.error(f"Building derivatives of {digest[:12]} failed: {future.exception()}")
+
+    def close(self, wait: bool = True) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=not wait)
+            self._executor = None
+
+
+_shared: Dict[str, DerivativePool] = {}
+
+
+def shared_pool(root: str | Path = "generated_images") -> DerivativePool:
+    """One pool per store root per process; pending work finishes at exit."""
+    key = str(Path(root).resolve())
+    if key not in _shared:
+        _shared[key] = DerivativePool(root)
+        atexit.register(_shared[key].close)
+    return _shared[key]
+
+
+def main():
+    from media.store import ArtifactStore
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Build thumbnails and previews for stored images")
+    parser.add_argument("root", nargs="?", default="generated_images")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    store = ArtifactStore(args.root)
+    pool = DerivativePool(args.root, workers=args.workers)
+    seen, submitted, offset = set(), 0, 0
+    while True:
+        page = store.list(limit=500, offset=offset)
+        if not page:
+            break
+        offset += len(page)
+        for artifact in page:
+            if artifact.hash not in seen and artifact.path.exists():
+                seen.add(artifact.hash)
+                submitted += pool.submit(artifact) is not None
+    pool.close()
+    logger.info(f"{len(seen)} artifacts, built derivatives for {submitted}")
+
+
+if __name__ == "__main__":
+    main()
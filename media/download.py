@@ -0,0 +1,170 @@
+"""Streaming downloads straight to disk over pooled HTTP connections.
+
+    async with Downloader() as downloader:
+        await downloader.download(url, "generated_images/fox.png")
+        await downloader.download_many([(url1, path1), (url2, path2)])
+
+    download(url, "generated_images/fox.png")   # from sync code or threads
+
+Bodies are written chunk by chunk to a unique `.part` file next to the
+destination, then renamed into place once complete, so readers never see a
+partial file and concurrent downloads (even to the same path) don't collide.
+Connection errors, timeouts, 429 and 5xx responses, and truncated bodies are
+retried with exponential backoff. Other 4xx responses fail at once.
+"""
+import asyncio
+import atexit
+import logging
+import os
+import random
+import threading
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class DownloadError(Exception):
+    """A download failed for good (non-retryable status or retries exhausted)."""
+
+
+@dataclass
+class DownloadOptions:
+    timeout: float = 30.0
+    retries: int = 3
+    backoff: float = 0.5          # first retry delay; doubles each attempt, with jitter
+    max_backoff: float = 8.0
+    chunk_size: int = 1 << 16
+    max_connections: int = 16
+    max_concurrency: int = 8      # downloads in flight per Downloader
+    fsync: bool = False           # flush to disk before the rename
+
+
+class _Retry(Exception):
+    def __init__(self, reason: str, delay: Optional[float] = None):
+        super().__init__(reason)
+        self.delay = delay
+
+
+class Downloader:
+    """Downloads files over one pooled `httpx.AsyncClient`."""
+
+    def __init__(self, options: Optional[DownloadOptions] = None, client: Optional[httpx.AsyncClient] = None):
+        self.options = options or DownloadOptions()
+        self._client = client or httpx.AsyncClient(
+            timeout=self.options.timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=self.options.max_connections,
+                                max_keepalive_connections=self.options.max_connections),
+        )
+        self._semaphore = asyncio.Semaphore(self.options.max_concurrency)
+        self.retries = 0
+        self.bytes = 0
+
+    async def __aenter__(self) -> "Downloader":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    def _delay(self, attempt: int, hint: Optional[float]) -> float:
+        if hint is not None:
+            return min(hint, self.options.max_backoff)
+        delay = min(self.options.backoff * 2 ** attempt, self.options.max_backoff)
+        return delay * random.uniform(0.5, 1.0)
+
+    async def _fetch(self, url: str, part: Path) -> int:
+        """Stream `url` into `part`, returning the bytes written."""
+        async with self._client.stream("GET", url) as response:
+            if response.status_code in RETRY_STATUSES:
+                retry_after = response.headers.get("retry-after", "")
+                raise _Retry(f"HTTP {response.status_code}", float(retry_after) if retry_after.isdigit() else None)
+            if response.status_code >= 400:
+                raise DownloadError(f"HTTP {response.status_code} for {url}")
+            expected = response.headers.get("content-length")
+            written = 0
+            with open(part, "wb") as f:
+                async for chunk in response.aiter_bytes(self.options.chunk_size):
+                    f.write(chunk)
+                    written += len(chunk)
+                if self.options.fsync:
+                    f.flush()
+                    await asyncio.to_thread(os.fsync, f.fileno())
+            # Content-Length counts bytes on the wire, before any content decoding
+            if expected is not None and response.num_bytes_downloaded != int(expected):
+                raise _Retry(f"truncated body ({response.num_bytes_downloaded}/{expected} bytes)")
+            return written
+
+    async def download(self, url: str, dest: str | Path) -> Path:
+        """Download `url` to `dest` and return its path."""
+        dest = Path(dest)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        async with self._semaphore:
+            # Not mkstemp: its 0600 mode would stick to the renamed file
+            part = dest.parent / f".{dest.name}.{uuid.uuid4().hex[:12]}.part"
+            try:
+                for attempt in range(self.options.retries + 1):
+                    try:
+                        self.bytes += await self._fetch(url, part)
+                        os.replace(part, dest)
+                        return dest
+                    except (_Retry, httpx.TransportError) as e:
+                        if attempt == self.options.retries:
+                            raise DownloadError(f"Giving up on {url} after {attempt + 1} attempts: {e}") from e
+                        delay = self._delay(attempt, getattr(e, "delay", None))
+                        logger.warning(f"Download of {url} failed ({e}), retrying in {delay:.2f}s")
+                        self.retries += 1
+                        await asyncio.sleep(delay)
+            finally:
+                part.unlink(missing_ok=True)
+
+    async def download_many(self, items: Iterable[Tuple[str, str | Path]],
+                            return_exceptions: bool = False) -> List[Path | BaseException]:
+        """Download (url, dest) pairs concurrently, up to `max_concurrency` at a time."""
+        return await asyncio.gather(*(self.download(url, dest) for url, dest in items),
+                                    return_exceptions=return_exceptions)
+
+
+# Shared downloader for sync callers: one event loop thread and one connection pool per process
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_shared: Optional[Downloader] = None
+_lock = threading.Lock()
+
+
+def _shutdown() -> None:
+    if _loop is not None and _shared is not None:
+        asyncio.run_coroutine_threadsafe(_shared.aclose(), _loop).result(timeout=5)
+        _loop.call_soon_threadsafe(_loop.stop)
+
+
+def shared_downloader() -> Tuple[Downloader, asyncio.AbstractEventLoop]:
+    """The process-wide downloader and the background loop it runs on."""
+    global _loop, _shared
+    with _lock:
+        if _shared is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="downloads", daemon=True).start()
+            _shared = asyncio.run_coroutine_threadsafe(_create(), loop).result()
+            _loop = loop
+            atexit.register(_shutdown)
+    return _shared, _loop
+
+
+async def _create() -> Downloader:
+    # The client and semaphore belong to the loop they are created on
+    return Downloader()
+
+
+def download(url: str, dest: str | Path) -> Path:
+    """Blocking download through the shared downloader; safe to call from many threads."""
+    downloader, loop = shared_downloader()
+    return asyncio.run_coroutine_threadsafe(downloader.download(url, dest), loop).result()
@@ -0,0 +1,164 @@
+"""Content-addressed storage for generated images and descriptions.
+
+    store = ArtifactStore("generated_images")
+    artifact = store.lookup(prompt, model="dall-e-3", params={"size": "1024x1024"})
+    if artifact is None:
+        staging = store.staging_path(".png")
+        download(url, staging)
+        artifact = store.put_file(staging, prompt=prompt, model="dall-e-3", params={"size": "1024x1024"})
+    print(artifact.path)   # generated_images/3f/a2/3fa2...e9.png
+
+Files are named by the SHA-256 of their contents and sharded two levels deep,
+so nothing is ever overwritten and no directory grows past a few hundred
+entries. `index.sqlite` maps each request (rendered prompt, model, params) to
+its artifact and keeps the original and enhanced prompts for browsing. Listing
+reads the index, never the directory tree.
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Artifact:
+    hash: str
+    path: Path
+    size: int
+    prompt: str = ""
+    enhanced_prompt: str = ""
+    model: str = ""
+    params: Optional[Dict[str, Any]] = None
+    created: float = 0.0
+
+
+def request_key(prompt: str, model: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """Hash of everything that determines a generation; equal keys may share an artifact."""
+    payload = json.dumps({"prompt": prompt, "model": model, "params": params or {}}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ArtifactStore:
+    """Sharded, content-addressed files plus a SQLite index of the requests that made them."""
+
+    def __init__(self, root: str | Path = "generated_images"):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.root / "index.sqlite"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # Survives a crash of this process; only a power loss can drop the last few entries
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS artifacts (
+                hash TEXT PRIMARY KEY, ext TEXT, size INTEGER, created REAL
+            );
+            CREATE TABLE IF NOT EXISTS requests (
+                key TEXT PRIMARY KEY, hash TEXT REFERENCES artifacts(hash), prompt TEXT,
+                enhanced_prompt TEXT, model TEXT, params TEXT, created REAL
+            );
+            CREATE INDEX IF NOT EXISTS requests_created ON requests (created);
+            CREATE INDEX IF NOT EXISTS requests_model ON requests (model, created);
+            CREATE INDEX IF NOT EXISTS requests_hash ON requests (hash);
+            """
+        )
+        self._db.commit()
+
+    def path_for(self, digest: str, ext: str) -> Path:
+        return self.root / digest[:2] / digest[2:4] / f"{digest}{ext}"
+
+    def staging_path(self, ext: str = ".png") -> Path:
+        """A fresh path on the store's filesystem to write into before `put_file`."""
+        staging = self.root / ".staging"
+        staging.mkdir(exist_ok=True)
+        return staging / f"{uuid.uuid4().hex}{ext}"
+
+    def put_file(self, source: str | Path, prompt: str, model: str, params: Optional[Dict[str, Any]] = None,
+                 enhanced_prompt: str = "") -> Artifact:
+        """Move `source` into the store (or drop it if the same bytes are stored) and index the request."""
+        source = Path(source)
+        digest = _file_hash(source)
+        ext = source.suffix
+        dest = self.path_for(digest, ext)
+        if dest.exists():
+            source.unlink()
+        else:
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(source, dest)
+        size = dest.stat().st_size
+        rendered = enhanced_prompt or prompt
+        now = time.time()
+        with self._lock:
+            self._db.execute("INSERT OR IGNORE INTO artifacts (hash, ext, size, created) VALUES (?, ?, ?, ?)",
+                             (digest, ext, size, now))
+            self._db.execute(
+                "INSERT OR REPLACE INTO requests (key, hash, prompt, enhanced_prompt, model, params, created) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (request_key(rendered, model, params), digest, prompt, enhanced_prompt, model,
+                 json.dumps(params or {}, sort_keys=True), now),
+            )
+            self._db.commit()
+        return Artifact(digest, dest, size, prompt, enhanced_prompt, model, params or {}, now)
+
+    def put_bytes(self, data: bytes, ext: str, prompt: str, model: str, params: Optional[Dict[str, Any]] = None,
+                  enhanced_prompt: str = "") -> Artifact:
+        staging = self.staging_path(ext)
+        staging.write_bytes(data)
+        return self.put_file(staging, prompt, model, params, enhanced_prompt)
+
+    def _artifact(self, row) -> Artifact:
+        digest, ext, size, prompt, enhanced_prompt, model, params, created = row
+        return Artifact(digest, self.path_for(digest, ext), size, prompt, enhanced_prompt, model,
+                        json.loads(params), created)
+
+    _SELECT = ("SELECT a.hash, a.ext, a.size, r.prompt, r.enhanced_prompt, r.model, r.params, r.created "
+               "FROM requests r JOIN artifacts a ON a.hash = r.hash")
+
+    def lookup(self, prompt: str, model: str, params: Optional[Dict[str, Any]] = None) -> Optional[Artifact]:
+        """The stored artifact for this rendered prompt, model and params, if its file still exists."""
+        with self._lock:
+            row = self._db.execute(f"{self._SELECT} WHERE r.key = ?", (request_key(prompt, model, params),)).fetchone()
+        if row is None:
+            return None
+        artifact = self._artifact(row)
+        return artifact if artifact.path.exists() else None
+
+    def get(self, digest: str) -> Optional[Artifact]:
+        with self._lock:
+            row = self._db.execute(f"{self._SELECT} WHERE a.hash = ? ORDER BY r.created DESC LIMIT 1",
+                                   (digest,)).fetchone()
+        return self._artifact(row) if row else None
+
+    def list(self, limit: int = 100, offset: int = 0, model: Optional[str] = None) -> List[Artifact]:
+        """Most recent requests first."""
+        where, args = ("WHERE r.model = ?", [model]) if model else ("", [])
+        with self._lock:
+            rows = self._db.execute(f"{self._SELECT} {where} ORDER BY r.created DESC LIMIT ? OFFSET ?",
+                                    (*args, limit, offset)).fetchall()
+        return [self._artifact(row) for row in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            (n,) = self._db.execute("SELECT COUNT(*) FROM requests").fetchone()
+        return n
+
+    def close(self) -> None:
+        self._db.close()
@@ -0,0 +1,181 @@
+"""Caches in front of the embedding model and the retriever.
+
+    embeddings = CachedEmbeddings(OpenAIEmbeddings())          # persisted in .cache/embeddings.sqlite
+    retriever = CachedRetriever(
+        retriever=chroma_retriever("data/chroma_db", embeddings),
+        version=lambda: collection_version("data/chroma_db"),
+    )
+
+A repeated query is answered from the retrieval cache without embedding it.
+A new query with a known text (or a chunk seen before during ingestion) skips
+the embeddings API.
+"""
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+from pydantic import ConfigDict, PrivateAttr
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EMBEDDING_CACHE_PATH = Path(__file__).resolve().parent.parent / ".cache" / "embeddings.sqlite"
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that stores every vector in SQLite, keyed by model and text hash.
+
+    Query and document vectors are kept apart, since some models embed them
+    differently. Only the texts missing from the cache are sent, in one call.
+    """
+
+    def __init__(self, underlying: Embeddings, path: str | Path = DEFAULT_EMBEDDING_CACHE_PATH):
+        from rag.ingest import embeddings_id
+
+        self.underlying = underlying
+        self.namespace = embeddings_id(underlying)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB)")
+        self._db.commit()
+
+    def _key(self, kind: str, text: str) -> str:
+        return hashlib.sha256(f"{self.namespace}\0{kind}\0{text}".encode("utf-8")).hexdigest()
+
+    def _cached(self, kind: str, texts: List[str], embed: Callable[[List[str]], List[List[float]]]) -> List[List[float]]:
+        keys = [self._key(kind, t) for t in texts]
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            # SQLite limits the number of bound parameters per statement
+            for i in range(0, len(keys), 500):
+                part = keys[i:i + 500]
+                rows = self._db.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(part))})", part
+                ).fetchall()
+                found.update((key, np.frombuffer(blob, dtype=np.float32).tolist()) for key, blob in rows)
+        missing = list(dict.fromkeys(k for k in keys if k not in found))
+        hit_count = sum(1 for k in keys if k in found)
+        self.hits += hit_count
+        self.misses += len(keys) - hit_count
+        if missing:
+            text_of = dict(zip(keys, texts))
+            vectors = embed([text_of[k] for k in missing])
+            with self._lock:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    [(k, np.asarray(v, dtype=np.float32).tobytes()) for k, v in zip(missing, vectors)],
+                )
+                self._db.commit()
+            found.update(zip(missing, vectors))
+        return [list(found[k]) for k in keys]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._cached("document", texts, self.underlying.embed_documents)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._cached("query", [text], lambda texts: [self.underlying.embed_query(texts[0])])[0]
+
+    def stats(self) -> Dict[str, Any]:
+        (entries,) = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0, "entries": entries}
+
+    def close(self) -> None:
+        self._db.close()
+
+
+def normalize_query(query: str) -> str:
+    """Case, surrounding punctuation and repeated whitespace don't change the results."""
+    return re.sub(r"\s+", " ", query.lower()).strip(" \t\n?!.,;:")
+
+
+class CachedRetriever(BaseRetriever):
+    """LRU cache of a retriever's results, keyed by normalized query and k.
+
+    `version` is called on every lookup. When its value changes (e.g. the
+    collection was re-ingested) all cached results are dropped.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    retriever: BaseRetriever
+    version: Optional[Callable[[], Any]] = None
+    max_entries: int = 1024
+    ttl: Optional[float] = None
+
+    _entries: "OrderedDict[Tuple[str, int], Tuple[float, List[Document]]]" = PrivateAttr(default_factory=OrderedDict)
+    _version: Any = PrivateAttr(default=None)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+    _stats: Dict[str, int] = PrivateAttr(default_factory=lambda: {"hits": 0, "misses": 0, "invalidations": 0})
+
+    def _cache_key(self, query: str) -> Tuple[str, int]:
+        k = getattr(self.retriever, "k", None) or getattr(self.retriever, "search_kwargs", {}).get("k", 4)
+        return normalize_query(query), k
+
+    def _lookup(self, key: Tuple[str, int]) -> Tuple[Optional[List[Document]], Any]:
+        """(cached documents or None, collection version they must be stored under)."""
+        current = self.version() if self.version else None
+        with self._lock:
+            if current != self._version:
+                if self._entries:
+                    self._stats["invalidations"] += 1
+                    logger.info("Collection changed; dropping cached retrieval results")
+                self._entries.clear()
+                self._version = current
+            entry = self._entries.get(key)
+            if entry is not None and (self.ttl is None or time.monotonic() - entry[0] <= self.ttl):
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return list(entry[1]), current
+            self._stats["misses"] += 1
+            return None, current
+
+    def _store(self, key: Tuple[str, int], docs: List[Document], version: Any) -> None:
+        with self._lock:
+            if version != self._version:
+                return  # the collection changed while these were being fetched
+            self._entries[key] = (time.monotonic(), list(docs))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        key = self._cache_key(query)
+        docs, version = self._lookup(key)
+        if docs is None:
+            docs = self.retriever.invoke(query, config={"callbacks": run_manager.get_child()})
+            self._store(key, docs, version)
+        return docs
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun) -> List[Document]:
+        key = self._cache_key(query)
+        docs, version = self._lookup(key)
+        if docs is None:
+            docs = await self.retriever.ainvoke(query, config={"callbacks": run_manager.get_child()})
+            self._store(key, docs, version)
+        return docs
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {**self._stats, "hit_rate": self._stats["hits"] / lookups if lookups else 0.0,
+                "entries": len(self._entries)}
@@ -0,0 +1,124 @@
+"""Streaming text chunking, optionally spread over worker processes.
+
+    for chunk in iter_chunks("big.txt", chunk_size=300, chunk_overlap=20):
+        ...
+    for source, chunks, last in stream_chunks(paths, 300, 20, workers=4):
+        ...
+
+Files are read a block at a time and cut at paragraph (or line, or word)
+boundaries, so memory stays around two blocks per file however large it is.
+A file that fits in one block is split exactly like
+`RecursiveCharacterTextSplitter.split_text` on its whole contents.
+"""
+import logging
+import multiprocessing
+import queue
+from typing import Iterator, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+BLOCK_CHARS = 1 << 20
+
+
+def _cut(buffer: str) -> int:
+    """End of the last paragraph, line or word in `buffer` (or all of it)."""
+    for separator in ("\n\n", "\n", " "):
+        i = buffer.rfind(separator)
+        if i > 0:
+            return i + len(separator)
+    return len(buffer)
+
+
+def iter_chunks(path: str, chunk_size: int = 300, chunk_overlap: int = 20, block_chars: int = BLOCK_CHARS) -> Iterator[str]:
+    """Yield the chunks of a text file without reading it all into memory."""
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    buffer = ""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        block = f.read(block_chars)
+        while block:
+            # Read one block ahead so a file that fits in one block is split in one go
+            following = f.read(block_chars)
+            buffer += block
+            if following:
+                cut = _cut(buffer)
+                yield from splitter.split_text(buffer[:cut])
+                buffer = buffer[cut:]
+            block = following
+    if buffer:
+        yield from splitter.split_text(buffer)
+
+
+def _worker(tasks, results, chunk_size: int, chunk_overlap: int, batch_size: int) -> None:
+    while True:
+        path = tasks.get()
+        if path is None:
+            break
+        try:
+            batch: List[str] = []
+            for chunk in iter_chunks(path, chunk_size, chunk_overlap):
+                batch.append(chunk)
+                if len(batch) >= batch_size:
+                    results.put((path, batch, False, None))
+                    batch = []
+            results.put((path, batch, True, None))
+        except Exception as e:
+            results.put((path, [], True, f"{type(e).__name__}: {e}"))
+    results.put(None)
+
+
+def stream_chunks(paths: Sequence[str], chunk_size: int = 300, chunk_overlap: int = 20, workers: int = 1,
+                  batch_size: int = 256, max_pending: int = 16) -> Iterator[Tuple[str, List[str], bool]]:
+    """Yield (path, chunks, last) batches for every file.
+
+    Batches of one file arrive in order; with several workers, files
+    interleave. `last` marks a file's final batch. At most `max_pending`
+    batches wait in the result queue, so slow consumers hold workers back
+    instead of letting memory grow.
+    """
+    if workers <= 1 or len(paths) <= 1:
+        for path in paths:
+            batch: List[str] = []
+            for chunk in iter_chunks(path, chunk_size, chunk_overlap):
+                batch.append(chunk)
+                if len(batch) >= batch_size:
+                    yield path, batch, False
+                    batch = []
+            yield path, batch, True
+        return
+
+    # spawn: the parent may hold threads (Chroma, executors) that fork would copy mid-lock
+    context = multiprocessing.get_context("spawn")
+    tasks = context.Queue()
+    results = context.Queue(maxsize=max_pending)
+    for path in paths:
+        tasks.put(str(path))
+    processes = []
+    for _ in range(min(workers, len(paths))):
+        tasks.put(None)
+        process = context.Process(target=_worker, args=(tasks, results, chunk_size, chunk_overlap, batch_size), daemon=True)
+        process.start()
+        processes.append(process)
+
+    running = len(processes)
+    try:
+        while running:
+            try:
+                item = results.get(timeout=1)
+            except queue.Empty:
+                if not any(p.is_alive() for p in processes):
+                    raise RuntimeError("Chunking workers exited unexpectedly")
+                continue
+            if item is None:
+                running -= 1
+                continue
+            path, batch, last, error = item
+            if error:
+                raise RuntimeError(f"Failed to chunk {path}: {error}")
+            yield path, batch, last
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
@@ -0,0 +1,241 @@
+"""Hybrid BM25 + vector retrieval with reciprocal rank fusion.
+
+    store = Chroma(persist_directory="data/chroma_db", embedding_function=embeddings)
+    retriever = HybridRetriever(
+        vectorstore=store,
+        bm25=BM25Index.load("data/chroma_db/bm25_index.json"),
+        index_path="data/chroma_db/bm25_index.json",
+        version=lambda: collection_version("data/chroma_db"),
+        rerank=overlap_rerank,
+    )
+
+The BM25 index holds the same chunks as the Chroma collection and catches up
+with it incrementally (only added/removed ids are touched) whenever `version`
+changes. Exact tokens such as error codes ("ERR-4021") are found lexically,
+so the vector store is only asked for `fetch_k` (default `k`) results.
+"""
+import asyncio
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from pydantic import ConfigDict, PrivateAttr
+
+logger = logging.getLogger(__name__)
+
+# Keeps codes like ERR-4021, v1.2.3 and snake_case names as one token
+_TOKEN = re.compile(r"[a-z0-9]+(?:[-_.][a-z0-9]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+class BM25Index:
+    """In-memory inverted index with Okapi BM25 scoring, updated a chunk at a time."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[str, int]] = defaultdict(dict)  # term -> {chunk id: term frequency}
+        self.lengths: Dict[str, int] = {}
+        self.documents: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        self._total_length = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def add(self, ids: Sequence[str], texts: Sequence[str], metadatas: Optional[Sequence[Dict[str, Any]]] = None) -> None:
+        metadatas = metadatas or [{} for _ in ids]
+        with self._lock:
+            for chunk_id, text, metadata in zip(ids, texts, metadatas):
+                if chunk_id in self.lengths:
+                    self.remove([chunk_id])
+                terms = Counter(tokenize(text))
+                for term, tf in terms.items():
+                    self.postings[term][chunk_id] = tf
+                length = sum(terms.values())
+                self.lengths[chunk_id] = length
+                self._total_length += length
+                self.documents[chunk_id] = (text, metadata or {})
+
+    def remove(self, ids: Sequence[str]) -> None:
+        with self._lock:
+            for chunk_id in ids:
+                if chunk_id not in self.lengths:
+                    continue
+                text, _ = self.documents.pop(chunk_id)
+                for term in set(tokenize(text)):
+                    postings = self.postings.get(term)
+                    if postings is not None:
+                        postings.pop(chunk_id, None)
+                        if not postings:
+                            del self.postings[term]
+                self._total_length -= self.lengths.pop(chunk_id)
+
+    def search(self, query: str, k: int) -> List[Tuple[str, float]]:
+        """Top `k` (chunk id, score) pairs for `query`."""
+        scores: Dict[str, float] = defaultdict(float)
+        with self._lock:
+            n = len(self.lengths)
+            if not n:
+                return []
+            avg_length = self._total_length / n
+            for term in set(tokenize(query)):
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for chunk_id, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self.lengths[chunk_id] / avg_length)
+                    scores[chunk_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+    def document(self, chunk_id: str) -> Document:
+        text, metadata = self.documents[chunk_id]
+        return Document(page_content=text, metadata=metadata, id=chunk_id)
+
+    def sync(self, store: Any, page_size: int = 1000) -> Tuple[int, int]:
+        """Add/remove chunks so the index matches a Chroma store; returns (added, removed)."""
+        stored = set(store.get(include=[])["ids"])
+        with self._lock:
+            removed = [i for i in self.lengths if i not in stored]
+        self.remove(removed)
+        added = sorted(stored - self.lengths.keys())
+        for i in range(0, len(added), page_size):
+            page = store.get(ids=added[i:i + page_size], include=["documents", "metadatas"])
+            self.add(page["ids"], page["documents"], page["metadatas"])
+        return len(added), len(removed)
+
+    def save(self, path: str | Path) -> None:
+        path = Path(path)
+        tmp = path.with_suffix(".tmp")
+        with self._lock:
+            payload = json.dumps({"k1": self.k1, "b": self.b, "documents": self.documents})
+        tmp.write_text(payload)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "BM25Index":
+        """Load a saved index, or an empty one if `path` doesn't exist yet."""
+        path = Path(path)
+        if not path.exists():
+            return cls()
+        data = json.loads(path.read_text())
+        index = cls(k1=data["k1"], b=data["b"])
+        documents = data["documents"]
+        index.add(list(documents), [d[0] for d in documents.values()], [d[1] for d in documents.values()])
+        return index
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """Merge ranked id lists; each list contributes 1 / (k + rank) per id."""
+    scores: Dict[str, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, chunk_id in enumerate(ranking, start=1):
+            scores[chunk_id] += 1 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def overlap_rerank(query: str, docs: List[Document]) -> List[Document]:
+    """Cheap local rerank: query term coverage first, then an exact-phrase bonus, fused order breaks ties."""
+    terms = set(tokenize(query))
+    phrase = " ".join(tokenize(query))
+
+    def score(item: Tuple[int, Document]) -> Tuple[float, int]:
+        position, doc = item
+        doc_terms = set(tokenize(doc.page_content))
+        coverage = len(terms & doc_terms) / len(terms) if terms else 0.0
+        bonus = 0.5 if phrase and phrase in " ".join(tokenize(doc.page_content)) else 0.0
+        return -(coverage + bonus), position
+
+    return [doc for _, doc in sorted(enumerate(docs), key=score)]
+
+
+class HybridRetriever(BaseRetriever):
+    """Fuses a vector store's and a BM25 index's rankings, with an optional rerank."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    vectorstore: Any
+    bm25: BM25Index
+    k: int = 3
+    fetch_k: Optional[int] = None  # candidates from each source; defaults to k
+    rrf_k: int = 60
+    rerank: Optional[Callable[[str, List[Document]], List[Document]]] = None
+    version: Optional[Callable[[], Any]] = None
+    index_path: Optional[str] = None
+
+    _synced: Any = PrivateAttr(default=object())
+    _sync_lock: Any = PrivateAttr(default_factory=threading.Lock)
+    _timings: Dict[str, float] = PrivateAttr(default_factory=lambda: defaultdict(float))
+    _queries: int = PrivateAttr(default=0)
+
+    def _sync(self) -> None:
+        current = self.version() if self.version else None
+        if current == self._synced:
+            return
+        with self._sync_lock:
+            if current == self._synced:
+                return
+            start = time.perf_counter()
+            added, removed = self.bm25.sync(self.vectorstore)
+            if (added or removed) and self.index_path:
+                self.bm25.save(self.index_path)
+            self._synced = current
+            self._timings["sync"] += time.perf_counter() - start
+            if added or removed:
+                logger.info(f"BM25 index synced: +{added} -{removed} chunks ({len(self.bm25)} total)")
+
+    def _fuse(self, query: str, vector_docs: List[Document], start: float) -> List[Document]:
+        fetch_k = self.fetch_k or self.k
+        t = time.perf_counter()
+        lexical = self.bm25.search(query, fetch_k)
+        self._timings["bm25"] += time.perf_counter() - t
+
+        t = time.perf_counter()
+        by_id = {doc.id: doc for doc in vector_docs if doc.id}
+        fused = reciprocal_rank_fusion([list(by_id), [chunk_id for chunk_id, _ in lexical]], self.rrf_k)
+        docs = [by_id.get(chunk_id) or self.bm25.document(chunk_id) for chunk_id, _ in fused]
+        self._timings["fuse"] += time.perf_counter() - t
+
+        if self.rerank:
+            t = time.perf_counter()
+            docs = self.rerank(query, docs)
+            self._timings["rerank"] += time.perf_counter() - t
+        self._timings["total"] += time.perf_counter() - start
+        self._queries += 1
+        return docs[:self.k]
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        start = time.perf_counter()
+        self._sync()
+        t = time.perf_counter()
+        vector_docs = self.vectorstore.similarity_search(query, k=self.fetch_k or self.k)
+        self._timings["vector"] += time.perf_counter() - t
+        return self._fuse(query, vector_docs, start)
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun) -> List[Document]:
+        start = time.perf_counter()
+        # Re-reading the store after an ingest is blocking I/O; keep it off the event loop
+        await asyncio.to_thread(self._sync)
+        t = time.perf_counter()
+        vector_docs = await self.vectorstore.asimilarity_search(query, k=self.fetch_k or self.k)
+        self._timings["vector"] += time.perf_counter() - t
+        return self._fuse(query, vector_docs, start)
+
+    def stats(self) -> Dict[str, Any]:
+        """Mean milliseconds per query spent in each stage."""
+        n = self._queries or 1
+        return {stage: seconds / n * 1000 for stage, seconds in self._timings.items()} | {"queries": self._queries}
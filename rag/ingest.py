@@ -0,0 +1,365 @@
+"""Incremental ingestion of a document directory into a Chroma collection.
+
+    python -m rag.ingest scratch/langgraph/data --persist-dir scratch/langgraph/data/chroma_db
+
+Each chunk is stored under a hash of its chunking/embedding settings, source
+and content (plus an occurrence count for text repeated within the file), so
+a re-run only embeds chunks that are not in the collection yet, wherever
+they moved in the file. Files are chunked as a stream
+(rag/chunking.py), in worker processes with --workers, so corpus size doesn't
+bound memory. Files whose mtime and size match the manifest are not even read.
+Every chunk seen in a run is tagged with that run; once a file is done, its
+chunks with an older tag (or all of them, if the file is gone) are deleted in
+pages, so no per-file id list is held in memory. The manifest is rewritten
+after every flushed batch, so an interrupted run picks up where it stopped.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "ingest_manifest.json"
+
+
+@dataclass
+class IngestOptions:
+    patterns: Sequence[str] = ("**/*.txt", "**/*.md")
+    chunk_size: int = 300
+    chunk_overlap: int = 20
+    batch_size: int = 64  # texts per embedding call
+    concurrency: int = 4  # embedding calls in flight
+    workers: int = 1  # chunking processes; 1 chunks in this process
+    collection: str = "langchain"  # langchain_chroma's default collection name
+
+
+@dataclass
+class IngestStats:
+    files: int = 0
+    files_unchanged: int = 0
+    files_removed: int = 0
+    chunks_added: int = 0
+    chunks_existing: int = 0
+    chunks_deleted: int = 0
+    embedding_calls: int = 0
+    seconds: float = 0.0
+
+
+@dataclass
+class _PendingFile:
+    source: str
+    entry: Dict[str, Any]
+    chunks: int = 0  # chunks seen so far
+    occurrences: Dict[str, int] = field(default_factory=dict, repr=False)  # chunk digest prefix -> times seen
+    remaining: int = 0  # chunks queued for embedding but not stored yet
+    read: bool = False  # all chunks of the file have been seen
+
+
+@dataclass
+class _Chunk:
+    id: str
+    text: str
+    file: _PendingFile = field(repr=False)
+
+
+def iter_files(root: str | Path, patterns: Sequence[str]) -> Iterator[Path]:
+    """Every file under `root` matching one of the glob patterns, in a stable order."""
+    root = Path(root)
+    seen = set()
+    for pattern in patterns:
+        for path in root.glob(pattern):
+            if path.is_file() and path not in seen:
+                seen.add(path)
+    yield from sorted(seen)
+
+
+def embeddings_id(embeddings: Any) -> str:
+    """Identify an embeddings model well enough to notice it was swapped."""
+    # Wrappers such as rag.cache.CachedEmbeddings produce the same vectors
+    embeddings = getattr(embeddings, "underlying", embeddings)
+    model = getattr(embeddings, "model", None) or getattr(embeddings, "model_name", None)
+    return f"{type(embeddings).__name__}:{model}" if model else type(embeddings).__name__
+
+
+def chunk_ids(settings_key: str, source: str, chunks: Sequence[str],
+              occurrences: Optional[Dict[str, int]] = None) -> List[str]:
+    """Content hash of each chunk; the 2nd, 3rd... copy of a text in the file gets a -1, -2... suffix.
+
+    Pass the same `occurrences` dict for every batch of one file.
+    """
+    occurrences = {} if occurrences is None else occurrences
+    ids = []
+    for text in chunks:
+        digest = hashlib.sha256(f"{settings_key}\0{source}\0{text}".encode("utf-8")).hexdigest()
+        # A 64-bit prefix is plenty to tell one file's chunks apart and keeps the dict small
+        seen = occurrences.get(digest[:16], 0)
+        occurrences[digest[:16]] = seen + 1
+        ids.append(f"{digest}-{seen}" if seen else digest)
+    return ids
+
+
+def collection_version(persist_dir: str | Path) -> Optional[int]:
+    """Changes whenever an ingest run changes the collection (the manifest's mtime)."""
+    try:
+        return os.stat(Path(persist_dir) / MANIFEST_NAME).st_mtime_ns
+    except OSError:
+        return None
+
+
+class Manifest:
+    """Per-file mtime/size/sha256 of what has been fully ingested, saved atomically."""
+
+    def __init__(self, path: Path, settings: Dict[str, Any]):
+        self.path = path
+        self.settings = settings
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.previous_settings: Optional[Dict[str, Any]] = None
+        self.dirty = not path.exists()
+        if path.exists():
+            try:
+                data = json.loads(path.read_text())
+            except ValueError:
+                logger.warning(f"Ignoring unreadable manifest {path}")
+                data = {}
+            self.previous_settings = data.get("settings")
+            if data.get("settings") == settings:
+                self.files = data.get("files", {})
+            else:
+                self.dirty = True
+                if data:
+                    logger.info("Chunking or embedding settings changed; re-ingesting every file")
+
+    def save(self) -> None:
+        """Write the manifest if anything changed since it was loaded or last saved."""
+        if not self.dirty:
+            return
+        self.dirty = False
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"settings": self.settings, "files": self.files}, indent=1))
+        os.replace(tmp, self.path)
+
+
+def _file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class Ingestor:
+    """Keeps a Chroma collection in sync with a directory of text files."""
+
+    def __init__(self, persist_dir: str | Path, embeddings: Any, options: Optional[IngestOptions] = None):
+        import chromadb
+
+        self.options = options or IngestOptions()
+        self.embeddings = embeddings
+        self.persist_dir = Path(persist_dir)
+        self.persist_dir.mkdir(parents=True, exist_ok=True)
+        self.client = chromadb.PersistentClient(path=str(self.persist_dir))
+        self.collection = self.client.get_or_create_collection(self.options.collection)
+        self.settings = {
+            "chunk_size": self.options.chunk_size,
+            "chunk_overlap": self.options.chunk_overlap,
+            "embeddings": embeddings_id(embeddings),
+        }
+        self.settings_key = json.dumps(self.settings, sort_keys=True)
+        self._run = 0  # set per ingest() call
+        self.manifest = Manifest(self.persist_dir / MANIFEST_NAME, self.settings)
+        reason = self._stale_collection()
+        if reason:
+            # Vectors from another model are useless (and may not even have the same dimension)
+            logger.info(f"{reason}; recreating the collection")
+            self.client.delete_collection(self.options.collection)
+            self.collection = self.client.create_collection(self.options.collection)
+            # Every file has to be embedded again
+            self.manifest.files = {}
+            self.manifest.dirty = True
+
+    def _stale_collection(self) -> Optional[str]:
+        """Why the stored vectors can't be kept for this embeddings model, or None if they can."""
+        previous = self.manifest.previous_settings
+        if previous and previous.get("embeddings") != self.settings["embeddings"]:
+            return f"Embeddings changed from {previous.get('embeddings')}"
+        if self.collection.count() == 0:
+            return None
+        if previous is None:
+            # Written by something else (e.g. Chroma.from_documents); we can't tell which model
+            return "Collection has vectors but no ingest manifest"
+        stored = self.collection.get(limit=1, include=["embeddings"])["embeddings"]
+        dimension = len(self.embeddings.embed_query("x"))
+        if len(stored) and len(stored[0]) != dimension:
+            return f"Stored vectors have {len(stored[0])} dimensions, the embeddings model makes {dimension}"
+        return None
+
+    def _existing(self, ids: List[str]) -> set:
+        found = set()
+        # Chroma caps the number of ids per request
+        step = self.client.get_max_batch_size()
+        for i in range(0, len(ids), step):
+            found.update(self.collection.get(ids=ids[i:i + step], include=[])["ids"])
+        return found
+
+    def _delete_stale(self, source: str, run: Optional[int] = None) -> int:
+        """Delete chunks of `source` not seen in `run` (all of them without one), a page at a time."""
+        where: Dict[str, Any] = {"source": source}
+        if run is not None:
+            where = {"$and": [where, {"ingest_run": {"$ne": run}}]}
+        page = self.client.get_max_batch_size()
+        deleted = 0
+        while True:
+            stale = self.collection.get(where=where, limit=page, include=[])["ids"]
+            if not stale:
+                return deleted
+            self.collection.delete(ids=stale)
+            deleted += len(stale)
+
+    def _complete(self, pending: _PendingFile, stats: IngestStats) -> None:
+        stats.chunks_deleted += self._delete_stale(pending.source, self._run)
+        self.manifest.files[pending.source] = pending.entry
+        self.manifest.dirty = True
+
+    def _flush(self, queue: List[_Chunk], pool: ThreadPoolExecutor, stats: IngestStats, final: bool = False) -> None:
+        size = self.options.batch_size
+        # Partial batches wait for the next file unless this is the last flush
+        end = len(queue) if final else len(queue) - len(queue) % size
+        batches = [queue[i:i + size] for i in range(0, end, size)]
+        vectors = pool.map(lambda batch: self.embeddings.embed_documents([c.text for c in batch]), batches)
+        for batch, batch_vectors in zip(batches, vectors):
+            self.collection.upsert(
+                ids=[c.id for c in batch],
+                embeddings=batch_vectors,
+                documents=[c.text for c in batch],
+                metadatas=[{"source": c.file.source, "ingest_run": self._run} for c in batch],
+            )
+            stats.embedding_calls += 1
+            stats.chunks_added += len(batch)
+            for chunk in batch:
+                chunk.file.remaining -= 1
+                if chunk.file.remaining == 0 and chunk.file.read:
+                    self._complete(chunk.file, stats)
+        del queue[:end]
+        self.manifest.save()
+
+    def _check(self, path: Path, source: str) -> Optional[Dict[str, Any]]:
+        """Manifest entry for a file that needs chunking, or None when it is unchanged."""
+        st = path.stat()
+        previous = self.manifest.files.get(source)
+        if previous and previous["mtime_ns"] == st.st_mtime_ns and previous["size"] == st.st_size:
+            return None
+        sha256 = _file_hash(path)
+        entry = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "sha256": sha256}
+        if previous and previous["sha256"] == sha256:
+            # Touched but not edited
+            entry["chunks"] = previous["chunks"]
+            self.manifest.files[source] = entry
+            self.manifest.dirty = True
+            return None
+        return entry
+
+    def ingest(self, root: str | Path) -> IngestStats:
+        """Bring the collection in line with the files under `root`."""
+        from rag.chunking import stream_chunks
+
+        start = time.perf_counter()
+        self._run = time.time_ns()
+        stats = IngestStats()
+        seen = set()
+        pending: Dict[str, _PendingFile] = {}
+        for path in iter_files(root, self.options.patterns):
+            source = str(path)
+            seen.add(source)
+            stats.files += 1
+            entry = self._check(path, source)
+            if entry is None:
+                stats.files_unchanged += 1
+            else:
+                pending[source] = _PendingFile(source, entry)
+
+        queue: List[_Chunk] = []
+        flush_at = self.options.batch_size * self.options.concurrency
+        with ThreadPoolExecutor(max_workers=self.options.concurrency) as pool:
+            chunks = stream_chunks(list(pending), self.options.chunk_size, self.options.chunk_overlap,
+                                   workers=self.options.workers, batch_size=flush_at)
+            for source, texts, last in chunks:
+                file = pending[source]
+                ids = chunk_ids(self.settings_key, source, texts, file.occurrences)
+                file.chunks += len(ids)
+                existing = self._existing(ids)
+                if existing:
+                    # Still current: retag so the stale sweep keeps them
+                    self.collection.update(ids=sorted(existing),
+                                           metadatas=[{"source": source, "ingest_run": self._run}] * len(existing))
+                new = [_Chunk(i, t, file) for i, t in zip(ids, texts) if i not in existing]
+                stats.chunks_existing += len(ids) - len(new)
+                file.remaining += len(new)
+                queue.extend(new)
+                if last:
+                    file.read = True
+                    file.entry["chunks"] = file.chunks
+                    file.occurrences.clear()
+                    if file.remaining == 0:
+                        self._complete(file, stats)
+                if len(queue) >= flush_at:
+                    self._flush(queue, pool, stats)
+            if queue:
+                self._flush(queue, pool, stats, final=True)
+
+        # Only files under this root are ours to remove
+        prefix = str(Path(root))
+        for source in [s for s in self.manifest.files if s not in seen and Path(s).is_relative_to(prefix)]:
+            stats.chunks_deleted += self._delete_stale(source)
+            del self.manifest.files[source]
+            self.manifest.dirty = True
+            stats.files_removed += 1
+        self.manifest.save()
+        stats.seconds = time.perf_counter() - start
+        logger.info(f"Ingested {root}: {stats}")
+        return stats
+
+
+def ingest_directory(root: str | Path, persist_dir: str | Path, embeddings: Any,
+                     options: Optional[IngestOptions] = None) -> IngestStats:
+    return Ingestor(persist_dir, embeddings, options).ingest(root)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incrementally ingest a directory into Chroma")
+    parser.add_argument("root")
+    parser.add_argument("--persist-dir", required=True)
+    parser.add_argument("--pattern", action="append", dest="patterns",
+                        help="Glob relative to root, repeatable (default: **/*.txt and **/*.md)")
+    parser.add_argument("--chunk-size", type=int, default=IngestOptions.chunk_size)
+    parser.add_argument("--chunk-overlap", type=int, default=IngestOptions.chunk_overlap)
+    parser.add_argument("--batch-size", type=int, default=IngestOptions.batch_size)
+    parser.add_argument("--concurrency", type=int, default=IngestOptions.concurrency)
+    parser.add_argument("--workers", type=int, default=IngestOptions.workers, help="Processes chunking files")
+    parser.add_argument("--embeddings", default=None,
+                        help="Name from llms/embeddings.py (openai, ollama, local); defaults to EMBEDDINGS_MODEL, then openai")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    from llms.embeddings import get_embeddings
+
+    options = IngestOptions(
+        patterns=args.patterns or IngestOptions.patterns,
+        chunk_size=args.chunk_size,
+        chunk_overlap=args.chunk_overlap,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        workers=args.workers,
+    )
+    stats = ingest_directory(args.root, args.persist_dir, get_embeddings(args.embeddings), options)
+    print(json.dumps(asdict(stats), indent=2))
+
+
+if __name__ == "__main__":
+    main()
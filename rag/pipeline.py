@@ -0,0 +1,154 @@
+"""Retrieve -> summarize -> answer as an async LangGraph pipeline.
+
+    pipeline = RAGPipeline(chroma_retriever("data/chroma_db", OpenAIEmbeddings()), get_model("gpt-3.5-turbo"))
+    result = await pipeline.answer("how to reset password")
+    results = await pipeline.answer_many(queries, max_concurrency=16)
+
+Every node is a coroutine, so many queries can share one event loop. The chat
+model's client (and its HTTP connection pool) is reused across all of them.
+
+mode="fused" skips the summary and answers straight from the retrieved chunks
+in one LLM call, keeping them within `max_context_tokens`.
+"""
+import logging
+import time
+from typing import Any, Dict, List, Literal, Sequence
+
+from langchain_core.retrievers import BaseRetriever
+from langgraph.graph import END, START, StateGraph
+from pydantic import BaseModel
+
+from llms.tokens import count_tokens, model_name, truncate_tokens
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_PROMPT = "You are a helpful assistant."
+FUSED_PROMPT = ("Answer the query using only the context below. If the context does not cover it, say so.\n\n"
+                "Query: {query}\n\nContext:\n{context}")
+
+Mode = Literal["summarize", "fused"]
+
+
+class State(BaseModel):
+    """State for the agent."""
+    query: str
+    docs: list = []
+    summary: str = ""
+    response: str = ""
+
+
+def chroma_retriever(persist_dir: str, embeddings: Any, k: int = 3) -> BaseRetriever:
+    from langchain_chroma import Chroma
+    return Chroma(persist_directory=persist_dir, embedding_function=embeddings).as_retriever(search_kwargs={"k": k})
+
+
+def fit_to_budget(texts: Sequence[str], max_tokens: int, model: str | None = None, min_tail: int = 32) -> List[str]:
+    """Chunks in rank order that fit in `max_tokens`.
+
+    Duplicates are dropped. The first chunk that doesn't fit is cut to the
+    remaining budget if at least `min_tail` tokens are left, and the rest are
+    left out.
+    """
+    kept: List[str] = []
+    seen = set()
+    remaining = max_tokens
+    for text in texts:
+        text = text.strip()
+        if not text or text in seen:
+            continue
+        seen.add(text)
+        tokens = count_tokens(text, model) + 1  # newline separator
+        if tokens <= remaining:
+            kept.append(text)
+            remaining -= tokens
+            continue
+        if remaining >= min_tail:
+            kept.append(truncate_tokens(text, remaining - 1, model))
+        break
+    return kept
+
+
+class RAGPipeline:
+    """Answers queries from a retriever's documents with one chat model."""
+
+    def __init__(self, retriever: BaseRetriever, llm, mode: Mode = "summarize", max_context_tokens: int = 1500):
+        if mode not in ("summarize", "fused"):
+            raise ValueError(f"Unknown mode '{mode}', expected 'summarize' or 'fused'")
+        self.retriever = retriever
+        self.llm = llm
+        self.mode = mode
+        self.max_context_tokens = max_context_tokens
+        self.usage = {"calls": 0, "input_tokens": 0, "output_tokens": 0}
+        self.graph = self._build()
+
+    async def _complete(self, prompt: str) -> str:
+        message = await self.llm.ainvoke([
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt},
+        ])
+        self.usage["calls"] += 1
+        if message.usage_metadata:
+            self.usage["input_tokens"] += message.usage_metadata["input_tokens"]
+            self.usage["output_tokens"] += message.usage_metadata["output_tokens"]
+        return str(message.content or "").strip()
+
+    async def retrieve_docs(self, state: State) -> dict:
+        """Retrieve documents based on user input."""
+        if not state.query:
+            return {}
+        return {"docs": await self.retriever.ainvoke(state.query)}
+
+    async def summarize_docs(self, state: State) -> dict:
+        """Summarize retrieved documents."""
+        if not state.docs:
+            return {"summary": "No relevant documents found."}
+        content = "\n".join(doc.page_content for doc in state.docs)
+        summary = await self._complete(f"Summarize the following content: {content}")
+        return {"summary": summary or "No summary generated."}
+
+    async def generate_response(self, state: State) -> dict:
+        """Generate a response based on the summary."""
+        if not state.summary:
+            return {"response": "No summary available to generate a response."}
+        prompt = f"Based on the following summary, provide a detailed response to the query: {state.query}\n\nSummary: {state.summary}"
+        response = await self._complete(prompt)
+        return {"response": response or "No response generated."}
+
+    async def answer_from_docs(self, state: State) -> dict:
+        """Answer directly from the retrieved chunks that fit the token budget."""
+        if not state.docs:
+            return {"response": "No relevant documents found."}
+        chunks = fit_to_budget([doc.page_content for doc in state.docs], self.max_context_tokens, model_name(self.llm))
+        response = await self._complete(FUSED_PROMPT.format(query=state.query, context="\n".join(chunks)))
+        return {"response": response or "No response generated."}
+
+    def _build(self):
+        graph = StateGraph(State)
+        graph.add_node("retrieve_docs", self.retrieve_docs)
+        graph.add_edge(START, "retrieve_docs")
+        if self.mode == "fused":
+            graph.add_node("answer_from_docs", self.answer_from_docs)
+            graph.add_edge("retrieve_docs", "answer_from_docs")
+            graph.add_edge("answer_from_docs", END)
+        else:
+            graph.add_node("summarize_docs", self.summarize_docs)
+            graph.add_node("generate_response", self.generate_response)
+            graph.add_edge("retrieve_docs", "summarize_docs")
+            graph.add_edge("summarize_docs", "generate_response")
+            graph.add_edge("generate_response", END)
+        return graph.compile()
+
+    async def answer(self, query: str) -> Dict[str, Any]:
+        start = time.perf_counter()
+        result = await self.graph.ainvoke({"query": query})
+        logger.debug(f"Answered {query!r} in {(time.perf_counter() - start) * 1000:.0f}ms")
+        return result
+
+    async def answer_many(self, queries: Sequence[str], max_concurrency: int = 8,
+                          return_exceptions: bool = False) -> List[Any]:
+        """Answer `queries` concurrently, at most `max_concurrency` in flight; results keep input order."""
+        return await self.graph.abatch(
+            [{"query": q} for q in queries],
+            config={"max_concurrency": max_concurrency},
+            return_exceptions=return_exceptions,
+        )
@@ -1,37 +1,24 @@
 from langgraph.func import entrypoint, task
-from langchain.chat_models import init_chat_model
+import argparse
 import os
-from typing import Optional, Dict, Any, Tuple
+import statistics
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import Optional, Dict, Any, List, Tuple
 from dataclasses import dataclass
 import logging
 from datetime import datetime
-from graph.chat import chat_graph
-def loadMD(filename: str) -> str:
-    """Load the markdown file for the project manager."""
-    try:
-        if not filename or not filename.strip():
-            raise ValueError("Filename is empty or None")
-            
-        # Convert relative path to absolute using the script's directory
-        if not os.path.isabs(filename):
-            base_dir = os.path.dirname(os.path.abspath(__file__))
-            abs_path = os.path.join(base_dir, filename)
-        else:
-            abs_path = filename
-            
-        if not os.path.exists(abs_path):
-            raise FileNotFoundError(f"File not found: {abs_path}")
-            
-        with open(abs_path, "r", encoding='utf-8') as file:
-            content = file.read().strip()
-            if not content:
-                raise ValueError(f"File is empty: {filename}")
-            logging.info(f"Successfully loaded markdown file: {filename}")
-            return content
-            
-    except Exception as e:
-        logging.error(f"Error loading markdown file {filename}: {str(e)}")
-        return ""
+from graph.chat import chat_graph, new_memory
+from llms.prompt_cache import PromptLayout, prefix_metrics
+from llms.registry import get_model
+from llms.templates import get_templates
+
+PRD_SYSTEM = "You are a professional project manager creating a PRD. Follow the template exactly and be thorough."
+TASK_SYSTEM = "You are a project manager who breaks a PRD down into a clear, ordered task list."
+TASK_LAYOUT = PromptLayout(system=TASK_SYSTEM)
+# One model instance for every task (llms.registry builds it once per process)
+MODEL = "gpt-4o-mini"
 
 
 # Set up logging
@@ -52,36 +39,39 @@ class TaskResult:
     success: bool
     content: Optional[str] = None
     error: Optional[str] = None
+    seconds: float = 0.0
 
 
 @task
-def createPRD(topic: str) -> TaskResult:
-    """Create PRD document for a given topic with error handling."""
+def createPRD(topic: str, interactive: bool = True) -> TaskResult:
+    """Create PRD document for a given topic with error handling.
+
+    Interactive runs go through the chat graph so the draft can be refined;
+    batch runs make a single model call.
+    """
+    start = time.perf_counter()
     try:
         logging.info(f"Creating PRD for topic: {topic}")
         if not topic.strip():
             raise ValueError("Topic cannot be empty")        
         
-        chat_model = init_chat_model(model="gpt-4o-mini")
-        instruction_path = os.path.join(os.path.dirname(__file__), "instruction", "create-prd.mdc")
-        instruction = loadMD(instruction_path)
-        if not instruction:
-            raise ValueError("Failed to load PRD instruction template")
-        
-        logging.info(f"Loaded PRD instruction template: {instruction[:100]}...")
-        
-        # Initial conversation messages
-        messages = [
-            {"role": "system", "content": "You are a professional project manager creating a PRD. Follow the template exactly and be thorough."},
-            {"role": "user", "content": f"Using this template:\n\n{instruction}\n\nCreate a detailed PRD document for: {topic}"}
-        ]
+        # System prompt and template form a prefix shared by every topic; only the topic varies.
+        # The template is read and counted once, and again only if instruction/create-prd.mdc changes
+        layout = get_templates().layout("create-prd", system=PRD_SYSTEM)
+        logging.info(f"PRD prompt prefix: {layout.prefix_tokens} tokens")
+        messages = layout.messages(f"Create a detailed PRD document for: {topic}")
+        if not interactive:
+            prd = str(get_model(MODEL).invoke(messages).content)
+            return TaskResult(success=True, content=prd, seconds=time.perf_counter() - start)
         initial_state = {
             "messages": messages,
             "next_step": "chat"
         }
         logging.info("Initialized chat graph with initial messages")
-        output = chat_graph.invoke(initial_state)  # Initialize the chat graph with the messages
-        logging.info("output from chat graph initialized", output)    
+        # A fresh history window per PRD, so concurrent topics never share a summary
+        output = chat_graph.invoke(initial_state, {"configurable": {"memory": new_memory()}})
+        prd = str(output["messages"][-1].content)
+        logging.info(f"Prompt cache: {prefix_metrics().summary()}")
 
 
         # # First draft
@@ -105,7 +95,7 @@ def createPRD(topic: str) -> TaskResult:
         # logging.info("=" * 50)
         # logging.info(f"Enhanced PRD: {enhanced_prd}")       
         
-        return TaskResult(success=True, error="".join(output))  # Return the final PRD content
+        return TaskResult(success=True, content=prd, seconds=time.perf_counter() - start)  # Return the final PRD content
         # result = str(response.content)
 
         # # second iteration
@@ -126,29 +116,29 @@ def createPRD(topic: str) -> TaskResult:
     except Exception as e:
         error_msg = f"Error creating PRD: {str(e)}"
         logging.error(error_msg)
-        return TaskResult(success=False, error=error_msg)
+        return TaskResult(success=False, error=error_msg, seconds=time.perf_counter() - start)
 
 @task
 def createTask(prd: str) -> TaskResult:
     """Create a task list based on the PRD document with error handling."""
+    start = time.perf_counter()
     try:
         logging.info("Creating task list from PRD")
         if not prd.strip():
             raise ValueError("PRD cannot be empty")
 
-        chat_model = init_chat_model(model="gpt-4o-mini")
-        response = chat_model.invoke(
-            [{"role": "user", "content": f"Create a task list based on the following PRD: {prd}"}]
+        response = get_model(MODEL).invoke(
+            TASK_LAYOUT.messages(f"Create a task list based on the following PRD:\n\n{prd}")
         )
         
         result = str(response.content)
         logging.info("Successfully created task list")
-        return TaskResult(success=True, content=result)
+        return TaskResult(success=True, content=result, seconds=time.perf_counter() - start)
 
     except Exception as e:
         error_msg = f"Error creating task list: {str(e)}"
         logging.error(error_msg)
-        return TaskResult(success=False, error=error_msg)
+        return TaskResult(success=False, error=error_msg, seconds=time.perf_counter() - start)
 
 @entrypoint()
 def projectManager(topic: str) -> Dict[str, Any]:
@@ -192,7 +182,87 @@ def projectManager(topic: str) -> Dict[str, Any]:
             "stage": "Workflow"
         }
 
+def _stage_timing(seconds: List[float]) -> Dict[str, Any]:
+    if not seconds:
+        return {"count": 0, "total": 0.0, "p50": 0.0, "max": 0.0}
+    return {"count": len(seconds), "total": sum(seconds), "p50": statistics.median(seconds), "max": max(seconds)}
+
+
+@entrypoint()
+def batchProjectManager(batch: Dict[str, Any]) -> Dict[str, Any]:
+    """Create PRDs and task lists for {"topics": [...], "workers": N}, N topics at a time.
+
+    A topic's createTask starts as soon as its PRD is ready, ahead of PRDs that
+    have not started yet. Results keep the order of the topics.
+    """
+    topics: List[str] = batch["topics"]
+    workers = max(1, batch.get("workers", 4))
+    start = time.perf_counter()
+    results: List[Dict[str, Any]] = [{"topic": topic, "success": False} for topic in topics]
+    waiting = deque(range(len(topics)))
+    running: Dict[Any, Tuple[str, int]] = {}
+    while waiting or running:
+        while waiting and len(running) < workers:
+            i = waiting.popleft()
+            running[createPRD(topics[i], interactive=False)] = ("prd", i)
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            stage, i = running.pop(future)
+            result: TaskResult = future.result()
+            results[i][f"{stage}_seconds"] = result.seconds
+            if not result.success:
+                results[i].update(error=result.error, stage="PRD Creation" if stage == "prd" else "Task List Creation")
+            elif stage == "prd":
+                results[i]["prd"] = result.content
+                running[createTask(result.content)] = ("task", i)
+            else:
+                results[i].update(success=True, task_list=result.content)
+
+    wall = time.perf_counter() - start
+    timing = {stage: _stage_timing([r[f"{stage}_seconds"] for r in results if f"{stage}_seconds" in r])
+              for stage in ("prd", "task")}
+    timing["wall"] = wall
+    # Sum of all stage latencies over wall time: how much the workers overlapped
+    timing["overlap"] = (timing["prd"]["total"] + timing["task"]["total"]) / wall if wall else 0.0
+    logging.info(f"Batch of {len(topics)} topics with {workers} workers took {wall:.1f}s")
+    return {"results": results, "timing": timing, "workers": workers}
+
+
+def run_batch(topics: List[str], workers: int = 4) -> Dict[str, Any]:
+    # The entrypoint and langgraph's runner each hold a thread of the task pool
+    return batchProjectManager.invoke({"topics": topics, "workers": workers},
+                                      config={"max_concurrency": workers + 2})
+
+
+def print_batch(output: Dict[str, Any]) -> None:
+    for result in output["results"]:
+        status = "ok" if result["success"] else f"failed in {result['stage']}: {result['error']}"
+        print(f"{result['topic'][:50]:<50} prd {result.get('prd_seconds', 0):6.1f}s  "
+              f"tasks {result.get('task_seconds', 0):6.1f}s  {status}")
+    timing = output["timing"]
+    for stage in ("prd", "task"):
+        t = timing[stage]
+        print(f"{stage:<5} {t['count']:4d} calls  total {t['total']:7.1f}s  p50 {t['p50']:5.1f}s  max {t['max']:5.1f}s")
+    print(f"wall {timing['wall']:.1f}s with {output['workers']} workers ({timing['overlap']:.1f}x overlap)")
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Create PRDs and task lists")
+    parser.add_argument("--batch", metavar="FILE", help="non-interactive: one topic per line")
+    parser.add_argument("--workers", type=int, default=4, help="topics processed at once in --batch mode")
+    args = parser.parse_args()
+
+    # Fail fast on a missing template; later reads only stat the files
+    for template in get_templates().preload().values():
+        logging.info(f"Template {template.name}: {template.tokens} tokens")
+
+    if args.batch:
+        with open(args.batch, encoding="utf-8") as file:
+            topics = [line.strip() for line in file if line.strip()]
+        print_batch(run_batch(topics, args.workers))
+        print(f"\nPrompt cache: {prefix_metrics().summary()}")
+        return
+
     # Test cases
     test_topics = [
         "todo app",
@@ -211,6 +281,7 @@ def main():
         else:
             print(f"\nError in {result['stage']}:")
             print(result["error"])
+    print(f"\nPrompt cache: {prefix_metrics().summary()}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,6 +1,5 @@
 import os
 from dotenv import load_dotenv
-from langgraph.prebuilt import create_react_agent
 from langchain.chat_models import init_chat_model
 from typing_extensions import TypedDict
 from typing import Annotated
@@ -8,8 +7,7 @@ from langgraph.graph.message import add_messages
 from langgraph.prebuilt import ToolNode, tools_condition
 from langgraph.graph import StateGraph, START, END
 from langchain_core.messages import HumanMessage, BaseMessage
-from langchain_mcp_adapters.client import MultiServerMCPClient, Connection
-from langchain_mcp_adapters.sessions import StdioConnection
+from agent.mcp_pool import MCPSessionPool
 import asyncio
 
 load_dotenv()
@@ -21,14 +19,14 @@ connection = {
     "transport": 'stdio',
     "command": "npx", 
     "args": ["-y", "@modelcontextprotocol/server-filesystem", MCP_FILESYSTEM_DIR],
+    # several tool calls in one turn run concurrently, each with its own timeout
+    "pool": {"max_concurrency": 4, "call_timeout": 20},
 }
 
 async def main():
-    # TODO: fix types issue 
-    mcp_client = MultiServerMCPClient({
-        "filesystem": connection
-    }) # type: ignore
-    tools = await mcp_client.get_tools()
+    pool = MCPSessionPool({"filesystem": connection})
+    await pool.start()
+    tools = await pool.get_tools()
 
     # print(tools)
 
@@ -41,8 +39,8 @@ async def main():
     class State(TypedDict):
         messages: Annotated[list[BaseMessage], add_messages]
 
-    def chat(state: State) -> State:
-        return {"messages":[llm_with_tools.invoke(state["messages"])]}
+    async def chat(state: State) -> State:
+        return {"messages":[await llm_with_tools.ainvoke(state["messages"])]}
 
     builder = StateGraph(State)
     builder.add_node("assistant", chat)
@@ -54,7 +52,10 @@ async def main():
 
     graph = builder.compile()
 
-    result = await graph.ainvoke({"messages": [HumanMessage(content="show content from 1-localllm.py")]})
+    try:
+        result = await graph.ainvoke({"messages": [HumanMessage(content="show content from 1-localllm.py")]})
+    finally:
+        await pool.close()
     
     print(result)
     print("#"*50)
@@ -1,8 +1,9 @@
+import sys
 from typing import Literal
 from pydantic import BaseModel 
 from langgraph.graph import StateGraph, START, END
 from langgraph.types import Command, interrupt, Interrupt
-from langgraph.checkpoint.memory import MemorySaver
+from graph.checkpoint import SqliteCheckpointer
 from langchain_core.runnables import RunnableConfig
 
 class State(BaseModel):
@@ -42,25 +43,34 @@ builder.add_edge("node1", "interrupt_node")
 builder.add_edge("node2", "node3")
 builder.add_edge("node3", END)
 
-checkpointer = MemorySaver()
+# Checkpoints go to .cache/checkpoints.sqlite, so a paused run outlives the process
+checkpointer = SqliteCheckpointer()
 config:RunnableConfig  = {
     "configurable": {
-        "thread_id": "1",
+        "thread_id": "16-interrupt",
     }
 }
 graph = builder.compile(checkpointer=checkpointer)
 
-response = graph.invoke({"message": "hi"}, config=config)
+if graph.get_state(config).next:
+    # Paused at interrupt() by an earlier run (e.g. started with --pause)
+    print("Resuming the run interrupted in a previous session")
+else:
+    response = graph.invoke({"message": "hi"}, config=config)
 
 
-# print(response)
+    # print(response)
 
-print(response["message"])
-# print(type(response["__interrupt__"][0])) 
-# print(response["__interrupt__"][0])
-interrupted: Interrupt = response["__interrupt__"][0]
-if interrupted and interrupted.resumable:
-    print(interrupted.value)
+    print(response["message"])
+    # print(type(response["__interrupt__"][0])) 
+    # print(response["__interrupt__"][0])
+    interrupted: Interrupt = response["__interrupt__"][0]
+    if interrupted and interrupted.resumable:
+        print(interrupted.value)
+
+    if "--pause" in sys.argv:
+        print("Paused; run again to resume")
+        sys.exit(0)
 
 command = Command(resume=False)
 print(graph.invoke(command, config=config))
\ No newline at end of file
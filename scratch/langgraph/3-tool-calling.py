@@ -1,41 +1,29 @@
-from langchain.chat_models import init_chat_model
+from llms.registry import get_model
 from langgraph.prebuilt import create_react_agent
 from langchain_core.runnables import RunnableConfig
-from langgraph.checkpoint.memory import InMemorySaver
+from graph.checkpoint import SqliteCheckpointer
 from pydantic import BaseModel
+import argparse
 import os
+import uuid
 from dotenv import load_dotenv
 load_dotenv()
 os.environ["OPENAI_API_KEY"] = os.getenv("OPENAI_API_KEY") or ""
 
-checkpointer = InMemorySaver()
+parser = argparse.ArgumentParser(description="Simple tool-calling agent")
+parser.add_argument("--thread-id", help="Continue the conversation of an earlier run (its id is printed at the end)")
+args = parser.parse_args()
+
+# Thread history is kept in .cache/checkpoints.sqlite, so --thread-id can pick it up in a later run
+checkpointer = SqliteCheckpointer()
 
 class AgentOutput(BaseModel):
     
     result: str
 
 
-useLocalLLM = True
-
-if useLocalLLM:
-    # llm = init_chat_model(
-    #     model="ai/smollm2",
-    #     base_url="http://localhost:12434/engines/v1",
-    #     api_key="docker",
-    #     model_provider="openai",
-    # )
-
-    llm = init_chat_model(
-        model="llama3.2",
-        base_url="http://localhost:11434/",
-        api_key="docker",
-        model_provider="ollama",
-        temperature=1,
-    )
-else:
-    llm = init_chat_model(
-        model="gpt-4o-mini",
-    )
+# LLM_MODEL picks the model: local (llama3.2), smollm2 or openai
+llm = get_model(default="local")
 
 def add(a: int, b: int) -> int:
     """Add two numbers."""
@@ -58,7 +46,9 @@ agent = create_react_agent(
     # response_format=AgentOutput
 )
 
-config: RunnableConfig = {"recursion_limit": 10, "configurable": {"thread_id": "1"}}
+# A fresh conversation per run unless --thread-id asks to resume one
+thread_id = args.thread_id or str(uuid.uuid4())
+config: RunnableConfig = {"recursion_limit": 10, "configurable": {"thread_id": thread_id}}
 
 response =  agent.invoke(
     {"messages": [{"role": "user", "content": "What is 2 + 3 * 6"}]},
@@ -66,4 +56,5 @@ response =  agent.invoke(
 )
 
 print("Agent response:")
-print(response["messages"][-1].content)
\ No newline at end of file
+print(response["messages"][-1].content)
+print(f"\nThread id: {thread_id} (pass --thread-id to continue it)")
\ No newline at end of file
@@ -3,20 +3,20 @@ from langgraph.graph.message import add_messages
 from typing import List, Annotated, TypedDict, Literal
 from langgraph.graph import START, END, StateGraph
 
-useLocalLLM = True
-if useLocalLLM:
-    from llms.llama_local import local_llama
-    llm = local_llama
-else:
-    from llms.openai_gpt_4o import gpt4o_mini
-    llm = gpt4o_mini
+from llms.registry import get_model
+from graph.memory import ConversationMemory
+
+# LLM_MODEL overrides the model, e.g. LLM_MODEL=openai
+llm = get_model(default="local")
+# Older turns are summarized so the prompt stays under CHAT_HISTORY_TOKENS
+memory = ConversationMemory(summarizer=llm)
 
 class AgentState(TypedDict):
     messages: Annotated[List, add_messages]
     next_state: Literal["chat", "END"]
     
 def chat_node(state: AgentState) -> AgentState:
-    response = llm.invoke(state["messages"])
+    response = llm.invoke(memory.window(state["messages"]))
     print(f"Assistant: {response.content}")
 
     user_input = input("You: ")
@@ -2,10 +2,11 @@ from openai import OpenAI
 import os
 from pathlib import Path
 from dotenv import load_dotenv
-import requests
+from media.download import DownloadError, download
+from media.derivatives import shared_pool
+from media.store import ArtifactStore
 from typing import Optional, Literal, Dict, Any
 import logging
-from datetime import datetime
 from dataclasses import dataclass
 
 # Configure logging
@@ -23,6 +24,7 @@ class ImageConfig:
     quality: Literal["standard", "hd"] = "standard"
     output_dir: str = "generated_images"
     n: int = 1
+    reuse: bool = True  # serve an identical prompt + settings from the store instead of regenerating
 
 class ImageGenerator:
     """Handle image generation using OpenAI's DALL-E model."""
@@ -31,28 +33,24 @@ class ImageGenerator:
         """Initialize the image generator with configuration."""
         self.config = config or ImageConfig()
         self.client = OpenAI()
-        self._setup_output_directory()
+        self.store = ArtifactStore(self.config.output_dir)
 
-    def _setup_output_directory(self) -> None:
-        """Create output directory if it doesn't exist."""
-        output_path = Path(self.config.output_dir)
-        output_path.mkdir(parents=True, exist_ok=True)
+    def _params(self) -> Dict[str, Any]:
+        return {"size": self.config.size, "quality": self.config.quality, "n": self.config.n}
 
-    def _generate_filename(self) -> Path:
-        """Generate a unique filename with timestamp."""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"image_{timestamp}.png"
-        return Path(self.config.output_dir) / filename
-
-    def _download_image(self, url: str) -> bytes:
-        """Download image from URL."""
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        return response.content
+    def _download_image(self, url: str, file_path: Path) -> Path:
+        """Stream the image from URL to file_path (pooled connection, retries, atomic rename)."""
+        return download(url, file_path)
 
     def generate(self, prompt: str) -> Optional[str]:
         """Generate an image from a prompt."""
         try:
+            if self.config.reuse:
+                artifact = self.store.lookup(prompt, self.config.model, self._params())
+                if artifact:
+                    logger.info(f"Same prompt and settings generated before, reusing: {artifact.path}")
+                    return str(artifact.path)
+
             logger.info(f"Generating image with prompt: {prompt}")
             response = self.client.images.generate(
                 prompt=prompt,
@@ -69,16 +67,15 @@ class ImageGenerator:
             image_url = response.data[0].url
             logger.info(f"Image generated successfully, downloading from: {image_url}")
             
-            image_data = self._download_image(image_url)
-            file_path = self._generate_filename()
-            
-            with open(file_path, "wb") as file:
-                file.write(image_data)
-                
-            logger.info(f"Image saved successfully to: {file_path}")
-            return str(file_path)
+            staging = self._download_image(image_url, self.store.staging_path(".png"))
+            artifact = self.store.put_file(staging, prompt, self.config.model, self._params())
+            # Thumbnail and previews are built in a worker process while the user carries on
+            shared_pool(self.store.root).submit(artifact)
+
+            logger.info(f"Image saved successfully to: {artifact.path}")
+            return str(artifact.path)
 
-        except requests.exceptions.RequestException as e:
+        except DownloadError as e:
             logger.error(f"Error downloading image: {e}")
             return None
         except Exception as e:
@@ -159,38 +156,42 @@ def main():
     print("You can type 'quit' or 'exit' at any time to end the program")
     
     ui = UserInterface()
-    
-    while True:
-        try:
-            # Get configuration for this generation
-            config = ui.get_image_config()
-            generator = ImageGenerator(config)
-            
-            # Get prompt from user
-            prompt = ui.get_prompt()
-            if prompt is None:
-                print("Goodbye!")
-                break
-            
-            # Generate the image
-            output_path = generator.generate(prompt)
-            
-            if output_path:
-                print(f"\nImage generated and saved successfully to: {output_path}")
-            else:
-                print("\nFailed to generate image. Check the logs for details.")
+    # One client and one store connection for the whole session; only the settings change per image
+    generator = ImageGenerator()
 
-            if not ui.should_continue():
-                print("Goodbye!")
-                break
+    try:
+        while True:
+            try:
+                # Get configuration for this generation
+                generator.config = ui.get_image_config()
 
-        except KeyboardInterrupt:
-            logger.info("Operation cancelled by user")
-            break
-        except Exception as e:
-            logger.error(f"Unexpected error: {e}")
-            if not ui.should_continue():
+                # Get prompt from user
+                prompt = ui.get_prompt()
+                if prompt is None:
+                    print("Goodbye!")
+                    break
+
+                # Generate the image
+                output_path = generator.generate(prompt)
+
+                if output_path:
+                    print(f"\nImage generated and saved successfully to: {output_path}")
+                else:
+                    print("\nFailed to generate image. Check the logs for details.")
+
+                if not ui.should_continue():
+                    print("Goodbye!")
+                    break
+
+            except KeyboardInterrupt:
+                logger.info("Operation cancelled by user")
                 break
+            except Exception as e:
+                logger.error(f"Unexpected error: {e}")
+                if not ui.should_continue():
+                    break
+    finally:
+        generator.store.close()
 
 if __name__ == "__main__":
     main()
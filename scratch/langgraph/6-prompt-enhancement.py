@@ -4,44 +4,63 @@ import logging
 import argparse
 from langgraph.graph import START, END, StateGraph
 from langchain_core.runnables import RunnableLambda
-from llms.openai_gpt_4o import gpt4o_mini
-from llms.llama_local import local_llama
+from llms.registry import get_model
 from pydantic import BaseModel
-from typing import Optional, Dict, Any, Literal
+from typing import Optional, Dict, Any, List, Literal
+from concurrent.futures import ThreadPoolExecutor
 from openai import OpenAI
-import requests
-from pathlib import Path
-from datetime import datetime
+from media.download import download
+from media.derivatives import shared_pool
+from media.store import ArtifactStore
+from llms.tokens import model_name
 
-# Load environment variables
-load_dotenv()
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Parse command line arguments
-parser = argparse.ArgumentParser(description='Image Generation Workflow')
-parser.add_argument('--use-local-llm', type=lambda x: x.lower() == 'true', default=True,
-                   help='Use local LLM (true/false). Defaults to true if not specified.')
-args = parser.parse_args()
+# Set up in main(). Derivative workers (spawn) re-import this file as __mp_main__,
+# so nothing here may parse arguments, build clients or compile the graph.
+args: Optional[argparse.Namespace] = None
+useLocalLLM = True
+llm: Any = None
+generator: Any = None  # one ImageGenerator (OpenAI client, ArtifactStore connection) per run
 
-# Configuration for LLM usage
-useLocalLLM = args.use_local_llm
-llm = local_llama if useLocalLLM else gpt4o_mini
-
-# Print current mode
-logger.info(f"Running in {'local LLM' if useLocalLLM else 'OpenAI'} mode")
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Image Generation Workflow')
+    parser.add_argument('--use-local-llm', type=lambda x: x.lower() == 'true', default=True,
+                       help='Use local LLM (true/false). Defaults to true if not specified.')
+    parser.add_argument('--model', default=None,
+                       help='Model name from llms/registry.py. Defaults to LLM_MODEL, then local/openai per --use-local-llm.')
+    parser.add_argument('--variants', type=int, default=1,
+                       help='Enhanced prompt variants to generate concurrently per round (default 1)')
+    parser.add_argument('--max-parallel', type=int, default=3,
+                       help='Maximum images rendered at the same time (default 3)')
+    parser.add_argument('--regenerate', action='store_true',
+                       help='Always generate a new image instead of reusing a stored one for the same prompt')
+    return parser.parse_args()
 
 class ImageGenerationState(BaseModel):
     """State for image generation process."""
     prompt: str
     enhanced_prompt: str = ""
     image_path: str = ""
+    variants: List[str] = []     # enhanced prompts chosen for rendering
+    image_paths: List[str] = []  # one per variant, "" where rendering failed
     error: Optional[str] = None
     next_state: str = "enhance"
 
+# Each variant gets a different direction so parallel calls don't return the same text
+VARIANT_STYLES = [
+    "Focus on composition, lighting and mood.",
+    "Focus on materials, textures and fine detail.",
+    "Focus on color palette and artistic style.",
+    "Focus on camera angle, lens and framing.",
+    "Focus on setting, background and atmosphere.",
+]
+
 def setup_environment() -> bool:
     """Setup and validate environment."""
+    load_dotenv()
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         logger.error("OPENAI_API_KEY not found in environment variables or .env file")
@@ -108,6 +127,74 @@ def enhance(state: ImageGenerationState) -> ImageGenerationState:
             next_state="generate"
         )
 
+def enhance_variants(prompt: str, n: int) -> List[str]:
+    """Ask for `n` enhanced versions of `prompt` at once and return the distinct ones."""
+    messages = [
+        [
+            {"role": "system", "content": "You are an expert prompt engineer. Your task is to enhance the given prompt to create better image generation results. Make it more detailed and specific, but keep the original intent, and return updated promp only. "
+                                          + VARIANT_STYLES[i % len(VARIANT_STYLES)]},
+            {"role": "user", "content": f"Enhance this image generation prompt: {prompt}"}
+        ]
+        for i in range(n)
+    ]
+    results = llm.batch(messages, config={"max_concurrency": n}, return_exceptions=True)
+    variants = []
+    for result in results:
+        if isinstance(result, Exception):
+            logger.warning(f"Variant failed: {result}")
+            continue
+        text = str(result.content).strip()
+        if text and text not in variants:
+            variants.append(text)
+    if not variants:
+        raise ValueError("No prompt variants were generated")
+    return variants
+
+def _variant_numbers(text: str, count: int) -> Optional[List[int]]:
+    """1-based variant numbers in `text` ("1,3" or "1 3"), or None if any is not a number in 1..count."""
+    numbers = []
+    for part in text.replace(",", " ").split():
+        if not part.isdigit() or not 1 <= int(part) <= count:
+            return None
+        numbers.append(int(part))
+    return numbers
+
+def enhance_many(state: ImageGenerationState) -> ImageGenerationState:
+    """Enhance the prompt into several variants concurrently and let the user pick which to render."""
+    logger.info(f"Enhancing prompt into {args.variants} variants...")
+    try:
+        variants = enhance_variants(state.prompt, args.variants)
+
+        print(f"\nOriginal prompt: {state.prompt}")
+        for i, variant in enumerate(variants, 1):
+            print(f"\n{i}. {variant}")
+
+        while True:
+            choice = input("\nRender which variants? Numbers (e.g. 1,3), 'a' for all, 'e N' to enhance variant N further, "
+                           "'o' for the original prompt [a]: ").strip().lower()
+            if choice == "o":
+                return ImageGenerationState(prompt=state.prompt, enhanced_prompt=state.prompt, next_state="generate")
+            if choice in ("", "a", "all"):
+                chosen = variants
+                break
+            further = choice.startswith("e")
+            picked = _variant_numbers(choice[1:] if further else choice, len(variants))
+            if further and picked == []:
+                picked = [1]
+            if not picked or (further and len(picked) != 1):
+                print(f"Please enter {'one number' if further else 'numbers'} between 1 and {len(variants)}.")
+                continue
+            if further:
+                return ImageGenerationState(prompt=variants[picked[0] - 1], next_state="enhance")
+            chosen = [variants[i - 1] for i in picked]
+            break
+        return ImageGenerationState(prompt=state.prompt, enhanced_prompt=chosen[0], variants=chosen, next_state="generate")
+
+    except ValueError as e:
+        error_msg = f"Error enhancing prompt: {str(e)}"
+        logger.error(error_msg)
+        return ImageGenerationState(prompt=state.prompt, error=error_msg, next_state="generate")
+
 class ImageGenerator:
     """Handle image generation using DALL-E model."""
     
@@ -116,16 +203,13 @@ class ImageGenerator:
         if not useLocalLLM:  # Use OpenAI's DALL-E
             self.client = OpenAI()
             self.use_dalle = True
+            self.model = "dall-e-3"
         else:  # Use local LLM for text-to-image conversion simulation
             self.use_dalle = False
+            self.model = f"simulation:{model_name(llm) or type(llm).__name__}"
+        self.store = ArtifactStore("generated_images")
 
-    def _generate_filename(self, output_dir: Path) -> Path:
-        """Generate a unique filename with timestamp."""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"image_{timestamp}.png"
-        return output_dir / filename
-
-    def _simulate_image_generation(self, prompt: str, file_path: Path) -> str:
+    def _simulate_image_generation(self, prompt: str) -> bytes:
         """Simulate image generation using local LLM."""
         try:
             # Use local LLM to generate a description of what the image would look like
@@ -136,31 +220,33 @@ class ImageGenerator:
             result = llm.invoke(messages)
             description = str(result.content) if result.content else "Image description not available"
             
-            # Write the description to a text file with .txt extension
-            text_file_path = file_path.with_suffix('.txt')
-            with open(text_file_path, 'w') as f:
-                f.write(f"Image Description (Simulation Mode)\n")
-                f.write(f"===============================\n")
-                f.write(f"Original Prompt: {prompt}\n\n")
-                f.write(f"Description of what the image would look like:\n")
-                f.write(f"----------------------------------------\n")
-                f.write(description)
-                f.write("\n\nNote: This is a simulation using local LLM. No actual image was generated.")
-            return str(text_file_path)  # Return the text file path
+            # The description is stored as a .txt artifact in place of an image
+            return (
+                f"Image Description (Simulation Mode)\n"
+                f"===============================\n"
+                f"Original Prompt: {prompt}\n\n"
+                f"Description of what the image would look like:\n"
+                f"----------------------------------------\n"
+                f"{description}"
+                "\n\nNote: This is a simulation using local LLM. No actual image was generated."
+            ).encode("utf-8")
         except Exception as e:
             logger.error(f"Error in image simulation: {e}")
-            return ""
+            return b""
 
     def generate(self, prompt: str, 
                 size: Literal["1024x1024", "1792x1024", "1024x1792"] = "1024x1024",
-                quality: Literal["standard", "hd"] = "standard") -> Optional[str]:
-        """Generate an image from a prompt."""
+                quality: Literal["standard", "hd"] = "standard", original_prompt: str = "") -> Optional[str]:
+        """Generate an image from a prompt, or return the stored one for the same prompt and settings."""
+        params = {"size": size, "quality": quality} if self.use_dalle else {}
         try:
-            # Create output directory
-            output_dir = Path("generated_images")
-            output_dir.mkdir(parents=True, exist_ok=True)
-            file_path = self._generate_filename(output_dir)
+            if not args.regenerate:
+                artifact = self.store.lookup(prompt, self.model, params)
+                if artifact:
+                    logger.info(f"Reusing stored artifact for this prompt: {artifact.path}")
+                    return str(artifact.path)
 
+            original_prompt = original_prompt or prompt
             if self.use_dalle:
                 # Use DALL-E for actual image generation
                 response = self.client.images.generate(
@@ -174,25 +260,34 @@ class ImageGenerator:
                 if not response.data or not response.data[0].url:
                     raise ValueError("No image data received from the API")
 
-                # Download and save the image
-                image_url = response.data[0].url
-                response = requests.get(image_url, timeout=10)
-                response.raise_for_status()
-                
-                with open(file_path, "wb") as file:
-                    file.write(response.content)
-                return str(file_path)
+                # Stream the image to disk over the shared connection pool, then file it by content hash
+                staging = download(response.data[0].url, self.store.staging_path(".png"))
+                artifact = self.store.put_file(staging, original_prompt, self.model, params, enhanced_prompt=prompt)
+                # Thumbnail and previews are built in a worker process, off this request
+                shared_pool(self.store.root).submit(artifact)
             else:
                 # Use local LLM to simulate image generation
-                result = self._simulate_image_generation(prompt, file_path)
-                if not result:
+                description = self._simulate_image_generation(prompt)
+                if not description:
                     raise ValueError("Failed to generate image description")
-                return result
+                artifact = self.store.put_bytes(description, ".txt", original_prompt, self.model, params,
+                                                enhanced_prompt=prompt)
+            return str(artifact.path)
 
         except Exception as e:
             logger.error(f"Error generating image: {e}")
             return None
 
+    def generate_many(self, prompts: List[str], max_parallel: int = 3, original_prompt: str = "") -> List[Optional[str]]:
+        """Generate one image per prompt, at most `max_parallel` at a time, in prompt order.
+
+        dall-e-3 only accepts n=1, so variants are separate requests run side by side.
+        """
+        if len(prompts) == 1:
+            return [self.generate(prompts[0], original_prompt=original_prompt)]
+        with ThreadPoolExecutor(max_workers=max(1, min(max_parallel, len(prompts)))) as pool:
+            return list(pool.map(lambda p: self.generate(p, original_prompt=original_prompt), prompts))
+
 def generate(state: ImageGenerationState) -> ImageGenerationState:
     """Generate an image based on the enhanced prompt."""
     if state.error:
@@ -206,20 +301,21 @@ def generate(state: ImageGenerationState) -> ImageGenerationState:
         
     logger.info("Generating image...")
     try:
-        prompt_to_use = state.enhanced_prompt or state.prompt
-        if not prompt_to_use:
+        prompts = state.variants or [state.enhanced_prompt or state.prompt]
+        if not all(prompts):
             raise ValueError("No prompt available")
 
-        generator = ImageGenerator()
-        image_path = generator.generate(prompt_to_use)
-        if not image_path:
+        image_paths = generator.generate_many(prompts, args.max_parallel, original_prompt=state.prompt)
+        if not any(image_paths):
             raise ValueError("Failed to generate image")
 
-        logger.info(f"Image generated successfully: {image_path}")
+        logger.info(f"Generated {sum(1 for p in image_paths if p)}/{len(prompts)} images")
         return ImageGenerationState(
             prompt=state.prompt,
             enhanced_prompt=state.enhanced_prompt,
-            image_path=image_path,
+            image_path=next(p for p in image_paths if p),
+            variants=state.variants,
+            image_paths=[p or "" for p in image_paths],
             error=None,
             next_state="end"
         )
@@ -234,38 +330,46 @@ def generate(state: ImageGenerationState) -> ImageGenerationState:
             next_state="end"
         )
 
-# Create and configure the graph
-graph = StateGraph(ImageGenerationState)
-graph.add_node("enhance", RunnableLambda(enhance))
-graph.add_node("generate", RunnableLambda(generate))
-
-# Define the workflow with conditional edges
-graph.add_edge(START, "enhance")
-graph.add_conditional_edges(
-    "enhance",
-    lambda x: x.next_state,
-    {
-        "enhance": "enhance",  # Loop back for further enhancement
-        "generate": "generate"  # Proceed to generation
-    }
-)
-graph.add_conditional_edges(
-    "generate",
-    lambda x: x.next_state,
-    {
-        "end": END
-    }
-)
-
-# Compile the graph
-app = graph.compile()
+def build_app():
+    """Create, configure and compile the graph."""
+    graph = StateGraph(ImageGenerationState)
+    graph.add_node("enhance", RunnableLambda(enhance_many if args.variants > 1 else enhance))
+    graph.add_node("generate", RunnableLambda(generate))
+
+    # Define the workflow with conditional edges
+    graph.add_edge(START, "enhance")
+    graph.add_conditional_edges(
+        "enhance",
+        lambda x: x.next_state,
+        {
+            "enhance": "enhance",  # Loop back for further enhancement
+            "generate": "generate"  # Proceed to generation
+        }
+    )
+    graph.add_conditional_edges(
+        "generate",
+        lambda x: x.next_state,
+        {
+            "end": END
+        }
+    )
+    return graph.compile()
 
 def main():
     """Main function to run the image generation process."""
+    global args, useLocalLLM, llm, generator
+    args = parse_args()
     if not setup_environment():
         print("Failed to setup environment. Please check your API key.")
         return
 
+    # Configuration for LLM usage; only the selected model is constructed
+    useLocalLLM = args.use_local_llm
+    llm = get_model(args.model, default="local" if useLocalLLM else "openai")
+    logger.info(f"Running in {'local LLM' if useLocalLLM else 'OpenAI'} mode")
+    generator = ImageGenerator()
+    app = build_app()
+
     print("\nImage Generation Workflow")
     print("------------------------")
     print("This program will help you enhance your prompt and generate an image.")
@@ -295,6 +399,10 @@ def main():
 
             if final_state.get("error"):
                 print(f"\nError: {final_state['error']}")
+            elif len(final_state.get("image_paths") or []) > 1:
+                print("\nGenerated variants:")
+                for i, (variant, path) in enumerate(zip(final_state["variants"], final_state["image_paths"]), 1):
+                    print(f"\n{i}. {variant}\n   -> {path or 'failed'}")
             elif final_state.get("image_path"):
                 used_prompt = final_state.get("enhanced_prompt") or final_state.get("prompt")
                 print(f"\nFinal prompt used: {used_prompt}")
@@ -315,6 +423,7 @@ def main():
             logger.exception("Unexpected error in main loop")
             if input("Would you like to try again? (y/n): ").lower().strip() not in ['y', 'yes']:
                 break
+    generator.store.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,105 +1,75 @@
+import argparse
+import asyncio
 import os
+import time
 from dotenv import load_dotenv
-from langchain_community.document_loaders import TextLoader
-from langchain_openai import OpenAIEmbeddings
-from langchain_chroma import Chroma
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from openai import OpenAI
-from langgraph.graph import StateGraph, START, END
-from langchain_core.runnables import RunnableLambda
-from pydantic import BaseModel
+from llms.embeddings import get_embeddings
+from llms.registry import get_model
+from rag.cache import CachedEmbeddings, CachedRetriever
+from rag.ingest import collection_version
+from rag.pipeline import RAGPipeline, chroma_retriever
 load_dotenv()
 
 os.environ["OPENAI_API_KEY"] = os.getenv("OPENAI_API_KEY", "")
-def embed_text(text):
-    """Embed text using OpenAI embeddings."""
-    loader = TextLoader("data/knowledge_base.txt")
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=300, chunk_overlap=20)
-    chunks = text_splitter.split_documents(loader.load())
 
-    embeddings = OpenAIEmbeddings()
-    Chroma.from_documents(chunks, embeddings, persist_directory="data/chroma_db")
-
-
-class State(BaseModel):
-    """State for the agent."""
-    query: str
-    docs: list = []
-    summary: str = ""
-    response: str = ""
-
-embeddings = OpenAIEmbeddings()
-retriver = Chroma(persist_directory="data/chroma_db", embedding_function=embeddings).as_retriever(search_kwargs={"k": 3})
-
-client = OpenAI() # type: ignore
-
-def retrieve_docs(state: State) -> State:
-    """Retrieve documents based on user input."""
-    query = state.query
-    if not query:
-        return state
-    
-    docs = retriver.invoke(query)
-    return State(query=query, docs=docs)
-
-def summarize_docs(state: State) -> State:
-    """Summarize retrieved documents."""
-    if not state.docs:
-        return State(query=state.query, docs=state.docs, summary="No relevant documents found.")
-    
-    content = "\n".join(doc.page_content for doc in state.docs)
-
-    summary = client.chat.completions.create(
-        model="gpt-3.5-turbo",
-        messages=[
-            {"role": "system", "content": "You are a helpful assistant."},
-            {"role": "user", "content": f"Summarize the following content: {content}"}
-        ]
-    ).choices[0].message.content
-    
-    if not summary:
-        return State(query=state.query, docs=state.docs, summary="No summary generated.")
-    
-    return State(query=state.query, docs=state.docs, summary=summary.strip())
-
-def generate_response(state: State) -> State:
-    """Generate a response based on the summary."""
-    if not state.summary:
-        return State(
-            query=state.query,
-            docs=state.docs,
-            summary=state.summary,
-            response="No summary available to generate a response."
-        )
-
-    prompt = f"Based on the following summary, provide a detailed response to the query: {state.query}\n\nSummary: {state.summary}"
-    
-    response = client.chat.completions.create(
-        model="gpt-3.5-turbo",
-        messages=[
-            {"role": "system", "content": "You are a helpful assistant."},
-            {"role": "user", "content": prompt}
-        ]
-    ).choices[0].message.content
-    
-    if not response:
-        return State(query=state.query, docs=state.docs, summary=state.summary, response="No response generated.")
-    
-    return State(query=state.query, docs=state.docs, summary=state.summary, response=response.strip())
-
-graph = StateGraph(State)
-
-graph.add_node("retrieve_docs", retrieve_docs)
-graph.add_node("summarize_docs", summarize_docs)
-graph.add_node("generate_response", generate_response)
-
-graph.add_edge(START, "retrieve_docs")
-graph.add_edge("retrieve_docs", "summarize_docs")
-graph.add_edge("summarize_docs", "generate_response")
-graph.add_edge("generate_response", END)
-
-agent = graph.compile()
-
-query = "how to reset password"
-result = agent.invoke({"query": query})
-print("Response:", result["response"])
\ No newline at end of file
+# EMBEDDINGS_MODEL=local (or ollama) runs ingestion and retrieval offline.
+# Vectors for chunks and queries seen before are read from .cache/embeddings.sqlite
+embeddings = CachedEmbeddings(get_embeddings())
+
+def embed_text(text=None):
+    """Bring data/chroma_db up to date with data/; only new or edited chunks are embedded."""
+    from rag.ingest import ingest_directory
+    return ingest_directory("data", "data/chroma_db", embeddings)
+
+
+def build_retriever(retrieval):
+    if retrieval == "vector":
+        return chroma_retriever("data/chroma_db", embeddings, k=3)
+    # BM25 over the same chunks finds exact terms (error codes, names) the vectors miss
+    from langchain_chroma import Chroma
+    from rag.hybrid import BM25Index, HybridRetriever, overlap_rerank
+    return HybridRetriever(
+        vectorstore=Chroma(persist_directory="data/chroma_db", embedding_function=embeddings),
+        bm25=BM25Index.load("data/chroma_db/bm25_index.json"),
+        index_path="data/chroma_db/bm25_index.json",
+        version=lambda: collection_version("data/chroma_db"),
+        rerank=overlap_rerank if retrieval == "hybrid-rerank" else None,
+        k=3,
+    )
+
+
+async def main(queries, concurrency, mode, max_context_tokens, retrieval):
+    # One retriever and one async chat client shared by every query; repeated
+    # queries skip embedding and Chroma until data/chroma_db is re-ingested
+    retriever = CachedRetriever(
+        retriever=build_retriever(retrieval),
+        version=lambda: collection_version("data/chroma_db"),
+    )
+    pipeline = RAGPipeline(
+        retriever,
+        get_model("gpt-3.5-turbo"),
+        mode=mode,
+        max_context_tokens=max_context_tokens,
+    )
+    start = time.perf_counter()
+    results = await pipeline.answer_many(queries, max_concurrency=concurrency)
+    for query, result in zip(queries, results):
+        print(f"Query: {query}\nResponse: {result['response']}\n")
+    print(f"{len(queries)} queries in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Agentic RAG over data/chroma_db")
+    parser.add_argument("queries", nargs="*", default=["how to reset password"])
+    parser.add_argument("--concurrency", type=int, default=8, help="Queries in flight at once")
+    parser.add_argument("--mode", choices=["summarize", "fused"], default="summarize",
+                        help="summarize: summary then answer (2 LLM calls); fused: answer from the chunks (1 call)")
+    parser.add_argument("--max-context-tokens", type=int, default=1500, help="Chunk budget for --mode fused")
+    parser.add_argument("--retrieval", choices=["vector", "hybrid", "hybrid-rerank"], default="vector",
+                        help="hybrid fuses vector and BM25 results; hybrid-rerank also reranks them locally")
+    parser.add_argument("--ingest", action="store_true", help="Update data/chroma_db from data/ first")
+    args = parser.parse_args()
+
+    if args.ingest:
+        embed_text()
+    asyncio.run(main(args.queries, args.concurrency, args.mode, args.max_context_tokens, args.retrieval))
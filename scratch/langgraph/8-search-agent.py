@@ -2,7 +2,9 @@ import os
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 from langgraph.prebuilt import create_react_agent
-from langgraph.checkpoint.memory import InMemorySaver
+from graph.checkpoint import SqliteCheckpointer
+from llms.prompt_cache import prefix_metrics
+from llms.registry import get_model
 from langchain_core.runnables import RunnableConfig
 from langchain_community.tools.ddg_search import DuckDuckGoSearchRun
 from dotenv import load_dotenv
@@ -25,6 +27,8 @@ class AgentConfig:
 class SearchAgent:
     """A ReAct agent with verification capabilities."""
     
+    # Sent first on every model call: keep it static (no dates, ids or per-query text)
+    # so provider prompt caching and Ollama's KV cache can reuse it
     AGENT_PROMPT = """You are a helpful assistant with access to a search tool. Follow these steps when responding to queries:
 
 1. Initial Search: Use the search tool to find relevant information about the query.
@@ -42,7 +46,8 @@ Always be transparent about your search process and explain how you verified the
         """Initialize the search agent with configuration."""
         self.config = config or AgentConfig()
         self._initialize_environment()
-        self.checkpointer = InMemorySaver()
+        # Durable threads: pass AgentConfig(thread_id=...) to continue an earlier conversation
+        self.checkpointer = SqliteCheckpointer()
         self.search_tool = DuckDuckGoSearchRun()
         self.agent = self._create_agent()
         self.runnable_config = self._create_runnable_config()
@@ -55,7 +60,8 @@ Always be transparent about your search process and explain how you verified the
     def _create_agent(self):
         """Create and configure the ReAct agent."""
         return create_react_agent(
-            model=self.config.model_name,
+            # Registry models report cached vs uncached input tokens to prefix_metrics()
+            model=get_model(self.config.model_name),
             prompt=self.AGENT_PROMPT,
             name="SearchAgent",
             tools=[self.search_tool],
@@ -93,6 +99,7 @@ def main():
             print("\nVerified Response:")
             print(response)
         print("-" * 80)
+    print(f"Prompt cache: {prefix_metrics().summary()}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,92 @@
+"""SqliteCheckpointer must behave like InMemorySaver, including across delta chains and compaction.
+
+    uv run pytest tests
+"""
+from typing import Annotated, List, TypedDict
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.message import add_messages
+
+from graph.checkpoint import RetentionPolicy, SqliteCheckpointer
+
+CONFIG = {"configurable": {"thread_id": "chat"}}
+
+
+class ChatState(TypedDict):
+    messages: Annotated[List, add_messages]
+    turns: int
+
+
+def chat(state: ChatState) -> dict:
+    turns = state.get("turns", 0) + 1
+    return {"messages": [AIMessage(content=f"answer {turns}")], "turns": turns}
+
+
+def chat_graph(checkpointer):
+    builder = StateGraph(ChatState)
+    builder.add_node("chat", chat)
+    builder.add_edge(START, "chat")
+    builder.add_edge("chat", END)
+    return builder.compile(checkpointer=checkpointer)
+
+
+def snapshot(graph, config=CONFIG):
+    values = dict(graph.get_state(config).values)
+    # Message ids are random per run; compare everything else
+    values["messages"] = [(m.type, m.content) for m in values["messages"]]
+    return values
+
+
+def ask(graph, i: int, config=CONFIG):
+    graph.invoke({"messages": [HumanMessage(content=f"question {i}")]}, config)
+
+
+@pytest.fixture
+def sqlite(tmp_path):
+    # Short delta chains and frequent compaction, so a few turns cross both
+    saver = SqliteCheckpointer(tmp_path / "checkpoints.sqlite", retention=RetentionPolicy(keep_last=4),
+                               compact_every=3, max_delta_depth=3)
+    yield saver
+    saver.close()
+
+
+def test_delta_chain_across_compaction(sqlite, tmp_path):
+    reference, graph = chat_graph(InMemorySaver()), chat_graph(sqlite)
+    for i in range(20):
+        ask(reference, i)
+        ask(graph, i)
+        assert snapshot(graph) == snapshot(reference)
+    assert sqlite.stats()["checkpoints"] < 20 * 3
+    deltas = sqlite._db.execute("SELECT COUNT(*) FROM blobs WHERE base_version IS NOT NULL").fetchone()[0]
+    assert deltas > 0
+
+    # A fresh process only has the database
+    sqlite.close()
+    with SqliteCheckpointer(tmp_path / "checkpoints.sqlite") as reopened:
+        assert snapshot(chat_graph(reopened)) == snapshot(reference)
+
+
+def test_fork_with_update_state(sqlite):
+    reference, graph = chat_graph(InMemorySaver()), chat_graph(sqlite)
+    for i in range(6):
+        ask(reference, i)
+        ask(graph, i)
+
+    forks = []
+    for g in (reference, graph):
+        # Two turns back: still within keep_last, and its history is shorter than the latest
+        past = [s for s in g.get_state_history(CONFIG) if s.metadata["source"] == "loop"][2]
+        forks.append(g.update_state(past.config, {"messages": [HumanMessage(content="edited")], "turns": 100}))
+    # Continue from the fork, then from the thread's latest checkpoint (the fork's branch)
+    ask(reference, 6, forks[0])
+    ask(graph, 6, forks[1])
+    assert snapshot(graph) == snapshot(reference)
+    assert snapshot(graph)["turns"] == 101
+    assert ("human", "edited") in snapshot(graph)["messages"]
+    for i in range(7, 14):
+        ask(reference, i)
+        ask(graph, i)
+        assert snapshot(graph) == snapshot(reference)
@@ -0,0 +1,49 @@
+"""Incremental ingestion only embeds chunks whose text is new, wherever they sit in the file.
+
+    uv run pytest tests
+"""
+import pytest
+
+from llms.embeddings import HashingEmbeddings
+from rag.ingest import IngestOptions, chunk_ids, ingest_directory
+
+PARAGRAPHS = [f"Section {i}. " + " ".join(f"word{i}_{j}" for j in range(30)) for i in range(20)]
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    root = tmp_path / "corpus"
+    root.mkdir()
+    (root / "kb.txt").write_text("\n\n".join(PARAGRAPHS))
+    return root
+
+
+def test_prepend_embeds_only_new_chunks(corpus, tmp_path):
+    store, embeddings = tmp_path / "chroma", HashingEmbeddings()
+    first = ingest_directory(corpus, store, embeddings)
+    assert first.chunks_added >= len(PARAGRAPHS)
+
+    path = corpus / "kb.txt"
+    path.write_text("A new introduction paragraph.\n\n" + path.read_text())
+    again = ingest_directory(corpus, store, embeddings)
+    assert again.chunks_added == 1
+    assert again.chunks_existing == first.chunks_added
+    assert again.chunks_deleted == 0
+
+
+def test_repeated_text_gets_distinct_ids():
+    ids = chunk_ids("settings", "kb.txt", ["same", "other", "same"])
+    assert len(set(ids)) == 3
+    # Moving a repeated chunk keeps the ids of the copies before it
+    assert chunk_ids("settings", "kb.txt", ["new", "same", "other", "same"])[1:] == ids
+
+
+def test_removed_duplicate_is_deleted(corpus, tmp_path):
+    store, embeddings = tmp_path / "chroma", HashingEmbeddings()
+    path = corpus / "kb.txt"
+    path.write_text("\n\n".join(PARAGRAPHS + PARAGRAPHS[:1]))
+    first = ingest_directory(corpus, store, embeddings, IngestOptions())
+    path.write_text("\n\n".join(PARAGRAPHS))
+    again = ingest_directory(corpus, store, embeddings, IngestOptions())
+    assert (again.chunks_added, again.chunks_deleted) == (0, 1)
+    assert again.chunks_existing == first.chunks_added - 1